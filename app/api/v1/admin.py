@@ -31,7 +31,7 @@ from pydantic import BaseModel, Field, ConfigDict, model_validator
 # pyrefly: ignore [missing-import]
 from app.core.database import get_db
 # pyrefly: ignore [missing-import]
-from app.core.security import require_permission
+from app.core.security import require_permission, invalidate_teacher_cache
 from app.core.permissions import (
     PERMISSION_DEFAULTS,
     resolve_permissions,
@@ -307,6 +307,7 @@ async def update_org_teacher(
 
     await db.commit()
     await db.refresh(target)
+    invalidate_teacher_cache(target.email)
     return target
 
 
@@ -402,6 +403,7 @@ async def admin_update_teacher_instruments(
         target.instruments = list(instruments)
         await db.commit()
         await db.refresh(target)
+        invalidate_teacher_cache(target.email)
 
         permissions = resolve_permissions(
             role=target.role,
@@ -2472,6 +2474,7 @@ async def update_teacher_permissions(
 
     await db.commit()
     await db.refresh(target)
+    invalidate_teacher_cache(target.email)
 
     resolved = resolve_permissions(target.role, target.organization_id, target.custom_permissions)
     return {
@@ -3253,6 +3256,7 @@ async def admin_update_class_attendance(
         # Crear registro de asistencia nuevo
         new_attendance = Attendance(
             class_id=class_obj.id,
+            teacher_id=class_obj.teacher_id,
             status=data.status,
             notes=data.notes,
         )
@@ -3,6 +3,7 @@ Attendances endpoints - CRUD de asistencias (marca presente/ausente/licencia)
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -12,7 +13,39 @@ from app.models.teacher import Teacher
 from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, AttendanceResponse
 from app.api.v1.websocket import notify_data_change
 
-router = APIRouter()
+# orjson serializa date/datetime de forma nativa y mucho más rápido que json
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+async def _raise_attendance_access_error(
+    db: AsyncSession,
+    attendance_id: int,
+    detail: str
+) -> None:
+    """
+    Resolver 404 vs 403 cuando la verificación de pertenencia falla
+
+    Solo se ejecuta en el camino de error: el caso normal ya quedó
+    resuelto por attendance.owned_by en una sola consulta.
+
+    Args:
+        db: Sesión de base de datos
+        attendance_id: ID de la asistencia
+        detail: Mensaje para el caso 403
+
+    Raises:
+        404: Si la asistencia no existe
+        403: Si existe pero no pertenece al profesor
+    """
+    if not await attendance.exists_by_id(db, attendance_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Asistencia {attendance_id} no encontrada"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
+    )
 
 
 @router.get("/class/{class_id}", response_model=AttendanceResponse)
@@ -45,31 +78,22 @@ async def get_class_attendance(
             detail=f"Clase {class_id} no encontrada"
         )
 
-    # Verificar que la clase existe y pertenece al profesor
-    class_obj = await class_crud.get(db, class_id)
+    # Pertenencia de la clase (evaluada en SQL) + asistencia en una sola consulta
+    row = await attendance.get_with_class_owner(db, class_id, current_teacher)
     
-    if not class_obj:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Clase {class_id} no encontrada"
         )
     
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, class_obj.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta clase"
-            )
-    else:
-        if class_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta clase"
-            )
-    
-    # Obtener la asistencia
-    attendance_obj = await attendance.get_by_class(db, class_id)
+    owned, attendance_obj = row
+
+    if not owned:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para ver esta clase"
+        )
     
     if not attendance_obj:
         raise HTTPException(
@@ -104,28 +128,21 @@ async def mark_attendance(
         403: Si la clase no pertenece al profesor
         400: Si ya existe attendance para esa clase
     """
-    # Verificar que la clase existe y pertenece al profesor
-    class_obj = await class_crud.get(db, attendance_data.class_id)
-    
-    if not class_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Clase {attendance_data.class_id} no encontrada"
-        )
+    # Verificar que la clase existe y pertenece al profesor (una sola consulta en el caso normal)
+    class_teacher_id = await class_crud.get_owner_id_for_teacher(
+        db, attendance_data.class_id, current_teacher
+    )
     
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, class_obj.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
+    if class_teacher_id is None:
+        if not await class_crud.exists_by_id(db, attendance_data.class_id):
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para marcar asistencia en esta clase"
-            )
-    else:
-        if class_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para marcar asistencia en esta clase"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Clase {attendance_data.class_id} no encontrada"
             )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para marcar asistencia en esta clase"
+        )
     
     # Crear la asistencia (el CRUD obtiene enrollment_id de la clase y maneja créditos)
     try:
@@ -135,7 +152,7 @@ async def mark_attendance(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    await notify_data_change(class_obj.teacher_id, "attendance", "create", new_attendance.id)
+    await notify_data_change(class_teacher_id, "attendance", "create", new_attendance.id)
     
     return new_attendance
 
@@ -161,34 +178,17 @@ async def get_attendance(
         404: Si la asistencia no existe
         403: Si la asistencia no pertenece al profesor
     """
-    attendance_obj = await attendance.get(db, attendance_id)
+    # Verificar pertenencia con una consulta escalar (sin cargar la fila completa)
+    teacher_id = await attendance.owned_by(db, attendance_id, current_teacher)
     
-    if not attendance_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Asistencia {attendance_id} no encontrada"
-        )
-    
-    # Verificar que pertenece al profesor (a través de la clase relacionada)
-    if not getattr(attendance_obj, "class_", None):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para ver esta asistencia"
+    if teacher_id is None:
+        await _raise_attendance_access_error(
+            db, attendance_id,
+            "No tienes permiso para ver esta asistencia"
         )
 
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, attendance_obj.class_.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta asistencia"
-            )
-    else:
-        if attendance_obj.class_.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta asistencia"
-            )
+    # Solo ahora, ya autorizado, se carga la fila completa
+    attendance_obj = await attendance.get(db, attendance_id)
     
     return attendance_obj
 
@@ -217,38 +217,15 @@ async def delete_attendance(
         403: Si la asistencia no pertenece al profesor
         400: Si era 'license' y el alumno ya usó los créditos
     """
-    # Verificar que existe
-    attendance_obj = await attendance.get(db, attendance_id)
+    # Verificar pertenencia con una consulta escalar (sin cargar la fila completa)
+    teacher_id = await attendance.owned_by(db, attendance_id, current_teacher)
     
-    if not attendance_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Asistencia {attendance_id} no encontrada"
+    if teacher_id is None:
+        await _raise_attendance_access_error(
+            db, attendance_id,
+            "No tienes permiso para eliminar esta asistencia"
         )
     
-    # Verificar que pertenece al profesor (a través de la clase relacionada)
-    if not getattr(attendance_obj, "class_", None):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para eliminar esta asistencia"
-        )
-
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, attendance_obj.class_.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar esta asistencia"
-            )
-    else:
-        if attendance_obj.class_.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar esta asistencia"
-            )
-    
-    teacher_id = attendance_obj.class_.teacher_id
-
     # Eliminar
     try:
         await attendance.delete(db, attendance_id)
@@ -292,38 +269,15 @@ async def update_attendance(
         403: Si la asistencia no pertenece al profesor
         400: Si intenta cambiar de 'license' pero ya usó los créditos
     """
-    # Verificar que existe
-    attendance_obj = await attendance.get(db, attendance_id)
+    # Verificar pertenencia con una consulta escalar (sin cargar la fila completa)
+    teacher_id = await attendance.owned_by(db, attendance_id, current_teacher)
     
-    if not attendance_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Asistencia {attendance_id} no encontrada"
+    if teacher_id is None:
+        await _raise_attendance_access_error(
+            db, attendance_id,
+            "No tienes permiso para actualizar esta asistencia"
         )
     
-    # Verificar que pertenece al profesor (a través de la clase relacionada)
-    if not getattr(attendance_obj, "class_", None):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para actualizar esta asistencia"
-        )
-
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, attendance_obj.class_.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar esta asistencia"
-            )
-    else:
-        if attendance_obj.class_.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar esta asistencia"
-            )
-    
-    teacher_id = attendance_obj.class_.teacher_id
-
     # Actualizar (el CRUD maneja lógica de créditos automáticamente)
     try:
         updated_attendance = await attendance.update(db, attendance_id, attendance_data)
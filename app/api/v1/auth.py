@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_db_ro
 from app.core.limiter import limiter
 from app.core.logging import log_event, Actions
 from app.core.security import create_access_token, security, should_refresh_token, refresh_access_token, decode_token
@@ -27,14 +27,18 @@ router = APIRouter()
 async def login(
     request: Request,          # requerido por slowapi
     credentials: Login,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    db_ro: AsyncSession = Depends(get_db_ro)
 ):
     """
     Login endpoint con rate limiting (10 intentos/min por IP).
     Registra en security_logs tanto éxitos como fallos.
+
+    La búsqueda del teacher (solo lectura) va a la réplica; la BD principal
+    solo se usa para escribir el log de seguridad.
     """
     teacher_obj = await teacher.authenticate(
-        db,
+        db_ro,
         email=credentials.email,
         password=credentials.password
     )
@@ -88,20 +92,17 @@ async def register(
     Raises:
         400: Si el email ya está registrado
     """
-    # Verificar email único
-    existing_teacher = await teacher.get_by_email(db, email=teacher_data.email)
-    if existing_teacher:
+    # 1. Crear el teacher (INSERT ... ON CONFLICT: el email único se valida en la misma sentencia)
+    new_teacher = await teacher.create(db, teacher_data)
+    if new_teacher is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"El email {teacher_data.email} ya está registrado",
         )
 
-    # 1. Crear la organización
+    # 2. Crear la organización (solo si el teacher se creó, para no dejar orgs huérfanas)
     org = await org_crud.create(db, OrganizationCreate(name=org_name))
 
-    # 2. Crear el teacher como org_admin de esa organización
-    new_teacher = await teacher.create(db, teacher_data)
-
     # 3. Asociar teacher → organización con rol org_admin
     new_teacher.organization_id = org.id
     new_teacher.role = "org_admin"
@@ -150,14 +151,6 @@ async def accept_invite(
             detail="Esta invitación ya fue usada o expiró. Solicita una nueva al administrador.",
         )
 
-    # Verificar que el email elegido por el profesor no tenga cuenta
-    existing = await teacher.get_by_email(db, email=data.email)
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"El email {data.email} ya está registrado. Usa otro email.",
-        )
-
     from decimal import Decimal
     from app.schemas.teacher import TeacherCreate as TC
     teacher_data = TC(
@@ -167,7 +160,13 @@ async def accept_invite(
         tariff_individual=Decimal(str(data.tariff_individual)),
         tariff_group=Decimal(str(data.tariff_group)),
     )
+    # El email único se valida en la misma sentencia del INSERT (ON CONFLICT)
     new_teacher = await teacher.create(db, teacher_data)
+    if new_teacher is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El email {data.email} ya está registrado. Usa otro email.",
+        )
 
     # Asociar a la organización con el rol de la invitación
     new_teacher.organization_id = invitation.organization_id
@@ -219,7 +218,8 @@ async def refresh_token(
             "token_type": "bearer"
         }
     """
-    from jose import jwt, JWTError
+    import jwt
+    from jwt.exceptions import InvalidTokenError as JWTError
     from app.core.config import settings
     
     token = credentials.credentials
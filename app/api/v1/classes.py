@@ -3,22 +3,51 @@ Classes endpoints - CRUD de clases específicas + recuperaciones
 """
 
 # pyrefly: ignore [missing-import]
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 # pyrefly: ignore [missing-import]
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 
 from app.core.database import get_db
 from app.core.security import get_current_teacher
-from app.crud import class_crud, enrollment
+from app.core.http_cache import compute_etag, etag_matches, set_etag, not_modified
+from app.crud import class_crud
 from app.models.teacher import Teacher
-from app.schemas.class_schema import ClassCreate, ClassUpdate, ClassResponse
+from app.schemas.class_schema import (
+    ClassCreate, ClassUpdate, ClassResponse, PaginatedClasses, CLASS_LIST_ADAPTER
+)
 from app.api.v1.websocket import notify_data_change
 
-router = APIRouter()
+# orjson serializa date/datetime de forma nativa y mucho más rápido que json
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
-@router.get("/", response_model=list[ClassResponse])
+async def _raise_class_access_error(db: AsyncSession, class_id: int, detail: str):
+    """
+    Lanzar 404 o 403 cuando la consulta filtrada por pertenencia no devolvió la clase
+
+    Args:
+        db: Sesión de base de datos
+        class_id: ID de la clase solicitada
+        detail: Mensaje para el caso 403
+
+    Raises:
+        404: Si la clase no existe
+        403: Si la clase existe pero no pertenece al profesor
+    """
+    if not await class_crud.exists_by_id(db, class_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Clase {class_id} no encontrada"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
+    )
+
+
+@router.get("/", response_model=PaginatedClasses)
 async def list_classes(
     skip: int = Query(0, ge=0, description="Registros a saltar"),
     limit: int = Query(100, ge=1, le=100, description="Máximo de registros"),
@@ -29,6 +58,7 @@ async def list_classes(
     Listar todas las clases del profesor logueado
     
     Ordenadas por fecha más reciente primero
+    Incluye el total de clases para la UI de paginación (misma consulta)
     
     Args:
         skip: Cantidad de registros a saltar (paginación)
@@ -37,20 +67,26 @@ async def list_classes(
         current_teacher: Profesor autenticado (desde JWT)
     
     Returns:
-        Lista de clases del profesor
+        {items: clases de la página, total: total de clases del profesor}
     """
-    classes = await class_crud.get_multi(
+    classes, total = await class_crud.get_multi_with_total(
         db,
         teacher_id=current_teacher.id,
         skip=skip,
         limit=limit
     )
     
-    return classes
+    # Validación + serialización en una sola pasada
+    # (response_model queda solo para la documentación OpenAPI)
+    page = PaginatedClasses.model_validate(
+        {"items": classes, "total": total}, from_attributes=True
+    )
+    return Response(content=page.model_dump_json(), media_type="application/json")
 
 
 @router.get("/calendar", response_model=list[ClassResponse])
 async def get_classes_by_date_range(
+    request: Request,
     start_date: date = Query(..., description="Fecha inicio (YYYY-MM-DD)"),
     end_date: date = Query(..., description="Fecha fin (YYYY-MM-DD)"),
     db: AsyncSession = Depends(get_db),
@@ -62,18 +98,32 @@ async def get_classes_by_date_range(
     Útil para mostrar calendario mensual/semanal
     Ordenadas por fecha y hora
     
+    Soporta ETag: si el cliente envía If-None-Match con la versión vigente
+    se responde 304 sin cargar ni serializar las clases.
+    
     Args:
+        request: Request (para leer If-None-Match)
         start_date: Fecha inicio (inclusiva)
         end_date: Fecha fin (inclusiva)
         db: Sesión de base de datos
         current_teacher: Profesor autenticado (desde JWT)
     
     Returns:
-        Lista de clases en el rango de fechas
+        Lista de clases en el rango de fechas (o 304 Not Modified)
     
     Example:
         GET /api/v1/classes/calendar?start_date=2025-02-01&end_date=2025-02-28
     """
+    version = await class_crud.get_date_range_version(
+        db,
+        teacher_id=current_teacher.id,
+        start_date=start_date,
+        end_date=end_date
+    )
+    etag = compute_etag("calendar", current_teacher.id, start_date, end_date, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     classes = await class_crud.get_by_date_range(
         db,
         teacher_id=current_teacher.id,
@@ -81,7 +131,14 @@ async def get_classes_by_date_range(
         end_date=end_date
     )
     
-    return classes
+    # Validación + serialización de la lista completa en una sola pasada
+    # (response_model queda solo para la documentación OpenAPI)
+    payload = CLASS_LIST_ADAPTER.dump_json(
+        CLASS_LIST_ADAPTER.validate_python(classes, from_attributes=True)
+    )
+    json_response = Response(content=payload, media_type="application/json")
+    set_etag(json_response, etag)
+    return json_response
 
 
 @router.post("/", response_model=ClassResponse, status_code=status.HTTP_201_CREATED)
@@ -110,10 +167,14 @@ async def create_class(
         400: Si el enrollment no existe, no pertenece al profesor,
              o falta enrollment_id para type regular/recovery
     """
+    # Organización del profesor destino + dueño del enrollment en una sola consulta
+    target_org_id, enrollment_teacher_id = await class_crud.get_assignment_context(
+        db, class_data.teacher_id, class_data.enrollment_id
+    )
+
     # Validar teacher_id y enrollment_id según permisos
     if current_teacher.organization_id:
-        target_teacher = await db.get(Teacher, class_data.teacher_id)
-        if not target_teacher or target_teacher.organization_id != current_teacher.organization_id:
+        if target_org_id != current_teacher.organization_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No tienes permiso para asignar esta clase al profesor seleccionado"
@@ -126,15 +187,13 @@ async def create_class(
             )
 
     if class_data.enrollment_id is not None:
-        enrollment_obj = await enrollment.get(db, class_data.enrollment_id)
-
-        if not enrollment_obj:
+        if enrollment_teacher_id is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Inscripción {class_data.enrollment_id} no encontrada"
             )
 
-        if class_data.teacher_id != enrollment_obj.teacher_id:
+        if class_data.teacher_id != enrollment_teacher_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El profesor seleccionado no coincide con la inscripción"
@@ -183,23 +242,25 @@ async def create_recovery_class(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="enrollment_id es obligatorio para crear recuperaciones"
         )
-    enrollment_obj = await enrollment.get(db, class_data.enrollment_id)
+    # Dueño del enrollment + organización del profesor destino en una sola consulta
+    target_org_id, enrollment_teacher_id = await class_crud.get_assignment_context(
+        db, class_data.teacher_id, class_data.enrollment_id
+    )
     
-    if not enrollment_obj:
+    if enrollment_teacher_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Inscripción {class_data.enrollment_id} no encontrada"
         )
 
-    if class_data.teacher_id != enrollment_obj.teacher_id:
+    if class_data.teacher_id != enrollment_teacher_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El profesor seleccionado no coincide con la inscripción"
         )
 
     if current_teacher.organization_id:
-        target_teacher = await db.get(Teacher, class_data.teacher_id)
-        if not target_teacher or target_teacher.organization_id != current_teacher.organization_id:
+        if target_org_id != current_teacher.organization_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No tienes permiso para asignar esta clase al profesor seleccionado"
@@ -229,45 +290,49 @@ async def create_recovery_class(
 @router.get("/{class_id}", response_model=ClassResponse)
 async def get_class(
     class_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """
     Obtener una clase específica por ID
     
+    Soporta ETag (basado en updated_at de la clase y sus relaciones anidadas):
+    si el cliente ya tiene la versión vigente se responde 304 sin body.
+    
     Args:
         class_id: ID de la clase
+        request: Request (para leer If-None-Match)
+        response: Response (para agregar el header ETag)
         db: Sesión de base de datos
         current_teacher: Profesor autenticado (desde JWT)
     
     Returns:
-        Datos de la clase
+        Datos de la clase (o 304 Not Modified)
     
     Raises:
         404: Si la clase no existe
         403: Si la clase no pertenece al profesor
     """
-    class_obj = await class_crud.get(db, class_id)
+    # Fetch + pertenencia en una sola consulta
+    class_obj = await class_crud.get_for_teacher(db, class_id, current_teacher)
     
     if not class_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Clase {class_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, class_obj.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta clase"
-            )
-    else:
-        if class_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta clase"
-            )
+        await _raise_class_access_error(db, class_id, "No tienes permiso para ver esta clase")
+    
+    enrollment_obj = class_obj.enrollment
+    etag = compute_etag(
+        "class",
+        class_obj.id,
+        class_obj.updated_at,
+        class_obj.attendance.updated_at if class_obj.attendance else None,
+        enrollment_obj.updated_at if enrollment_obj else None,
+        enrollment_obj.student.updated_at if enrollment_obj and enrollment_obj.student else None,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     
     return class_obj
 
@@ -301,39 +366,18 @@ async def update_class(
         403: Si la clase no pertenece al profesor
         400: Si se intenta cambiar el campo 'type'
     """
-    # Verificar que existe y pertenece al profesor
-    class_obj = await class_crud.get(db, class_id)
-    
-    if not class_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Clase {class_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, class_obj.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar esta clase"
-            )
-    else:
-        if class_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar esta clase"
-            )
-    
-    # Actualizar (el CRUD bloquea cambio de 'type')
+    # Actualizar filtrando por pertenencia en el mismo UPDATE ... RETURNING
+    # (el CRUD bloquea cambio de 'type')
     try:
-        updated_class = await class_crud.update(db, class_id, class_data)
-        if not updated_class:
-            raise ValueError("No se encontró la clase para actualizar")
+        updated_class = await class_crud.update(db, class_id, class_data, teacher=current_teacher)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    
+    if not updated_class:
+        await _raise_class_access_error(db, class_id, "No tienes permiso para actualizar esta clase")
     await notify_data_change(updated_class.teacher_id, "class", "update", updated_class.id)
     
     return updated_class
@@ -364,33 +408,13 @@ async def cancel_class(
         404: Si la clase no existe
         403: Si la clase no pertenece al profesor
     """
-    # Verificar que existe y pertenece al profesor
-    class_obj = await class_crud.get(db, class_id)
+    # Cancelar filtrando por pertenencia en el mismo UPDATE ... RETURNING
+    cancelled_class = await class_crud.cancel(db, class_id, teacher=current_teacher)
     
-    if not class_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Clase {class_id} no encontrada"
-        )
+    if not cancelled_class:
+        await _raise_class_access_error(db, class_id, "No tienes permiso para cancelar esta clase")
     
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, class_obj.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para cancelar esta clase"
-            )
-    else:
-        if class_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para cancelar esta clase"
-            )
-    
-    # Cancelar
-    cancelled_class = await class_crud.cancel(db, class_id)
-    if cancelled_class:
-        await notify_data_change(cancelled_class.teacher_id, "class", "cancel", cancelled_class.id)
+    await notify_data_change(cancelled_class.teacher_id, "class", "cancel", cancelled_class.id)
     
     return cancelled_class
 
@@ -421,34 +445,17 @@ async def delete_recovery_class(
         403: Si la clase no pertenece al profesor
         400: Si no es recovery o tiene attendance marcado
     """
-    # Verificar que existe y pertenece al profesor
-    class_obj = await class_crud.get(db, class_id)
+    # Verificar que existe y pertenece al profesor (una sola consulta)
+    class_obj = await class_crud.get_for_teacher(db, class_id, current_teacher)
     
     if not class_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Clase {class_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        class_teacher = await db.get(Teacher, class_obj.teacher_id)
-        if not class_teacher or class_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar esta clase"
-            )
-    else:
-        if class_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar esta clase"
-            )
+        await _raise_class_access_error(db, class_id, "No tienes permiso para eliminar esta clase")
     
     teacher_id = class_obj.teacher_id
 
     # Eliminar (el CRUD valida que sea recovery y no tenga attendance)
     try:
-        success = await class_crud.delete_recovery(db, class_id)
+        success = await class_crud.delete_recovery(db, class_id, class_obj=class_obj)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -9,25 +9,30 @@ Endpoints completos para gestionar inscripciones incluyendo:
 """
 
 # pyrefly: ignore [missing-import]
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import ORJSONResponse
 # pyrefly: ignore [missing-import]
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 from typing import Optional
+import logging
 import re
 # pyrefly: ignore [missing-import]
 from pydantic import BaseModel
 
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_cursor
 from app.core.security import get_current_teacher
-from app.crud import enrollment, student, instrument
+from app.crud import enrollment, instrument
 from app.models.teacher import Teacher
 from app.models.enrollment import Enrollment
 from app.api.v1.websocket import notify_data_change
 # pyrefly: ignore [missing-import]
 from sqlalchemy import select, and_, or_
 # pyrefly: ignore [missing-import]
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import noload
+# pyrefly: ignore [missing-import]
+from sqlalchemy import inspect as sa_inspect
 from app.schemas.enrollment import (
     EnrollmentCreate,
     EnrollmentUpdate,
@@ -36,6 +41,9 @@ from app.schemas.enrollment import (
     EnrollmentReactivateRequest,
     EnrollmentSuspendResponse,
     EnrollmentReactivateResponse,
+    EnrollmentBatchSuspendRequest,
+    EnrollmentBatchSuspendResponse,
+    ENROLLMENT_LIST_ADAPTER,
 )
 from app.schemas.credit_transaction import CreditTransactionResponse, LicenseRecoveryStatus
 from app.models.attendance import AttendanceStatus
@@ -51,25 +59,106 @@ from app.models.enrollment import EnrollmentStatus
 # pyrefly: ignore [missing-import]
 from sqlalchemy import update as sa_update
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Helper function to enrich enrollment with computed fields
 async def enrich_enrollment(db: AsyncSession, enrollment_obj: Enrollment | None) -> Enrollment | None:
-    """Add teacher_name and instrument_name as computed fields to the enrollment object"""
+    """
+    Add teacher_name and instrument_name as computed fields to the enrollment object
+
+    Usa las relaciones ya cargadas (selectin por defecto, o las opciones de
+    carga de los listados); solo consulta si alguna de las dos no está cargada.
+    """
     if enrollment_obj is None:
         return None
 
-    result = await db.execute(
-        select(Enrollment)
-        .options(joinedload(Enrollment.teacher), joinedload(Enrollment.instrument))
-        .where(Enrollment.id == enrollment_obj.id)
+    unloaded = sa_inspect(enrollment_obj).unloaded
+    if "teacher" in unloaded or "instrument" in unloaded:
+        await db.refresh(enrollment_obj, attribute_names=["teacher", "instrument"])
+
+    # Usar setattr para agregar atributos dinámicamente (no están en el modelo pero están en el schema)
+    setattr(enrollment_obj, 'teacher_name', enrollment_obj.teacher.name if enrollment_obj.teacher else None)
+    setattr(enrollment_obj, 'instrument_name', enrollment_obj.instrument.name if enrollment_obj.instrument else None)
+    return enrollment_obj
+
+
+def _enrollment_list_response(enrollments: list[Enrollment]) -> Response:
+    """
+    Serializar una lista de inscripciones directamente a JSON
+
+    Devolver un Response evita que FastAPI vuelva a validar cada elemento
+    contra response_model (que se mantiene solo para la documentación).
+
+    Args:
+        enrollments: Inscripciones ya enriquecidas (teacher_name, instrument_name)
+
+    Returns:
+        Response application/json
+    """
+    payload = ENROLLMENT_LIST_ADAPTER.dump_json(
+        ENROLLMENT_LIST_ADAPTER.validate_python(enrollments, from_attributes=True)
     )
-    enriched = result.scalar_one_or_none()
-    if enriched:
-        # Usar setattr para agregar atributos dinámicamente (no están en el modelo pero están en el schema)
-        setattr(enriched, 'teacher_name', enriched.teacher.name if enriched.teacher else None)
-        setattr(enriched, 'instrument_name', enriched.instrument.name if enriched.instrument else None)
-        return enriched
+    return Response(content=payload, media_type="application/json")
+
+
+async def _raise_enrollment_access_error(
+    db: AsyncSession,
+    enrollment_id: int,
+    detail: str
+) -> None:
+    """
+    Resolver 404 vs 403 cuando la verificación de pertenencia falla
+
+    Solo se ejecuta en el camino de error: el caso normal ya quedó
+    resuelto con el predicado de pertenencia dentro de la consulta.
+
+    Args:
+        db: Sesión de base de datos
+        enrollment_id: ID de la inscripción
+        detail: Mensaje para el caso 403
+
+    Raises:
+        404: Si la inscripción no existe
+        403: Si existe pero no pertenece al profesor
+    """
+    if not await enrollment.exists_by_id(db, enrollment_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Inscripción {enrollment_id} no encontrada"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
+    )
+
+
+async def _get_owned_enrollment(
+    db: AsyncSession,
+    enrollment_id: int,
+    current_teacher: Teacher,
+    detail: str
+) -> Enrollment:
+    """
+    Obtener una inscripción verificando pertenencia en la misma consulta
+
+    Args:
+        db: Sesión de base de datos
+        enrollment_id: ID de la inscripción
+        current_teacher: Profesor autenticado
+        detail: Mensaje para el caso 403
+
+    Returns:
+        Enrollment del profesor (o de su organización)
+
+    Raises:
+        404: Si la inscripción no existe
+        403: Si existe pero no pertenece al profesor
+    """
+    enrollment_obj = await enrollment.get_for_teacher(db, enrollment_id, current_teacher)
+    if not enrollment_obj:
+        await _raise_enrollment_access_error(db, enrollment_id, detail)
     return enrollment_obj
 
 
@@ -79,13 +168,20 @@ async def enrich_enrollment(db: AsyncSession, enrollment_obj: Enrollment | None)
 
 @router.get("/", response_model=list[EnrollmentResponse])
 async def list_enrollments(
-    skip: int = Query(0, ge=0, description="Registros a saltar"),
+    skip: int = Query(0, ge=0, description="Registros a saltar (obsoleto, usar cursor)"),
     limit: int = Query(100, ge=1, le=100, description="Máximo de registros"),
+    cursor: str | None = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
     teacher_id: int | None = Query(None, description="ID del profesor para filtrar inscripciones"),
     db: AsyncSession = Depends(get_db),
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
-    """Listar todas las inscripciones del profesor o de un profesor específico en la misma organización"""
+    """
+    Listar todas las inscripciones del profesor o de un profesor específico en la misma organización
+
+    Paginación por cursor: si hay más resultados, la respuesta incluye el
+    header X-Next-Cursor; se envía como `cursor` para pedir la página siguiente.
+    El body sigue siendo la lista de inscripciones.
+    """
     if teacher_id is not None:
         if current_teacher.organization_id:
             teacher_obj = await db.get(Teacher, teacher_id)
@@ -103,20 +199,26 @@ async def list_enrollments(
     else:
         target_teacher_id = current_teacher.id
 
-    enrollments = await enrollment.get_multi(
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Postgres arma el JSON de la página (json_agg) y detecta si hay página siguiente
+    payload, next_key = await enrollment.get_multi_json(
         db,
         teacher_id=target_teacher_id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    # Enriquecer con teacher_name e instrument_name para la respuesta
-    enriched_enrollments = []
-    for e in enrollments:
-        enriched = await enrich_enrollment(db, e)
-        if enriched:
-            enriched_enrollments.append(enriched)
 
-    return enriched_enrollments
+    json_response = Response(content=payload, media_type="application/json")
+    if next_key:
+        json_response.headers["X-Next-Cursor"] = encode_cursor(*next_key)
+    return json_response
 
 
 @router.post("/", response_model=EnrollmentResponse, status_code=status.HTTP_201_CREATED)
@@ -126,34 +228,38 @@ async def create_enrollment(
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """Crear una inscripción nueva"""
+    # Alumno, profesores e instrumento en una sola consulta
+    ctx = await enrollment.get_create_context(
+        db,
+        student_id=enrollment_data.student_id,
+        instrument_id=enrollment_data.instrument_id,
+        selected_teacher_id=enrollment_data.teacher_id if current_teacher.organization_id else None
+    )
+
     # Validar que el alumno existe y pertenece al profesor
-    student_obj = await student.get(db, enrollment_data.student_id)
-    
-    if not student_obj:
+    if ctx.student_teacher_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Alumno {enrollment_data.student_id} no encontrado"
         )
 
     if current_teacher.organization_id:
-        student_teacher = await db.get(Teacher, student_obj.teacher_id)
-        if not student_teacher or student_teacher.organization_id != current_teacher.organization_id:
+        if ctx.student_teacher_org_id != current_teacher.organization_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No tienes permiso para inscribir este alumno"
             )
 
         if enrollment_data.teacher_id is not None:
-            selected_teacher = await db.get(Teacher, enrollment_data.teacher_id)
-            if not selected_teacher or selected_teacher.organization_id != current_teacher.organization_id:
+            if ctx.selected_teacher_org_id != current_teacher.organization_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="No tienes permiso para crear una inscripción para el profesor seleccionado"
                 )
         else:
-            enrollment_data.teacher_id = student_obj.teacher_id
+            enrollment_data.teacher_id = ctx.student_teacher_id
     else:
-        if student_obj.teacher_id != current_teacher.id:
+        if ctx.student_teacher_id != current_teacher.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No tienes permiso para inscribir este alumno"
@@ -161,18 +267,16 @@ async def create_enrollment(
         enrollment_data.teacher_id = current_teacher.id
 
     # Validar que el instrumento existe y está activo
-    instrument_obj = await instrument.get(db, enrollment_data.instrument_id)
-    
-    if not instrument_obj:
+    if ctx.instrument_name is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Instrumento {enrollment_data.instrument_id} no encontrado"
         )
     
-    if not instrument_obj.active:
+    if not ctx.instrument_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"El instrumento '{instrument_obj.name}' no está disponible"
+            detail=f"El instrumento '{ctx.instrument_name}' no está disponible"
         )
     
     # NO sobrescribir teacher_id aquí: ya fue validado arriba
@@ -193,7 +297,9 @@ async def get_student_enrollments(
     """Obtener todas las inscripciones de un alumno"""
     # Sin filtrar por active — el admin puede ver inscripciones de alumnos inactivos
     from app.models.student import Student as StudentModel
-    raw_result = await db.execute(select(StudentModel).where(StudentModel.id == student_id))
+    raw_result = await db.execute(
+        select(StudentModel).options(noload("*")).where(StudentModel.id == student_id)
+    )
     student_obj = raw_result.scalar_one_or_none()
 
     if not student_obj:
@@ -227,7 +333,7 @@ async def get_student_enrollments(
         if enriched:
             enriched_enrollments.append(enriched)
 
-    return enriched_enrollments
+    return _enrollment_list_response(enriched_enrollments)
 
 
 @router.get("/{enrollment_id}", response_model=EnrollmentResponse)
@@ -237,27 +343,11 @@ async def get_enrollment(
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """Obtener una inscripción específica por ID"""
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para ver esta inscripción"
+    )
 
     enriched = await enrich_enrollment(db, enrollment_obj)
     if enriched:
@@ -276,27 +366,11 @@ async def update_enrollment(
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """Actualizar una inscripción existente"""
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para actualizar esta inscripción"
+    )
     
     # Validar nuevo instrumento si se está cambiando
     if enrollment_data.instrument_id is not None:
@@ -360,7 +434,7 @@ async def update_enrollment(
     # 1. Reactivar schedules (asumimos que quiere recuperar su horario anterior)
     # 2. Generar clases
     if is_reactivating:
-        print(f"🔄 [UpdateEnrollment] Reactivación manual detectada para Enrollment {enrollment_id}")
+        logger.info("update_enrollment: reactivación manual detectada para enrollment %s", enrollment_id)
         
         # 1. Reactivar sólo los schedules que estaban vigentes al momento de la suspensión
         #    Evitar reactivar schedules históricos anteriores que sólo existen para historial.
@@ -392,9 +466,9 @@ async def update_enrollment(
         )
         
         if "error" in gen_result:
-            print(f"⚠️ [UpdateEnrollment] Error generando clases: {gen_result['error']}")
+            logger.warning("update_enrollment: error generando clases: %s", gen_result["error"])
         else:
-            print(f"✅ [UpdateEnrollment] Clases generadas: {gen_result['created']}")
+            logger.debug("update_enrollment: clases generadas: %s", gen_result["created"])
             
         # Commit final (aunque update() ya hizo uno, necesitamos guardar los schedules y classes)
         await db.commit()
@@ -406,7 +480,7 @@ async def update_enrollment(
         from app.models.class_model import Class, ClassStatus, ClassType
         from app.models.attendance import Attendance
 
-        print(f"📅 [UpdateEnrollment] enrolled_date cambió: {old_enrolled_date} → {new_enrolled_date}")
+        logger.info("update_enrollment: enrolled_date cambió: %s -> %s", old_enrolled_date, new_enrolled_date)
 
         # Actualizar valid_from de todos los schedules activos para que coincida
         await db.execute(
@@ -440,7 +514,7 @@ async def update_enrollment(
                     )
                 )
             )
-            print(f"✅ [UpdateEnrollment] {del_result.rowcount} clases eliminadas antes de la nueva fecha")
+            logger.debug("update_enrollment: %s clases eliminadas antes de la nueva fecha", del_result.rowcount)
 
         # Siempre generar clases faltantes desde la nueva fecha (idempotente: salta las existentes)
         gen_result = await generate_classes_for_enrollment(
@@ -449,7 +523,7 @@ async def update_enrollment(
             months_ahead=2,
             from_date=new_enrolled_date,
         )
-        print(f"✅ [UpdateEnrollment] Clases generadas tras cambio de fecha: {gen_result.get('created', 0)}")
+        logger.debug("update_enrollment: clases generadas tras cambio de fecha: %s", gen_result.get("created", 0))
         await db.commit()
 
     if updated_enrollment:
@@ -464,27 +538,11 @@ async def delete_enrollment(
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """Eliminar una inscripción FÍSICAMENTE (hard-delete)"""
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para eliminar esta inscripción"
+    )
         
     teacher_id = enrollment_obj.teacher_id
 
@@ -525,35 +583,13 @@ async def suspend_enrollment_put(
     - Crea registro en suspension_history
     """
     from app.crud.enrollment import validate_suspension, suspend_enrollment as suspend_enroll_crud
-    from app.models.enrollment import Enrollment, EnrollmentStatus
+    from app.models.enrollment import EnrollmentStatus
 
-    # Verificar que enrollment existe
-    enroll_result = await db.execute(
-        select(Enrollment).where(
-            Enrollment.id == enrollment_id
-        )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para realizar esta acción"
     )
-    enrollment_obj = enroll_result.scalar_one_or_none()
-
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Enrollment no encontrado"
-        )
-
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para realizar esta acción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para realizar esta acción"
-            )
 
     if enrollment_obj.status == EnrollmentStatus.SUSPENDED:
         raise HTTPException(
@@ -646,41 +682,19 @@ async def suspend_enrollment_endpoint(
     - Guarda fecha de suspensión y motivo (opcional)
     - ELIMINA todas las clases futuras (scheduled)
     """
-    # Verificar permisos
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para suspender esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para suspender esta inscripción"
-            )
-    
-    # Ejecutar suspensión
+    # Ejecutar suspensión (la pertenencia se verifica dentro del mismo UPDATE)
     result = await enrollment.suspend(
         db,
         enrollment_id,
         reason=request.reason,
-        until_date=request.suspended_until
+        until_date=request.suspended_until,
+        teacher=current_teacher
     )
     
-    if "error" in result and result["enrollment"] is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=result["error"]
+    if result["enrollment"] is None:
+        await _raise_enrollment_access_error(
+            db, enrollment_id,
+            "No tienes permiso para suspender esta inscripción"
         )
     
     suspended = result["enrollment"]
@@ -695,6 +709,48 @@ async def suspend_enrollment_endpoint(
     )
 
 
+@router.post("/batch-suspend", response_model=EnrollmentBatchSuspendResponse)
+async def batch_suspend_enrollments(
+    request: EnrollmentBatchSuspendRequest,
+    db: AsyncSession = Depends(get_db),
+    current_teacher: Teacher = Depends(get_current_teacher)
+):
+    """
+    Suspender varias inscripciones en una sola operación (fin de ciclo, etc).
+
+    Mismas acciones que POST /{id}/suspend, en un único UPDATE para todo el
+    lote. Las inscripciones inexistentes, ajenas o ya suspendidas no se
+    modifican y se devuelven en skipped_ids.
+    """
+    requested_ids = list(dict.fromkeys(request.enrollment_ids))
+
+    result = await enrollment.suspend_many(
+        db,
+        requested_ids,
+        teacher=current_teacher,
+        reason=request.reason,
+        until_date=request.suspended_until
+    )
+
+    suspended_ids = [enrollment_id for enrollment_id, _ in result["suspended"]]
+    suspended_set = set(suspended_ids)
+    skipped_ids = [enrollment_id for enrollment_id in requested_ids if enrollment_id not in suspended_set]
+
+    # Una notificación por profesor afectado (no una por inscripción)
+    for teacher_id in {teacher_id for _, teacher_id in result["suspended"]}:
+        await notify_data_change(teacher_id, "enrollment", "suspend")
+
+    return EnrollmentBatchSuspendResponse(
+        suspended_ids=suspended_ids,
+        skipped_ids=skipped_ids,
+        classes_deleted=result["classes_deleted"],
+        message=(
+            f"{len(suspended_ids)} inscripciones suspendidas. "
+            f"Se eliminaron {result['classes_deleted']} clases futuras."
+        )
+    )
+
+
 @router.put("/{enrollment_id}/reactivate", status_code=status.HTTP_200_OK)
 async def reactivate_enrollment_put(
     enrollment_id: int,
@@ -718,38 +774,16 @@ async def reactivate_enrollment_put(
     """
     from app.crud.enrollment import reactivate_enrollment as reactivate_enroll_crud
     from app.crud.schedule import check_schedule_availability_dates
-    from app.models.enrollment import Enrollment, EnrollmentStatus
+    from app.models.enrollment import EnrollmentStatus
     from app.models.class_model import Class
     # pyrefly: ignore [missing-import]
-    from sqlalchemy import select, and_
+    from sqlalchemy import and_
 
-    # Verificar enrollment
-    enroll_result = await db.execute(
-        select(Enrollment).where(
-            Enrollment.id == enrollment_id
-        )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para realizar esta acción"
     )
-    enrollment_obj = enroll_result.scalar_one_or_none()
-
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Enrollment no encontrado"
-        )
-
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para realizar esta acción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para realizar esta acción"
-            )
 
     if enrollment_obj.status != EnrollmentStatus.SUSPENDED:
         raise HTTPException(
@@ -891,28 +925,11 @@ async def reactivate_enrollment(
     2. Si hay conflicto → retorna error con lista de conflictos
     3. Si está disponible → activa y genera clases
     """
-    # Verificar permisos
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para reactivar esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para reactivar esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para reactivar esta inscripción"
+    )
     
     # Ejecutar reactivación
     result = await enrollment.reactivate(
@@ -966,36 +983,13 @@ async def withdraw_enrollment(
     - Desactiva los schedules
     - Mantiene historial de clases pasadas
     """
-    # Verificar permisos
-    enrollment_obj = await enrollment.get(db, enrollment_id)
+    # Ejecutar retiro (la pertenencia se verifica dentro del mismo UPDATE)
+    result = await enrollment.withdraw(db, enrollment_id, teacher=current_teacher)
     
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para retirar esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para retirar esta inscripción"
-            )
-    
-    # Ejecutar retiro
-    result = await enrollment.withdraw(db, enrollment_id)
-    
-    if "error" in result and result["enrollment"] is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=result["error"]
+    if result["enrollment"] is None:
+        await _raise_enrollment_access_error(
+            db, enrollment_id,
+            "No tienes permiso para retirar esta inscripción"
         )
     
     withdrawn = result["enrollment"]
@@ -1025,25 +1019,11 @@ async def add_partial_recovery(
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """Agregar una sesión parcial de recuperación al enrollment."""
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para modificar esta inscripción"
+    )
 
     date_str = session.date
     time_str = session.time
@@ -1119,25 +1099,11 @@ async def delete_partial_recovery(
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """Eliminar una sesión parcial de recuperación por índice."""
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para modificar esta inscripción"
+    )
 
     # Asegurarse que enrollment_obj no es None para el type checker
     if enrollment_obj is None:
@@ -1178,25 +1144,11 @@ async def clear_partial_recoveries(
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """Limpiar todas las sesiones parciales de recuperación."""
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    enrollment_obj = await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para modificar esta inscripción"
+    )
 
     # Asegurarse que enrollment_obj no es None para el type checker
     if enrollment_obj is None:
@@ -1236,27 +1188,11 @@ async def check_schedule_availability(
     Returns:
         Lista de conflictos (vacía si todo está disponible)
     """
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para ver esta inscripción"
+    )
     
     conflicts = await enrollment.check_schedule_availability(
         db,
@@ -1304,27 +1240,11 @@ async def get_credit_transactions(
     from sqlalchemy import case, literal
 
     # Verificar que la inscripción existe y pertenece al profesor
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para ver esta inscripción"
+    )
 
     # Query con JOIN condicional para resolver class_date según reference_type
     ClassAlias = aliased(ClassModel)
@@ -1406,27 +1326,11 @@ async def get_license_recovery_status(
     from app.models.class_model import Class
 
     # Verificar que la inscripción existe y pertenece al profesor
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
+    # Existencia y pertenencia en una sola consulta
+    await _get_owned_enrollment(
+        db, enrollment_id, current_teacher,
+        "No tienes permiso para ver esta inscripción"
+    )
 
     # 1. Obtener todas las asistencias tipo 'license' del enrollment
     license_attendances_result = await db.execute(
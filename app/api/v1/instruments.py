@@ -5,6 +5,7 @@ Los instrumentos se crean con script seed, no hay POST desde la app
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -13,7 +14,7 @@ from app.crud import instrument
 from app.models.teacher import Teacher
 from app.schemas.instrument import InstrumentResponse
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.get("/", response_model=list[InstrumentResponse])
@@ -28,6 +29,9 @@ async def list_instruments(
     Solo retorna instrumentos activos (active=True)
     Ordenados alfabéticamente
     
+    Se sirve desde un cache en memoria con TTL de 5 minutos
+    (ver instrument.get_active_cached)
+    
     Args:
         db: Sesión de base de datos
         current_teacher: Profesor autenticado (validación de token)
@@ -42,7 +46,7 @@ async def list_instruments(
             {"id": 3, "name": "Canto", "active": true, ...}
         ]
     """
-    instruments = await instrument.get_active(db)
+    instruments = await instrument.get_active_cached(db)
     
     return instruments
 
@@ -9,18 +9,34 @@ Endpoints para ejecutar manualmente los jobs del sistema:
 """
 
 from datetime import date as date_type
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, async_session_maker
 from app.core.logging import log_event, Actions
 from app.core.security import get_current_teacher
+from app.core.limiter import limiter, teacher_key
 from app.core.scheduler import check_and_run_missed_job
 from app.models.teacher import Teacher
+from app.jobs.background import (
+    submit_job,
+    get_job,
+    exclusive,
+    claim_key,
+    release_key,
+    ensure_key_free,
+    JobAlreadyRunning,
+    MONTHLY_JOB_KEY,
+)
 from app.jobs.class_generator import (
     generate_classes_for_enrollment,
     generate_monthly_classes,
+    iter_monthly_generation,
+    accumulate_generation_stats,
     delete_future_classes_for_schedule,
     cancel_future_classes_for_enrollment,
     regenerate_classes_manual
@@ -29,6 +45,30 @@ from app.jobs.class_generator import (
 router = APIRouter()
 
 
+def _job_conflict(exc: JobAlreadyRunning) -> HTTPException:
+    """409 con el job_id en curso (si corre en segundo plano) para consultarlo."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": str(exc), "job_id": exc.job_id}
+    )
+
+
+def _monthly_job_idle(
+    current_teacher: Teacher = Depends(get_current_teacher)
+) -> Teacher:
+    """
+    Dependency: autentica y responde 409 si ya hay una generación mensual en curso.
+
+    Corre antes del decorador de slowapi (FastAPI resuelve las dependencias
+    antes de llamar al endpoint), así un 409 no consume el cupo por hora.
+    """
+    try:
+        ensure_key_free(MONTHLY_JOB_KEY)
+    except JobAlreadyRunning as e:
+        raise _job_conflict(e)
+    return current_teacher
+
+
 # ============================================
 # MODELOS DE REQUEST/RESPONSE
 # ============================================
@@ -52,10 +92,11 @@ class RegenerateClassesRequest(BaseModel):
 # GENERACIÓN MANUAL DE CLASES
 # ============================================
 
-@router.post("/generate-classes")
+@router.post("/generate-classes", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("1/hour", key_func=teacher_key)  # por profesor, no por IP
 async def trigger_monthly_class_generation(
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    request: Request,          # requerido por slowapi
+    current_teacher: Teacher = Depends(_monthly_job_idle)
 ):
     """
     Genera clases del próximo mes para todos los enrollments activos (MANUAL)
@@ -63,26 +104,135 @@ async def trigger_monthly_class_generation(
     Este endpoint ejecuta manualmente el job mensual que normalmente
     corre automáticamente día 10 de cada mes.
 
+    El job recorre todas las inscripciones y puede tardar minutos: se lanza
+    en segundo plano (con su propia sesión de BD) y se responde 202 de
+    inmediato. El resultado se consulta en GET /jobs/status/{job_id}.
+
     Útil para:
     - Testing
     - Generación inicial del sistema
     - Re-generar después de cambios masivos
 
+    Solo puede haber una generación mensual en curso (y como mucho una
+    llamada por hora por profesor): si ya hay una, responde 409 con su job_id.
+
     Returns:
-        Estadísticas de generación:
-        - created: Clases creadas
-        - skipped: Clases saltadas (duplicadas o feriados)
-        - enrollments_processed: Cantidad de inscripciones procesadas
-        - errors: Lista de errores si ocurrieron
+        job_id y estado inicial ('queued')
+
+    Raises:
+        409: Si ya hay una generación mensual en curso
+        429: Si el profesor superó el límite de 1 llamada por hora
     """
-    result = await generate_monthly_classes(db)
+    try:
+        job_id = submit_job("generate_monthly_classes", generate_monthly_classes, key=MONTHLY_JOB_KEY)
+    except JobAlreadyRunning as e:
+        raise _job_conflict(e)
 
     return {
-        "message": "Generación mensual completada",
-        "stats": result
+        "message": "Generación mensual en curso",
+        "job_id": job_id,
+        "status": "queued"
     }
 
 
+@router.post("/generate-classes/stream")
+@limiter.limit("1/hour", key_func=teacher_key)  # por profesor, no por IP
+async def stream_monthly_class_generation(
+    request: Request,          # requerido por slowapi
+    current_teacher: Teacher = Depends(_monthly_job_idle)
+):
+    """
+    Genera clases del próximo mes reportando el progreso en streaming (NDJSON)
+
+    Variante síncrona para admin/testing: cada línea es un JSON con el
+    resultado de un enrollment apenas se procesa, y la última línea trae
+    las estadísticas totales ({"done": true, "stats": {...}}).
+
+    El generador abre su propia sesión de BD: la sesión de la request
+    (Depends) se cierra antes de que termine de enviarse el body.
+
+    Comparte la key de coalescing con POST /generate-classes: si ya hay una
+    generación mensual en curso responde 409.
+
+    Returns:
+        StreamingResponse application/x-ndjson
+
+    Raises:
+        409: Si ya hay una generación mensual en curso
+        429: Si el profesor superó el límite de 1 llamada por hora
+    """
+    # La key se toma antes de responder (para poder devolver 409) y se libera
+    # al terminar el streaming (o en la background task si el generador nunca
+    # llegó a correr). Una sola liberación por request: la segunda llamada no
+    # debe soltar la key que otra generación tomó entretanto.
+    try:
+        claim_key(MONTHLY_JOB_KEY)
+    except JobAlreadyRunning as e:
+        raise _job_conflict(e)
+
+    key_held = True
+
+    def release_once() -> None:
+        nonlocal key_held
+        if key_held:
+            key_held = False
+            release_key(MONTHLY_JOB_KEY)
+
+    async def ndjson_progress():
+        total_stats = {
+            "created": 0,
+            "skipped": 0,
+            "enrollments_processed": 0,
+            "errors": []
+        }
+        try:
+            async with async_session_maker() as db:
+                async for enrollment_id, result in iter_monthly_generation(db):
+                    accumulate_generation_stats(total_stats, enrollment_id, result)
+                    yield orjson.dumps({
+                        "enrollment_id": enrollment_id,
+                        "created": result.get("created", 0),
+                        "skipped": result.get("skipped", 0),
+                        "error": result.get("error"),
+                    }) + b"\n"
+                await db.commit()
+        finally:
+            release_once()
+        yield orjson.dumps({"done": True, "stats": total_stats}) + b"\n"
+
+    return StreamingResponse(
+        ndjson_progress(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(release_once)
+    )
+
+
+@router.get("/status/{job_id}")
+async def get_job_status(
+    job_id: str,
+    current_teacher: Teacher = Depends(get_current_teacher)
+):
+    """
+    Estado de un job lanzado en segundo plano
+
+    Returns:
+        job_id, name, status (queued/running/completed/failed), timestamps,
+        result (estadísticas al completar) y error (si falló)
+
+    Raises:
+        404: Si el job no existe (o fue aceptado por otro worker)
+    """
+    job = get_job(job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} no encontrado"
+        )
+
+    return job
+
+
 @router.post("/check-missed-job")
 async def check_missed_job_endpoint(
     current_teacher: Teacher = Depends(get_current_teacher)
@@ -118,7 +268,7 @@ async def check_missed_job_endpoint(
 async def generate_for_specific_enrollment(
     enrollment_id: int,
     months: int = Query(default=2, ge=0, le=6, description="Meses adelante a generar (0-6)"),
-    from_date: str = Query(default=None, description="Fecha desde la cual generar (YYYY-MM-DD)"),
+    from_date: date_type | None = Query(default=None, description="Fecha desde la cual generar (YYYY-MM-DD)"),
     db: AsyncSession = Depends(get_db),
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
@@ -140,19 +290,14 @@ async def generate_for_specific_enrollment(
 
     Raises:
         400: Si el enrollment no existe o está inactivo
+        409: Si ya se están generando clases para este enrollment
     """
-    # Parsear from_date si se envía
-    from_date_obj = None
-    if from_date:
-        try:
-            from_date_obj = date_type.fromisoformat(from_date)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Formato de fecha inválido: {from_date}. Use YYYY-MM-DD"
-            )
-
-    result = await generate_classes_for_enrollment(db, enrollment_id, months, from_date_obj)
+    # from_date ya llega como date (FastAPI valida el formato y responde 422 si es inválido)
+    try:
+        async with exclusive(f"jobs:enroll:{enrollment_id}"):
+            result = await generate_classes_for_enrollment(db, enrollment_id, months, from_date)
+    except JobAlreadyRunning as e:
+        raise _job_conflict(e)
 
     if "error" in result:
         raise HTTPException(
@@ -269,7 +414,7 @@ async def regenerate_classes_endpoint(
 @router.delete("/schedules/{schedule_id}/future-classes")
 async def delete_schedule_future_classes(
     schedule_id: int,
-    from_date: str = Query(..., description="Fecha desde la cual eliminar (YYYY-MM-DD)"),
+    from_date: date_type = Query(..., description="Fecha desde la cual eliminar (YYYY-MM-DD)"),
     db: AsyncSession = Depends(get_db),
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
@@ -291,15 +436,7 @@ async def delete_schedule_future_classes(
     Example:
         DELETE /api/v1/jobs/schedules/1/future-classes?from_date=2025-11-01
     """
-    try:
-        date_obj = date_type.fromisoformat(from_date)
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Formato de fecha inválido: {from_date}. Use YYYY-MM-DD"
-        )
-
-    count = await delete_future_classes_for_schedule(db, schedule_id, date_obj)
+    count = await delete_future_classes_for_schedule(db, schedule_id, from_date)
 
     return {
         "message": f"{count} clases eliminadas exitosamente",
@@ -316,7 +453,7 @@ async def delete_schedule_future_classes(
 @router.post("/enrollments/{enrollment_id}/cancel-future-classes")
 async def cancel_enrollment_future_classes(
     enrollment_id: int,
-    from_date: str = Query(..., description="Fecha desde la cual cancelar (YYYY-MM-DD)"),
+    from_date: date_type = Query(..., description="Fecha desde la cual cancelar (YYYY-MM-DD)"),
     db: AsyncSession = Depends(get_db),
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
@@ -338,15 +475,7 @@ async def cancel_enrollment_future_classes(
     Example:
         POST /api/v1/jobs/enrollments/1/cancel-future-classes?from_date=2025-11-01
     """
-    try:
-        date_obj = date_type.fromisoformat(from_date)
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Formato de fecha inválido: {from_date}. Use YYYY-MM-DD"
-        )
-
-    count = await cancel_future_classes_for_enrollment(db, enrollment_id, date_obj)
+    count = await cancel_future_classes_for_enrollment(db, enrollment_id, from_date)
 
     return {
         "message": f"{count} clases canceladas exitosamente",
@@ -2,7 +2,8 @@
 Schedules endpoints - CRUD de horarios recurrentes (templates)
 """
 # pyrefly: ignore [missing-import]
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 # pyrefly: ignore [missing-import]
 from sqlalchemy.ext.asyncio import AsyncSession
 # pyrefly: ignore [missing-import]
@@ -10,15 +11,61 @@ from pydantic import BaseModel
 from datetime import date, time as time_module
 from typing import Optional
 
-from app.core.database import get_db
-from app.core.security import get_current_teacher
+from app.core.security import AuthCtx, TeacherPrincipal, get_auth_ctx
+from app.core.http_cache import compute_etag, etag_matches, set_etag, not_modified
+from app.core.pagination import encode_keyset, decode_keyset
 from app.crud import schedule, enrollment
 from app.models.teacher import Teacher
 from app.models.class_model import ClassFormat
-from app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse, ChangeScheduleRequest, ChangeScheduleResponse, ReactivateScheduleRequest, ReactivateScheduleResponse, RemoveScheduleRequest, RemoveScheduleResponse
+from app.models.schedule import Schedule, DayOfWeek
+from app.schemas.schedule import SCHEDULE_LIST_ADAPTER, ScheduleCreate, ScheduleUpdate, ScheduleResponse, ChangeScheduleRequest, ChangeScheduleResponse, ReactivateScheduleRequest, ReactivateScheduleResponse, RemoveScheduleRequest, RemoveScheduleResponse
 from app.api.v1.websocket import notify_data_change
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+# ========================================
+# HELPERS DE PERTENENCIA
+# ========================================
+
+async def _get_owned_schedule(
+    db: AsyncSession,
+    schedule_id: int,
+    current_teacher: TeacherPrincipal,
+    detail: str
+) -> Schedule:
+    """
+    Obtener un horario verificando pertenencia en la misma consulta
+
+    Solo si la consulta no devuelve nada se hace una segunda (exists) para
+    distinguir 404 de 403.
+
+    Args:
+        db: Sesión de base de datos
+        schedule_id: ID del horario
+        current_teacher: Profesor autenticado
+        detail: Mensaje para el caso 403
+
+    Returns:
+        Schedule del profesor (o de su organización)
+
+    Raises:
+        404: Si el horario no existe
+        403: Si existe pero no pertenece al profesor
+    """
+    schedule_obj = await schedule.get_for_teacher(db, schedule_id, current_teacher)
+    if schedule_obj:
+        return schedule_obj
+
+    if not await schedule.exists_by_id(db, schedule_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Horario {schedule_id} no encontrado"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
+    )
 
 
 # Schema para la respuesta de validación de slot
@@ -33,66 +80,106 @@ class SlotValidationResponse(BaseModel):
 
 @router.get("/", response_model=list[ScheduleResponse])
 async def list_schedules(
-    skip: int = Query(0, ge=0, description="Registros a saltar"),
+    request: Request,
+    skip: int = Query(0, ge=0, description="Registros a saltar (obsoleto, usar cursor)"),
     limit: int = Query(100, ge=1, le=100, description="Máximo de registros"),
+    cursor: str | None = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
     teacher_id: int | None = Query(None, description="ID del profesor para filtrar horarios"),
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Listar todos los horarios del profesor logueado
     
     Ordenados por día de semana y hora de inicio
     
+    Paginación por cursor: si hay más resultados, la respuesta incluye el
+    header X-Next-Cursor; se envía como `cursor` para pedir la página siguiente.
+    
+    Soporta ETag: si el cliente envía If-None-Match con la versión vigente
+    se responde 304 sin cargar ni serializar los horarios.
+    
     Args:
-        skip: Cantidad de registros a saltar (paginación)
+        request: Request (para leer If-None-Match)
+        skip: Cantidad de registros a saltar (obsoleto, usar cursor)
         limit: Cantidad máxima de registros a retornar
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        cursor: Cursor opaco de la página siguiente
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
     
     Returns:
-        Lista de horarios (templates recurrentes) del profesor
+        Lista de horarios (templates recurrentes) del profesor (o 304 Not Modified)
     """
     if teacher_id is not None:
-        if current_teacher.organization_id:
-            teacher_obj = await db.get(Teacher, teacher_id)
-            if not teacher_obj or teacher_obj.organization_id != current_teacher.organization_id:
+        if ctx.teacher.organization_id:
+            teacher_obj = await ctx.db.get(Teacher, teacher_id)
+            if not teacher_obj or teacher_obj.organization_id != ctx.teacher.organization_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="No tienes permiso para ver los horarios de este profesor"
                 )
-        elif teacher_id != current_teacher.id:
+        elif teacher_id != ctx.teacher.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No tienes permiso para ver los horarios de otro profesor"
             )
         target_teacher_id = teacher_id
     else:
-        target_teacher_id = current_teacher.id
-
+        target_teacher_id = ctx.teacher.id
+
+    after = None
+    if cursor:
+        try:
+            last_day, last_time, last_id = decode_keyset(cursor, 3)
+            after = (DayOfWeek(last_day), time_module.fromisoformat(last_time), int(last_id))
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginación inválido") from e
+
+    version = await schedule.get_multi_version(ctx.db, teacher_id=target_teacher_id)
+    etag = compute_etag("schedules", target_teacher_id, skip, limit, cursor, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # limit + 1: la fila extra solo indica si hay página siguiente
     schedules = await schedule.get_multi(
-        db,
+        ctx.db,
         teacher_id=target_teacher_id,
         skip=skip,
-        limit=limit
+        limit=limit + 1,
+        after=after
     )
-    
-    return schedules
+    has_more = len(schedules) > limit
+    schedules = schedules[:limit]
+
+    # Validación + serialización de la lista completa en una sola pasada
+    # (response_model queda solo para la documentación OpenAPI)
+    payload = SCHEDULE_LIST_ADAPTER.dump_json(
+        SCHEDULE_LIST_ADAPTER.validate_python(schedules, from_attributes=True)
+    )
+    json_response = Response(content=payload, media_type="application/json")
+    set_etag(json_response, etag)
+    if has_more:
+        last = schedules[-1]
+        json_response.headers["X-Next-Cursor"] = encode_keyset(
+            last.day.value, last.time.isoformat(), last.id
+        )
+    return json_response
 
 
 @router.get("/validate-slot", response_model=SlotValidationResponse)
 async def validate_slot(
-    day: str = Query(..., description="Día de la semana (monday, tuesday, etc)"),
-    time: str = Query(..., description="Hora (ej: 15:00)"),
-    format: str = Query(..., description="Formato (individual o group)"),
+    day: DayOfWeek = Query(..., description="Día de la semana (monday, tuesday, etc)"),
+    time: time_module = Query(..., description="Hora HH:MM[:SS] (ej: 15:00)"),
+    format: ClassFormat = Query(..., description="Formato (individual o group)"),
     teacher_id: int | None = Query(None, description="ID del profesor a validar. Si no se provee, usa el profesor autenticado"),
     duration: int = Query(45, ge=1, description="Duración de la clase en minutos (default: 45)"),
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Validar disponibilidad de un slot (día + hora) para inscribir un alumno
 
+    `day`, `time` y `format` se validan en la firma (enums y datetime.time):
+    un valor inválido se rechaza con 422 antes de ejecutar el handler, sin
+    tocar la BD.
+
     Reglas de validación:
     - Un horario puede ser SOLO individual O SOLO grupal (no mezclar)
     - Horarios grupales tienen límite de 4 alumnos
@@ -102,8 +189,7 @@ async def validate_slot(
         day: Día de la semana (monday, tuesday, wednesday, etc)
         time: Hora de inicio (formato: "15:00" o "15:00:00")
         format: Formato deseado ("individual" o "group")
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
 
     Returns:
         Información sobre disponibilidad del slot
@@ -121,41 +207,33 @@ async def validate_slot(
             "conflict": false
         }
     """
-    # Validar formato
-    try:
-        class_format = ClassFormat.INDIVIDUAL if format == "individual" else ClassFormat.GROUP
-    except:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Formato inválido. Debe ser 'individual' o 'group'"
-        )
-
     # Verificar disponibilidad
     # Si el admin no pasa teacher_id explícito, usar el del profesor autenticado
     # El admin DEBE pasar teacher_id para validar el horario del profesor correcto
     target_teacher_id = teacher_id
     if target_teacher_id is None:
-        if current_teacher.organization_id:
+        if ctx.teacher.organization_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El admin debe especificar teacher_id para validar disponibilidad"
             )
-        target_teacher_id = current_teacher.id
-    elif current_teacher.organization_id:
+        target_teacher_id = ctx.teacher.id
+    elif ctx.teacher.organization_id:
         # Verificar que el teacher_id solicitado pertenece a la misma org
-        target_teacher = await db.get(Teacher, target_teacher_id)
-        if not target_teacher or target_teacher.organization_id != current_teacher.organization_id:
+        target_teacher = await ctx.db.get(Teacher, target_teacher_id)
+        if not target_teacher or target_teacher.organization_id != ctx.teacher.organization_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="No tienes permiso para validar horarios de este profesor"
             )
 
-    result = await schedule.validate_slot_availability(
-        db,
+    # Cache TTL corto: el formulario valida en cada cambio de día/hora/formato
+    result = await schedule.validate_slot_availability_cached(
+        ctx.db,
         teacher_id=target_teacher_id,
-        day=day,
+        day=day.value,
         time=time,
-        format=class_format,
+        format=format,
         duration=duration
     )
 
@@ -173,8 +251,7 @@ async def check_availability(
     from_date: date = Query(..., description="Fecha inicial (YYYY-MM-DD)"),
     to_date: Optional[date] = Query(None, description="Fecha final (YYYY-MM-DD)"),
     exclude_enrollment_id: Optional[int] = Query(None, description="Excluir clases de este enrollment (para reactivación)"),
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Verifica disponibilidad de horario en rango de fechas.
@@ -221,10 +298,10 @@ async def check_availability(
 
     # Verificar disponibilidad
     conflicts_data = await check_schedule_availability_dates(
-        db=db,
+        db=ctx.db,
         day=day,
         time_str=time,
-        teacher_id=current_teacher.id,
+        teacher_id=ctx.teacher.id,
         from_date=from_date,
         to_date=to_date,
         exclude_enrollment_id=exclude_enrollment_id
@@ -250,8 +327,8 @@ async def check_availability(
 @router.post("/", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
 async def create_schedule(
     schedule_data: ScheduleCreate,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Crear un horario nuevo (template recurrente)
@@ -263,8 +340,8 @@ async def create_schedule(
     
     Args:
         schedule_data: Datos del horario a crear
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
+        background_tasks: Tareas post-respuesta (notificación WebSocket)
     
     Returns:
         Horario creado con id asignado
@@ -272,49 +349,48 @@ async def create_schedule(
     Raises:
         400: Si el enrollment no existe o no pertenece al profesor
     """
-    # Validar que el enrollment existe y pertenece al profesor
-    enrollment_obj = await enrollment.get(db, schedule_data.enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Inscripción {schedule_data.enrollment_id} no encontrada"
-        )
+    # Una sola transacción para todo el handler: un único COMMIT (horario +
+    # clases generadas) y rollback completo ante cualquier error
+    try:
+        async with ctx.db.begin():
+            # Validar que el enrollment existe y pertenece al profesor (una
+            # consulta; la segunda solo si falla, para distinguir 400 de 403)
+            enrollment_obj = await enrollment.get_for_teacher(ctx.db, schedule_data.enrollment_id, ctx.teacher)
+
+            if not enrollment_obj:
+                if not await enrollment.exists_by_id(ctx.db, schedule_data.enrollment_id):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Inscripción {schedule_data.enrollment_id} no encontrada"
+                    )
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="No tienes permiso para crear horarios en esta inscripción"
+                )
 
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para crear horarios en esta inscripción"
-            )
-        schedule_data.teacher_id = enrollment_obj.teacher_id
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para crear horarios en esta inscripción"
-            )
-        schedule_data.teacher_id = current_teacher.id
+            # El horario es del profesor de la inscripción (el propio si es independiente)
+            schedule_data.teacher_id = enrollment_obj.teacher_id
 
-    # Crear el horario (con validación de conflictos)
-    try:
-        new_schedule = await schedule.create(db, schedule_data)
+            # Crear el horario (con validación de conflictos)
+            new_schedule = await schedule.create(ctx.db, schedule_data, commit=False)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e)
         )
 
-    await notify_data_change(new_schedule.teacher_id, "schedule", "create", new_schedule.id)
+    schedule.invalidate_slot_cache(new_schedule.teacher_id)
+    # Notificación WebSocket (sesión propia + pg_notify + COMMIT) fuera del
+    # camino crítico: corre después de enviar la respuesta
+    background_tasks.add_task(notify_data_change, new_schedule.teacher_id, "schedule", "create", new_schedule.id)
     return new_schedule
 
 
 @router.get("/enrollment/{enrollment_id}", response_model=list[ScheduleResponse])
 async def get_enrollment_schedules(
     enrollment_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    request: Request,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Obtener todos los horarios de una inscripción
@@ -324,86 +400,87 @@ async def get_enrollment_schedules(
     
     Args:
         enrollment_id: ID de la inscripción
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        request: Request (para leer If-None-Match)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
     
     Returns:
-        Lista de horarios de la inscripción, ordenados por día y hora
+        Lista de horarios de la inscripción, ordenados por día y hora (o 304 Not Modified)
     
     Raises:
         404: Si la inscripción no existe
         403: Si la inscripción no pertenece al profesor
     """
-    # Validar que el enrollment existe y pertenece al profesor
-    enrollment_obj = await enrollment.get(db, enrollment_id)
-    
-    if not enrollment_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Inscripción {enrollment_id} no encontrada"
-        )
-    
-    if current_teacher.organization_id:
-        enrollment_teacher = await db.get(Teacher, enrollment_obj.teacher_id)
-        if not enrollment_teacher or enrollment_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
-            )
-    else:
-        if enrollment_obj.teacher_id != current_teacher.id:
+    # Pertenencia y horarios en una sola consulta (JOIN); la segunda solo si
+    # falla, para distinguir 404 de 403
+    schedules = await schedule.get_by_enrollment_for_teacher(ctx.db, enrollment_id, ctx.teacher)
+
+    if schedules is None:
+        if not await enrollment.exists_by_id(ctx.db, enrollment_id):
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver esta inscripción"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Inscripción {enrollment_id} no encontrada"
             )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para ver esta inscripción"
+        )
     
-    schedules = await schedule.get_by_enrollment(db, enrollment_id)
-    
-    return schedules
+    etag = compute_etag(
+        "enrollment-schedules",
+        enrollment_id,
+        *((s.id, s.updated_at) for s in schedules),
+        max((s.enrollment.updated_at for s in schedules if s.enrollment), default=None),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    payload = SCHEDULE_LIST_ADAPTER.dump_json(
+        SCHEDULE_LIST_ADAPTER.validate_python(schedules, from_attributes=True)
+    )
+    json_response = Response(content=payload, media_type="application/json")
+    set_etag(json_response, etag)
+    return json_response
 
 
 @router.get("/{schedule_id}", response_model=ScheduleResponse)
 async def get_schedule(
     schedule_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    request: Request,
+    response: Response,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Obtener un horario específico por ID
     
+    Soporta ETag (basado en updated_at del horario y de su inscripción):
+    si el cliente ya tiene la versión vigente se responde 304 sin body.
+    
     Args:
         schedule_id: ID del horario
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        request: Request (para leer If-None-Match)
+        response: Response (para agregar el header ETag)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
     
     Returns:
-        Datos del horario
+        Datos del horario (o 304 Not Modified)
     
     Raises:
         404: Si el horario no existe
         403: Si el horario no pertenece al profesor
     """
-    schedule_obj = await schedule.get(db, schedule_id)
-    
-    if not schedule_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Horario {schedule_id} no encontrado"
-        )
+    schedule_obj = await _get_owned_schedule(
+        ctx.db, schedule_id, ctx.teacher, "No tienes permiso para ver este horario"
+    )
     
-    if current_teacher.organization_id:
-        schedule_teacher = await db.get(Teacher, schedule_obj.teacher_id)
-        if not schedule_teacher or schedule_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver este horario"
-            )
-    else:
-        if schedule_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver este horario"
-            )
+    etag = compute_etag(
+        "schedule",
+        schedule_obj.id,
+        schedule_obj.updated_at,
+        schedule_obj.enrollment.updated_at if schedule_obj.enrollment else None,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     
     return schedule_obj
 
@@ -412,8 +489,8 @@ async def get_schedule(
 async def update_schedule(
     schedule_id: int,
     schedule_data: ScheduleUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Actualizar un horario existente
@@ -426,8 +503,8 @@ async def update_schedule(
     Args:
         schedule_id: ID del horario a actualizar
         schedule_data: Datos a actualizar (solo campos no None)
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
+        background_tasks: Tareas post-respuesta (notificación WebSocket)
     
     Returns:
         Horario actualizado
@@ -436,41 +513,26 @@ async def update_schedule(
         404: Si el horario no existe
         403: Si el horario no pertenece al profesor
     """
-    # Verificar que existe y pertenece al profesor
-    schedule_obj = await schedule.get(db, schedule_id)
-    
-    if not schedule_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Horario {schedule_id} no encontrado"
-        )
-    
-    if current_teacher.organization_id:
-        schedule_teacher = await db.get(Teacher, schedule_obj.teacher_id)
-        if not schedule_teacher or schedule_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar este horario"
-            )
-    else:
-        if schedule_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar este horario"
-            )
-    
-    # Actualizar (con validación de conflictos si cambia día/hora/duración)
+    # Verificación + actualización en una sola transacción (un único COMMIT)
     try:
-        updated_schedule = await schedule.update(db, schedule_id, schedule_data)
-        if not updated_schedule:
-            raise ValueError("No se pudo actualizar el horario")
+        async with ctx.db.begin():
+            # Verificar que existe y pertenece al profesor
+            await _get_owned_schedule(
+                ctx.db, schedule_id, ctx.teacher, "No tienes permiso para actualizar este horario"
+            )
+
+            # Actualizar (con validación de conflictos si cambia día/hora/duración)
+            updated_schedule = await schedule.update(ctx.db, schedule_id, schedule_data, commit=False)
+            if not updated_schedule:
+                raise ValueError("No se pudo actualizar el horario")
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e)
         )
 
-    await notify_data_change(updated_schedule.teacher_id, "schedule", "update", updated_schedule.id)
+    schedule.invalidate_slot_cache(updated_schedule.teacher_id)
+    background_tasks.add_task(notify_data_change, updated_schedule.teacher_id, "schedule", "update", updated_schedule.id)
     return updated_schedule
 
 
@@ -478,8 +540,8 @@ async def update_schedule(
 async def remove_schedule_with_date(
     schedule_id: int,
     data: RemoveScheduleRequest,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Elimina un horario desde una fecha específica (soft-delete con histórico).
@@ -502,27 +564,9 @@ async def remove_schedule_with_date(
     from app.crud.schedule import remove_schedule_with_history
     
     # Verificar que schedule existe y pertenece al profesor
-    schedule_obj = await schedule.get(db, schedule_id)
-    
-    if not schedule_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Horario no encontrado"
-        )
-    
-    if current_teacher.organization_id:
-        schedule_teacher = await db.get(Teacher, schedule_obj.teacher_id)
-        if not schedule_teacher or schedule_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar este horario"
-            )
-    else:
-        if schedule_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar este horario"
-            )
+    schedule_obj = await _get_owned_schedule(
+        ctx.db, schedule_id, ctx.teacher, "No tienes permiso para eliminar este horario"
+    )
     
     # Verificar que está activo
     # if not schedule_obj.active:
@@ -536,11 +580,11 @@ async def remove_schedule_with_date(
     # Ejecutar eliminación
     try:
         result = await remove_schedule_with_history(
-            db=db,
+            db=ctx.db,
             schedule_id=schedule_id,
             remove_from=data.remove_from
         )
-        await notify_data_change(teacher_id, "schedule", "remove", result["schedule_id"])
+        background_tasks.add_task(notify_data_change, teacher_id, "schedule", "remove", result["schedule_id"])
         
         return {
             "schedule_id": result["schedule_id"],
@@ -568,8 +612,8 @@ async def remove_schedule_with_date(
 async def reactivate_schedule_endpoint(
     schedule_id: int,
     data: ReactivateScheduleRequest,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Reactiva un horario inactivo creando uno nuevo con el mismo día/hora/duración.
@@ -587,28 +631,19 @@ async def reactivate_schedule_endpoint(
     """
     from app.crud.schedule import reactivate_schedule
 
-    schedule_obj = await schedule.get(db, schedule_id)
-
-    if not schedule_obj:
-        raise HTTPException(status_code=404, detail="Horario no encontrado")
-
-    if current_teacher.organization_id:
-        schedule_teacher = await db.get(Teacher, schedule_obj.teacher_id)
-        if not schedule_teacher or schedule_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(status_code=403, detail="No tienes permiso para modificar este horario")
-    else:
-        if schedule_obj.teacher_id != current_teacher.id:
-            raise HTTPException(status_code=403, detail="No tienes permiso para modificar este horario")
+    schedule_obj = await _get_owned_schedule(
+        ctx.db, schedule_id, ctx.teacher, "No tienes permiso para modificar este horario"
+    )
 
     teacher_id = schedule_obj.teacher_id
 
     try:
         result = await reactivate_schedule(
-            db=db,
+            db=ctx.db,
             schedule_id=schedule_id,
             valid_from=data.valid_from
         )
-        await notify_data_change(teacher_id, "schedule", "reactivate", result["new_schedule_id"])
+        background_tasks.add_task(notify_data_change, teacher_id, "schedule", "reactivate", result["new_schedule_id"])
 
         return ReactivateScheduleResponse(
             old_schedule_id=result["old_schedule_id"],
@@ -626,8 +661,7 @@ async def reactivate_schedule_endpoint(
 @router.delete("/{schedule_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_schedule(
     schedule_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     ⚠️ DEPRECADO: No usar este endpoint.
@@ -648,8 +682,8 @@ async def delete_schedule(
 async def change_schedule_endpoint(
     schedule_id: int,
     data: ChangeScheduleRequest,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Cambia el horario de un alumno de forma atómica.
@@ -668,27 +702,9 @@ async def change_schedule_endpoint(
     from app.crud.schedule import change_schedule
 
     # Verificar que existe y pertenece al profesor
-    schedule_obj = await schedule.get(db, schedule_id)
-
-    if not schedule_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Horario no encontrado"
-        )
-
-    if current_teacher.organization_id:
-        schedule_teacher = await db.get(Teacher, schedule_obj.teacher_id)
-        if not schedule_teacher or schedule_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar este horario"
-            )
-    else:
-        if schedule_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para modificar este horario"
-            )
+    schedule_obj = await _get_owned_schedule(
+        ctx.db, schedule_id, ctx.teacher, "No tienes permiso para modificar este horario"
+    )
 
     # Verificar que está activo
     if not schedule_obj.active:
@@ -702,7 +718,7 @@ async def change_schedule_endpoint(
     # Ejecutar cambio atómico
     try:
         result = await change_schedule(
-            db=db,
+            db=ctx.db,
             schedule_id=schedule_id,
             new_day=data.new_day,
             new_time=data.new_time,
@@ -710,7 +726,7 @@ async def change_schedule_endpoint(
         )
 
         # Notify teacher about schedule change (new schedule created)
-        await notify_data_change(teacher_id, "schedule", "change", result["new_schedule_id"])
+        background_tasks.add_task(notify_data_change, teacher_id, "schedule", "change", result["new_schedule_id"])
 
         return ChangeScheduleResponse(
             old_schedule_id=result["old_schedule_id"],
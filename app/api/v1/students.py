@@ -2,7 +2,8 @@
 Students endpoints - CRUD completo para alumnos
 """
 # pyrefly: ignore [missing-import]
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 # pyrefly: ignore [missing-import]
 from sqlalchemy import select
 # pyrefly: ignore [missing-import]
@@ -10,14 +11,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # pyrefly: ignore [missing-import]
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
-from app.core.security import get_current_teacher
+from app.core.security import AuthCtx, TeacherPrincipal, get_auth_ctx
+from app.core.http_cache import compute_etag, etag_matches, set_etag, not_modified
+from app.core.pagination import encode_keyset, decode_keyset
 from app.crud import student
 from app.models.class_model import Class, ClassStatus, ClassType
 from app.models.enrollment import Enrollment
 from app.models.student import Student
 from app.models.teacher import Teacher
 from app.schemas.student import (
+    STUDENT_LIST_ADAPTER,
+    STUDENT_HISTORY_ADAPTER,
     StudentCreate,
     StudentHistoryItem,
     StudentResponse,
@@ -32,15 +36,85 @@ logger = logging.getLogger("uvicorn.error")
 if not logger.handlers:
     logger = logging.getLogger("gunicorn.error")
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+# ========================================
+# HELPERS DE PERTENENCIA
+# ========================================
+
+async def _raise_student_access_error(
+    db: AsyncSession,
+    student_id: int,
+    detail: str,
+    include_inactive: bool = False
+) -> None:
+    """
+    Resolver 404 vs 403 cuando la verificación de pertenencia falla
+
+    Solo se ejecuta en el camino de error: el caso normal ya quedó
+    resuelto con el predicado de pertenencia dentro de la consulta.
+
+    Args:
+        db: Sesión de base de datos
+        student_id: ID del alumno
+        detail: Mensaje para el caso 403
+        include_inactive: Contar también alumnos dados de baja
+
+    Raises:
+        404: Si el alumno no existe
+        403: Si existe pero no pertenece al profesor
+    """
+    if not await student.exists_by_id(db, student_id, include_inactive=include_inactive):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Alumno {student_id} no encontrado"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
+    )
+
+
+async def _get_owned_student(
+    db: AsyncSession,
+    student_id: int,
+    current_teacher: TeacherPrincipal,
+    detail: str,
+    include_inactive: bool = False
+) -> Student:
+    """
+    Obtener un alumno verificando pertenencia en la misma consulta
+
+    Args:
+        db: Sesión de base de datos
+        student_id: ID del alumno
+        current_teacher: Profesor autenticado
+        detail: Mensaje para el caso 403
+        include_inactive: Incluir alumnos dados de baja
+
+    Returns:
+        Student del profesor (o de su organización)
+
+    Raises:
+        404: Si el alumno no existe
+        403: Si existe pero no pertenece al profesor
+    """
+    student_obj = await student.get_for_teacher(
+        db, student_id, current_teacher, include_inactive=include_inactive
+    )
+    if not student_obj:
+        await _raise_student_access_error(db, student_id, detail, include_inactive)
+    return student_obj
 
 
 @router.get("/", response_model=list[StudentResponse])
 async def list_students(
-    skip: int = Query(0, ge=0, description="Registros a saltar"),
+    request: Request,
+    skip: int = Query(0, ge=0, description="Registros a saltar (obsoleto, usar cursor)"),
     limit: int = Query(100, ge=1, le=100, description="Máximo de registros"),
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    cursor: str | None = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Listar todos los alumnos del profesor logueado
@@ -48,30 +122,64 @@ async def list_students(
     Solo retorna alumnos activos (soft-delete respetado)
     Ordenados alfabéticamente por nombre
     
+    Paginación por cursor: si hay más resultados, la respuesta incluye el
+    header X-Next-Cursor; se envía como `cursor` para pedir la página siguiente.
+    
+    Soporta ETag: si el cliente envía If-None-Match con la versión vigente
+    se responde 304 sin cargar ni serializar los alumnos.
+    
     Args:
-        skip: Cantidad de registros a saltar (paginación)
+        request: Request (para leer If-None-Match)
+        skip: Cantidad de registros a saltar (obsoleto, usar cursor)
         limit: Cantidad máxima de registros a retornar
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        cursor: Cursor opaco de la página siguiente
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
     
     Returns:
-        Lista de alumnos activos del profesor
+        Lista de alumnos activos del profesor (o 304 Not Modified)
     """
+    after = None
+    if cursor:
+        try:
+            last_name, last_id = decode_keyset(cursor, 2)
+            after = (str(last_name), int(last_id))
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginación inválido") from e
+
+    version = await student.get_multi_version(ctx.db, teacher_id=ctx.teacher.id)
+    etag = compute_etag("students", ctx.teacher.id, skip, limit, cursor, *version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # limit + 1: la fila extra solo indica si hay página siguiente
     students = await student.get_multi(
-        db,
-        teacher_id=current_teacher.id,
+        ctx.db,
+        teacher_id=ctx.teacher.id,
         skip=skip,
-        limit=limit
+        limit=limit + 1,
+        after=after
     )
-    
-    return students
+    has_more = len(students) > limit
+    students = students[:limit]
+
+    # Validación + serialización de la lista completa en una sola pasada
+    # (response_model queda solo para la documentación OpenAPI)
+    payload = STUDENT_LIST_ADAPTER.dump_json(
+        STUDENT_LIST_ADAPTER.validate_python(students, from_attributes=True)
+    )
+    json_response = Response(content=payload, media_type="application/json")
+    set_etag(json_response, etag)
+    if has_more:
+        last = students[-1]
+        json_response.headers["X-Next-Cursor"] = encode_keyset(last.name, last.id)
+    return json_response
 
 
 @router.post("/", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
 async def create_student(
     student_data: StudentCreate,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Crear un alumno nuevo
@@ -80,31 +188,31 @@ async def create_student(
     
     Args:
         student_data: Datos del alumno a crear
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
+        background_tasks: Tareas post-respuesta (notificación WebSocket)
     
     Returns:
         Alumno creado con id asignado
     """
     # Si el profesor pertenece a una organización, permitir crear un alumno
     # para cualquier profesor de la misma organización cuando se provea teacher_id.
-    if current_teacher.organization_id:
+    if ctx.teacher.organization_id:
         if student_data.teacher_id is not None:
-            result = await db.execute(select(Teacher).where(Teacher.id == student_data.teacher_id))
+            result = await ctx.db.execute(select(Teacher).where(Teacher.id == student_data.teacher_id))
             target_teacher = result.scalar_one_or_none()
-            if not target_teacher or target_teacher.organization_id != current_teacher.organization_id:
+            if not target_teacher or target_teacher.organization_id != ctx.teacher.organization_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="No tienes permiso para asignar este alumno al profesor seleccionado"
                 )
         else:
-            student_data.teacher_id = current_teacher.id
+            student_data.teacher_id = ctx.teacher.id
     else:
         # Profesor independiente solo puede crear alumnos para sí mismo
-        student_data.teacher_id = current_teacher.id
+        student_data.teacher_id = ctx.teacher.id
 
-    new_student = await student.create(db, student_data)
-    await notify_data_change(new_student.teacher_id, "student", "create", new_student.id)
+    new_student = await student.create(ctx.db, student_data)
+    background_tasks.add_task(notify_data_change, new_student.teacher_id, "student", "create", new_student.id)
     
     return new_student
 
@@ -112,48 +220,38 @@ async def create_student(
 @router.get("/{student_id}", response_model=StudentResponse)
 async def get_student(
     student_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    request: Request,
+    response: Response,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Obtener un alumno específico por ID
     
+    Soporta ETag (basado en updated_at): si el cliente ya tiene la versión
+    vigente se responde 304 sin body.
+    
     Args:
         student_id: ID del alumno
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        request: Request (para leer If-None-Match)
+        response: Response (para agregar el header ETag)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
     
     Returns:
-        Datos del alumno
+        Datos del alumno (o 304 Not Modified)
     
     Raises:
         404: Si el alumno no existe o no pertenece al profesor
     """
-    student_obj = await student.get(db, student_id)
+    # Pertenencia por organización (o alumno propio si el profesor es
+    # independiente) verificada en la misma consulta
+    student_obj = await _get_owned_student(
+        ctx.db, student_id, ctx.teacher, "No tienes permiso para ver este alumno"
+    )
     
-    if not student_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Alumno {student_id} no encontrado"
-        )
-    # Verificar pertenencia: si el teacher actual pertenece a una organización,
-    # permitir ver alumnos cuyo teacher pertenezca a la misma organización.
-    # Si el teacher es independiente (sin organization_id), solo permitir sus propios alumnos.
-    result = await db.execute(select(Teacher).where(Teacher.id == student_obj.teacher_id))
-    student_teacher = result.scalar_one_or_none()
-
-    if current_teacher.organization_id:
-        if not student_teacher or student_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver este alumno"
-            )
-    else:
-        if student_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver este alumno"
-            )
+    etag = compute_etag("student", student_obj.id, student_obj.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     
     return student_obj
 
@@ -163,8 +261,7 @@ async def get_student_history(
     student_id: int,
     limit: int = Query(30, ge=1, le=100, description="Cantidad máxima de clases a retornar"),
     skip: int = Query(0, ge=0, description="Cantidad de registros a omitir"),
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Obtener el historial de clases recientes de un alumno.
@@ -172,32 +269,13 @@ async def get_student_history(
     Retorna las últimas clases del alumno ordenadas por fecha descendente,
     con el instrumento, el estado de asistencia y notas si existen.
     """
-    raw_result = await db.execute(select(Student).where(Student.id == student_id))
-    student_obj = raw_result.scalar_one_or_none()
-
-    if not student_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Alumno {student_id} no encontrado"
-        )
-    # Verificación por organización similar a get_student
-    result = await db.execute(select(Teacher).where(Teacher.id == student_obj.teacher_id))
-    student_teacher = result.scalar_one_or_none()
-
-    if current_teacher.organization_id:
-        if not student_teacher or student_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver el historial de este alumno"
-            )
-    else:
-        if student_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para ver el historial de este alumno"
-            )
+    await _get_owned_student(
+        ctx.db, student_id, ctx.teacher,
+        "No tienes permiso para ver el historial de este alumno",
+        include_inactive=True
+    )
 
-    result = await db.execute(
+    result = await ctx.db.execute(
         select(Class)
         .join(Class.enrollment)
         .options(
@@ -252,24 +330,20 @@ async def get_student_history(
             )
         )
 
-    # Log the serialized payload so it appears in gunicorn/uvicorn logs
-    try:
-        payload = [h.model_dump() for h in history]
-    except Exception:
-        # Fallback: best-effort repr
-        payload = [repr(h) for h in history]
+    payload = STUDENT_HISTORY_ADAPTER.dump_json(history)
+    logger.debug('returning history payload count=%s payload=%s', len(history), payload)
 
-    logger.debug('returning history payload count=%s payload=%s', len(payload), payload)
-
-    return history
+    # Los items ya son StudentHistoryItem: se serializan una sola vez, sin la
+    # re-validación de response_model
+    return Response(content=payload, media_type="application/json")
 
 
 @router.patch("/{student_id}", response_model=StudentResponse)
 async def update_student(
     student_id: int,
     student_data: StudentUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Actualizar un alumno existente
@@ -279,8 +353,8 @@ async def update_student(
     Args:
         student_id: ID del alumno a actualizar
         student_data: Datos a actualizar (solo campos no None)
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
+        background_tasks: Tareas post-respuesta (notificación WebSocket)
     
     Returns:
         Alumno actualizado
@@ -289,39 +363,16 @@ async def update_student(
         404: Si el alumno no existe
         403: Si el alumno no pertenece al profesor
     """
-    # Verificar que existe
-    student_obj = await student.get(db, student_id)
-    
-    if not student_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Alumno {student_id} no encontrado"
-        )
-    
-    # Verificación por organización: permitir si el teacher del alumno pertenece
-    # a la misma organización que el teacher autenticado; si el teacher autenticado
-    # es independiente, solo permitir sus propios alumnos.
-    result = await db.execute(select(Teacher).where(Teacher.id == student_obj.teacher_id))
-    student_teacher = result.scalar_one_or_none()
-
-    if current_teacher.organization_id:
-        if not student_teacher or student_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar este alumno"
-            )
-    else:
-        if student_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para actualizar este alumno"
-            )
+    # Verificar que existe y pertenece al profesor
+    await _get_owned_student(
+        ctx.db, student_id, ctx.teacher, "No tienes permiso para actualizar este alumno"
+    )
     
     # Actualizar
-    updated_student = await student.update(db, student_id, student_data)
+    updated_student = await student.update(ctx.db, student_id, student_data)
     if not updated_student:
         raise ValueError("No se encontró el alumno para actualizar")
-    await notify_data_change(updated_student.teacher_id, "student", "update", updated_student.id)
+    background_tasks.add_task(notify_data_change, updated_student.teacher_id, "student", "update", updated_student.id)
     
     return updated_student
 
@@ -329,8 +380,8 @@ async def update_student(
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_student(
     student_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_teacher: Teacher = Depends(get_current_teacher)
+    background_tasks: BackgroundTasks,
+    ctx: AuthCtx = Depends(get_auth_ctx)
 ):
     """
     Eliminar un alumno FÍSICAMENTE (hard-delete)
@@ -340,8 +391,8 @@ async def delete_student(
     
     Args:
         student_id: ID del alumno a eliminar
-        db: Sesión de base de datos
-        current_teacher: Profesor autenticado (desde JWT)
+        ctx: Sesión de la request + profesor autenticado (desde JWT)
+        background_tasks: Tareas post-respuesta (notificación WebSocket)
     
     Returns:
         204 No Content (sin body)
@@ -350,44 +401,16 @@ async def delete_student(
         404: Si el alumno no existe
         403: Si el alumno no pertenece al profesor
     """
-    # Verificar que existe (sin filtrar por active — el admin puede eliminar alumnos inactivos)
-    raw_result = await db.execute(select(Student).where(Student.id == student_id))
-    student_obj = raw_result.scalar_one_or_none()
-    
-    if not student_obj:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Alumno {student_id} no encontrado"
-        )
-    
-    # Verificación por organización para eliminación (mismo patrón que arriba)
-    result = await db.execute(select(Teacher).where(Teacher.id == student_obj.teacher_id))
-    student_teacher = result.scalar_one_or_none()
-
-    if current_teacher.organization_id:
-        if not student_teacher or student_teacher.organization_id != current_teacher.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar este alumno"
-            )
-    else:
-        if student_obj.teacher_id != current_teacher.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar este alumno"
-            )
-    
-    teacher_id = student_obj.teacher_id
-
-    # Hard-delete
-    success = await student.remove(db, student_id)
-    
-    if not success:
-        # Esto no debería ocurrir si la validación anterior pasó
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Error al eliminar el alumno"
+    # DELETE condicionado a la pertenencia en una sola sentencia (sin filtrar
+    # por active — el admin puede eliminar alumnos inactivos). La cascada la
+    # resuelven las FKs ON DELETE CASCADE en Postgres.
+    teacher_id = await student.remove_for_teacher(ctx.db, student_id, ctx.teacher)
+
+    if teacher_id is None:
+        await _raise_student_access_error(
+            ctx.db, student_id, "No tienes permiso para eliminar este alumno",
+            include_inactive=True
         )
     
-    await notify_data_change(teacher_id, "student", "delete", student_id)
+    background_tasks.add_task(notify_data_change, teacher_id, "student", "delete", student_id)
     return None  # 204 No Content
\ No newline at end of file
@@ -11,16 +11,27 @@ Estrategia:
 3. Offline → usar datos de localStorage (UX instantáneo)
 """
 
+import asyncio
+import functools
+import time
+import orjson
 from datetime import datetime, timezone, date
-from typing import Optional, List, Literal, Any
+from typing import Optional, List, Literal, Any, AsyncIterator, Iterable
 from pydantic import BaseModel, Field
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, any_, bindparam, literal, null, union_all, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import noload, raiseload, selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, async_session_maker
 from app.core.security import get_current_teacher
 from app.core.config import settings
+from app.core.http_cache import compute_etag, etag_matches, set_etag, not_modified
+from app.crud import instrument as instrument_crud
 from app.models import (
     Teacher,
     Student,
@@ -28,28 +39,570 @@ from app.models import (
     Schedule,
     Class,
     Attendance,
-    Instrument,
     EnrollmentNote,
     CreditTransaction,
 )
+from app.schemas.student import StudentResponse
+from app.schemas.enrollment import EnrollmentResponse
+from app.schemas.attendance import AttendanceResponse
+from app.schemas.enrollment_note import EnrollmentNoteResponse
+from app.schemas.credit_transaction import CreditTransactionResponse
 from app.schemas.sync import (
+    SYNC_INITIAL_ADAPTERS,
     InitialSyncRequest,
     InitialSyncResponse,
     DeltaSyncResponse,
+    DeltaSummaryResponse,
+    SyncBatchRequest,
+    SyncBatchResponse,
     SyncMetadata,
     VerifyOperationRequest,
     VerifyOperationsRequest,
     VerifyOperationsResponse,
 )
 
-router = APIRouter()
+# orjson serializa date/datetime de forma nativa y mucho más rápido que json
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Filas por fragmento al serializar las listas del sync inicial en streaming
+SYNC_STREAM_CHUNK_SIZE = 500
+
+
+# ========================================
+# CACHE DEL BODY DE /sync/initial
+# ========================================
+# El body es determinístico para (profesor, año) mientras no cambien las
+# versiones de teacher_sync_versions, el catálogo de instrumentos ni el
+# data_version. Se guarda ya serializado (bytes) por proceso/worker: un
+# re-login (u otro dispositivo del mismo profesor) con los datos sin cambios
+# no ejecuta ninguna consulta de entidades. Una entrada por (profesor, año);
+# la huella de versiones decide si sirve. El TTL acota lo que no cubren las
+# versiones (cambios del catálogo hechos en otro worker).
+SYNC_INITIAL_CACHE_TTL_SECONDS = 600
+SYNC_INITIAL_CACHE_MAXSIZE = 64
+
+_initial_cache: dict[tuple[int, int], tuple[float, tuple, bytes]] = {}
+
+
+def _initial_cache_get(key: tuple[int, int], fingerprint: tuple) -> bytes | None:
+    """Body cacheado de /sync/initial si sigue vigente para esa huella."""
+    entry = _initial_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, cached_fingerprint, body = entry
+    if expires_at <= time.monotonic() or cached_fingerprint != fingerprint:
+        return None
+    return body
+
+
+async def _cache_initial_body(
+    key: tuple[int, int],
+    fingerprint: tuple,
+    stream: AsyncIterator[bytes],
+) -> AsyncIterator[bytes]:
+    """
+    Reenvía el stream de /sync/initial y, al terminar, guarda el body completo.
+
+    Si el envío se corta a mitad (cliente desconectado), no se guarda nada.
+
+    Args:
+        key: (teacher_id, year)
+        fingerprint: Huella de versiones con la que se generó el body
+        stream: Generador del body
+
+    Yields:
+        Los mismos fragmentos del stream
+    """
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        yield chunk
+
+    now = time.monotonic()
+    if len(_initial_cache) >= SYNC_INITIAL_CACHE_MAXSIZE:
+        for expired in [k for k, (expires_at, _, _) in _initial_cache.items() if expires_at <= now]:
+            del _initial_cache[expired]
+        if len(_initial_cache) >= SYNC_INITIAL_CACHE_MAXSIZE:
+            _initial_cache.clear()
+    _initial_cache[key] = (now + SYNC_INITIAL_CACHE_TTL_SECONDS, fingerprint, b"".join(chunks))
+
+
+# ========================================
+# OPCIONES DE CARGA (eager loading justo)
+# ========================================
+# Los modelos declaran casi todas sus relaciones con lazy="selectin", así que
+# un select(Student) traía además teacher y enrollments, y cada enrollment sus
+# clases, horarios, historial... en cascada. Los *Response del sync solo
+# anidan:
+#   - ScheduleResponse.enrollment (id, format)
+#   - ClassResponse.attendance y ClassResponse.enrollment.student
+# Esas relaciones se cargan con un SELECT ... IN (...) cada una; el resto se
+# omite (o falla con STRICT_LOADING, para detectar en desarrollo/CI una
+# relación nueva que el schema use sin estar precargada). Las filas se
+# serializan después de cerrar la sesión, así que una carga perezosa tampoco
+# podría resolverse ahí.
+_skip_rest = raiseload if settings.STRICT_LOADING else noload
+
+_SYNC_NO_RELATIONS = (_skip_rest("*"),)
+
+_SYNC_SCHEDULE_OPTIONS = (
+    selectinload(Schedule.enrollment).options(_skip_rest("*")),
+    _skip_rest("*"),
+)
+
+_SYNC_CLASS_OPTIONS = (
+    selectinload(Class.attendance).options(_skip_rest("*")),
+    selectinload(Class.enrollment).options(
+        selectinload(Enrollment.student).options(_skip_rest("*")),
+        _skip_rest("*"),
+    ),
+    _skip_rest("*"),
+)
+
+
+@functools.cache
+def _row_columns(model, schema: type[BaseModel]) -> tuple:
+    """
+    Columnas de `model` que `schema` serializa, etiquetadas con el nombre del
+    campo del schema.
+
+    Para entidades sin relaciones anidadas en su *Response: un SELECT de
+    columnas devuelve filas (Row) en lugar de objetos ORM, sin identity map
+    ni estado por instancia, y los TypeAdapter las leen igual con
+    from_attributes. La etiqueta cubre atributos cuya columna tiene otro
+    nombre (Student.birthdate → birthday). Los campos del schema que no son
+    columnas (p. ej. teacher_name) quedan con su valor por defecto, igual
+    que con el objeto ORM.
+
+    Args:
+        model: Modelo SQLAlchemy
+        schema: Schema *Response de la entidad
+
+    Returns:
+        Tupla de columnas para select(*...)
+    """
+    column_attrs = sa_inspect(model).column_attrs.keys()
+    return tuple(
+        getattr(model, name).label(name)
+        for name in schema.model_fields
+        if name in column_attrs
+    )
+
+
+async def _fetch_all(stmt) -> list:
+    """
+    Ejecuta una consulta de solo lectura en una sesión propia.
+
+    Una AsyncSession no admite consultas concurrentes, así que cada consulta
+    del sync usa su propia sesión (y conexión) para poder lanzarlas juntas con
+    asyncio.gather: la latencia total pasa a ser la de la consulta más lenta
+    en lugar de la suma de todas.
+
+    Args:
+        stmt: SELECT a ejecutar
+
+    Returns:
+        Lista de resultados (scalars)
+    """
+    async with async_session_maker() as session:
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+
+async def _fetch_rows(stmt) -> list:
+    """
+    Como _fetch_all, pero devuelve filas completas (SELECT de varias columnas).
+
+    Args:
+        stmt: SELECT a ejecutar
+
+    Returns:
+        Lista de Row
+    """
+    async with async_session_maker() as session:
+        result = await session.execute(stmt)
+        return list(result.all())
+
+
+# ========================================
+# CONSULTAS DIRECTAS POR ASYNCPG (hot path)
+# ========================================
+# Las dos consultas de forma fija que corren en cada poll de cada
+# dispositivo (versiones para el ETag, IDs vigentes del delta) van como SQL
+# directo sobre la conexión asyncpg: sin compilar la sentencia ni pasar por
+# el procesamiento de filas de SQLAlchemy. asyncpg prepara cada texto una vez
+# por conexión (statement_cache_size en database.py) y lo reutiliza; detrás
+# de PgBouncer (cache en 0) se prepara sin nombre en cada ejecución.
+# Las escrituras y el resto del sync siguen por el ORM.
+
+_SYNC_VERSIONS_SQL = """
+SELECT entity, version
+FROM teacher_sync_versions
+WHERE teacher_id = $1
+"""
+
+_VALID_IDS_SQL = """
+SELECT
+    ARRAY(
+        SELECT id FROM enrollment_notes WHERE teacher_id = $1
+    ) AS valid_note_ids,
+    ARRAY(
+        SELECT id FROM classes
+        WHERE teacher_id = $1 AND date >= $2 AND date <= $3
+    ) AS valid_class_ids,
+    ARRAY(
+        SELECT a.id FROM attendances a
+        JOIN classes c ON c.id = a.class_id
+        WHERE c.teacher_id = $1 AND c.date >= $2 AND c.date <= $3
+    ) AS valid_attendance_ids
+"""
+
+
+async def _fetch_raw(sql: str, *args) -> list:
+    """
+    Ejecuta SQL directo en la conexión asyncpg de una sesión propia.
+
+    Args:
+        sql: Consulta con parámetros posicionales ($1, $2...)
+        *args: Valores de los parámetros
+
+    Returns:
+        Lista de asyncpg.Record
+    """
+    async with async_session_maker() as session:
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        return await raw.driver_connection.fetch(sql, *args)
+
+
+async def _fetch_cached_instruments() -> list:
+    """
+    Catálogo de instrumentos desde el cache del proceso.
+
+    La sesión propia solo toma una conexión si el cache caducó.
+
+    Returns:
+        Lista de InstrumentResponse
+    """
+    async with async_session_maker() as session:
+        return await instrument_crud.get_all_cached(session)
+
+
+# ========================================
+# CONSULTAS DEL DELTA
+# ========================================
+# /sync/delta y /sync/delta/summary filtran exactamente lo mismo; el primero
+# devuelve filas completas y el segundo solo (id, updated_at).
+
+
+def _load_options(model) -> tuple:
+    """Opciones de carga del sync para las filas completas de un modelo."""
+    if model is Schedule:
+        return _SYNC_SCHEDULE_OPTIONS
+    if model is Class:
+        return _SYNC_CLASS_OPTIONS
+    return _SYNC_NO_RELATIONS
+
+
+def _parse_last_sync(last_sync: str) -> datetime:
+    """
+    Parsea el last_sync del cliente (ISO 8601).
+
+    Args:
+        last_sync: Fecha ISO del último sync ('Z' o '+00:00')
+
+    Returns:
+        datetime del último sync (ahora, si el formato no es válido)
+    """
+    try:
+        return datetime.fromisoformat(last_sync.replace('Z', '+00:00'))
+    except ValueError:
+        # Fallback si el formato no es exacto
+        return datetime.now()
+
+
+# Entidades del delta, en el orden de DeltaSyncResponse
+_DELTA_MODELS: dict[str, Any] = {
+    "schedules": Schedule,
+    "enrollments": Enrollment,
+    "classes": Class,
+    "students": Student,
+    "attendances": Attendance,
+    "notes": EnrollmentNote,
+    "credit_transactions": CreditTransaction,
+}
+
+
+def _owned_by(model, current_teacher: Teacher):
+    """
+    Predicado de pertenencia al profesor de una entidad del sync.
+
+    Todas tienen teacher_id salvo CreditTransaction, que cuelga de la
+    inscripción.
+
+    Args:
+        model: Modelo de _DELTA_MODELS
+        current_teacher: Profesor autenticado
+
+    Returns:
+        Expresión booleana para usar en un WHERE
+    """
+    if model is CreditTransaction:
+        return CreditTransaction.enrollment_id.in_(
+            select(Enrollment.id).where(Enrollment.teacher_id == current_teacher.id)
+        )
+    return model.teacher_id == current_teacher.id
+
+
+def _delta_conditions(current_teacher: Teacher, last_sync_date: datetime) -> dict[str, tuple[Any, Any]]:
+    """
+    Modelo y filtro WHERE de cada entidad del delta.
+
+    Args:
+        current_teacher: Profesor autenticado
+        last_sync_date: Fecha del último sync del cliente
+
+    Returns:
+        Dict entidad → (modelo, condición), en el orden de DeltaSyncResponse
+    """
+    conditions = {}
+    for entity, model in _DELTA_MODELS.items():
+        changed = model.updated_at > last_sync_date
+        if model is Schedule:
+            # Activos actualizados + desactivados recientemente, en una sola
+            # consulta; el delta completo los separa por `active`
+            changed = or_(
+                changed,
+                and_(
+                    Schedule.active == False,
+                    Schedule.valid_until >= last_sync_date.date(),
+                ),
+            )
+        # NO implementamos Delta Purging para créditos porque el ledger
+        # CreditTransaction no hace hard delete en operación normal.
+        conditions[entity] = (model, and_(_owned_by(model, current_teacher), changed))
+    return conditions
+
+
+async def _fetch_sync_versions(current_teacher: Teacher) -> dict[str, int]:
+    """
+    Versiones por entidad de los datos de sync del profesor.
+
+    Lectura por PK de teacher_sync_versions (la mantienen triggers, ver
+    migración 023). Una entidad sin fila nunca cambió desde que existen los
+    triggers: versión 0.
+
+    Args:
+        current_teacher: Profesor autenticado
+
+    Returns:
+        Dict entidad (clave del payload) → versión
+    """
+    rows = await _fetch_raw(_SYNC_VERSIONS_SQL, current_teacher.id)
+    versions = {entity: 0 for entity in _DELTA_MODELS}
+    versions.update({row["entity"]: row["version"] for row in rows})
+    return versions
+
+
+async def _delta_etag(current_teacher: Teacher, variant: str = "delta") -> str:
+    """
+    ETag del delta: suma de las versiones de teacher_sync_versions del profesor.
+
+    Los triggers solo incrementan versiones, así que cualquier cambio en una
+    entidad del sync cambia la suma. Lectura por PK (teacher_id, ...): mucho
+    más barata que las consultas del delta. Se calcula ANTES de esas consultas:
+    un cambio concurrente hace que el próximo poll vuelva a traer datos en
+    lugar de perderlo.
+
+    Args:
+        current_teacher: Profesor autenticado
+        variant: Distingue el ETag de /delta y /delta/summary (bodies distintos)
+
+    Returns:
+        ETag listo para el header
+    """
+    version = sum((await _fetch_sync_versions(current_teacher)).values())
+    # El rango de valid_*_ids depende del año actual y el payload del data_version
+    today = datetime.now(timezone.utc).date()
+    return compute_etag(
+        variant, current_teacher.id, version, settings.CURRENT_DATA_VERSION, today.year
+    )
+
+
+def _valid_ids_range() -> tuple[date, date]:
+    """Rango de fechas de valid_class_ids / valid_attendance_ids (año actual + horizonte)."""
+    today = datetime.now(timezone.utc).date()
+    return date(today.year, 1, 1), date(today.year + 1, 3, 31)
+
+
+def _valid_ids_queries(current_teacher: Teacher) -> dict:
+    """
+    Consultas de IDs vigentes (notas, clases, asistencias) del profesor.
+
+    El móvil las usa para detectar y purgar registros eliminados en el
+    backend. Solo seleccionan la columna id → consultas muy livianas.
+
+    Args:
+        current_teacher: Profesor autenticado
+
+    Returns:
+        Dict campo de la respuesta (valid_*_ids) → SELECT de ids
+    """
+    range_start, range_end = _valid_ids_range()
+
+    valid_notes_query = select(EnrollmentNote.id).where(
+        EnrollmentNote.teacher_id == current_teacher.id
+    )
+    valid_ids_query = select(Class.id).where(
+        and_(
+            Class.teacher_id == current_teacher.id,
+            Class.date >= range_start,
+            Class.date <= range_end,
+        )
+    )
+    valid_att_query = select(Attendance.id).join(Class, Attendance.class_id == Class.id).where(
+        and_(
+            Class.teacher_id == current_teacher.id,
+            Class.date >= range_start,
+            Class.date <= range_end,
+        )
+    )
+    return {
+        "valid_note_ids": valid_notes_query,
+        "valid_class_ids": valid_ids_query,
+        "valid_attendance_ids": valid_att_query,
+    }
+
+
+async def _fetch_valid_ids(current_teacher: Teacher) -> dict[str, list[int]]:
+    """
+    Ejecuta las tres consultas de IDs vigentes en un solo round-trip.
+
+    SQL directo por asyncpg (_VALID_IDS_SQL, mismos filtros que
+    _valid_ids_queries): una fila con tres arreglos de enteros que asyncpg
+    decodifica a listas en C.
+
+    Args:
+        current_teacher: Profesor autenticado
+
+    Returns:
+        Dict valid_*_ids → lista de ids
+    """
+    range_start, range_end = _valid_ids_range()
+    rows = await _fetch_raw(_VALID_IDS_SQL, current_teacher.id, range_start, range_end)
+    return {name: list(ids) for name, ids in rows[0].items()}
+
+
+def _by_ids(model, ids: list[int]):
+    """
+    Predicado `id = ANY(:ids)`: un solo parámetro array (misma sentencia
+    preparada sin importar cuántos ids llegan) y un index scan por PK.
+    """
+    return model.id == any_(bindparam(None, list(ids), type_=ARRAY(Integer)))
+
+
+def _json_array_chunks(adapter: TypeAdapter, rows: list) -> Iterable[bytes]:
+    """
+    Serializa una lista de objetos ORM como arreglo JSON, por fragmentos.
+
+    Cada fragmento de SYNC_STREAM_CHUNK_SIZE filas se valida y serializa con
+    el TypeAdapter de la lista (una pasada en Rust) y se emite sin los
+    corchetes: nunca existe en memoria el JSON completo de la entidad.
+
+    Args:
+        adapter: TypeAdapter(list[XResponse]) de la entidad
+        rows: Objetos ORM a serializar
+
+    Yields:
+        Bytes del arreglo JSON (incluye "[" y "]")
+    """
+    yield b"["
+    for start in range(0, len(rows), SYNC_STREAM_CHUNK_SIZE):
+        chunk = rows[start:start + SYNC_STREAM_CHUNK_SIZE]
+        if start:
+            yield b","
+        yield adapter.dump_json(adapter.validate_python(chunk, from_attributes=True))[1:-1]
+    yield b"]"
+
+
+async def _stream_partitions(stmt) -> AsyncIterator[list]:
+    """
+    Ejecuta una consulta con cursor del servidor y la entrega por particiones.
+
+    Con yield_per, asyncpg trae SYNC_STREAM_CHUNK_SIZE filas por vez: nunca
+    está el resultado completo en memoria. La sesión (y su conexión) queda
+    abierta mientras se consume el generador, es decir, mientras se envía
+    esa parte de la respuesta.
+
+    Args:
+        stmt: SELECT a ejecutar
+
+    Yields:
+        Listas de hasta SYNC_STREAM_CHUNK_SIZE filas
+    """
+    async with async_session_maker() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=SYNC_STREAM_CHUNK_SIZE)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+
+async def _stream_initial_sync(
+    entities: dict[str, list | AsyncIterator[list]],
+    versions: dict[str, int],
+    unchanged: list[str],
+    data_version: int,
+    sync_time: datetime,
+) -> AsyncIterator[bytes]:
+    """
+    Genera el body de InitialSyncResponse por partes (entidad por entidad).
+
+    Las entidades llegan ya cargadas (lista) o como particiones de un cursor
+    del servidor (_stream_partitions); la metadata va al final, cuando ya se
+    contaron todas las filas.
+
+    Args:
+        entities: Filas (o particiones) por campo de InitialSyncResponse
+        versions: Versión actual de cada entidad (para known_versions)
+        unchanged: Entidades omitidas porque el cliente ya las tiene al día
+        data_version: Versión del esquema de datos
+        sync_time: Timestamp del sync (para metadata)
+
+    Yields:
+        Fragmentos del JSON de la respuesta
+    """
+    total_records = 0
+    yield b"{"
+    for key, adapter in SYNC_INITIAL_ADAPTERS.items():
+        yield b'"' + key.encode() + b'":'
+        rows = entities[key]
+        if isinstance(rows, list):
+            for fragment in _json_array_chunks(adapter, rows):
+                yield fragment
+            total_records += len(rows)
+        else:
+            yield b"["
+            first = True
+            async for partition in rows:
+                if not first:
+                    yield b","
+                yield adapter.dump_json(adapter.validate_python(partition, from_attributes=True))[1:-1]
+                total_records += len(partition)
+                first = False
+            yield b"]"
+        yield b","
+    metadata = SyncMetadata(sync_timestamp=sync_time, total_records=total_records)
+    yield b'"versions":' + orjson.dumps(versions)
+    yield b',"unchanged":' + orjson.dumps(unchanged) + b","
+    yield b'"data_version":' + str(data_version).encode()
+    yield b',"metadata":' + metadata.model_dump_json().encode() + b"}"
 
 
 @router.post("/initial", response_model=InitialSyncResponse)
 async def sync_initial(
     request: InitialSyncRequest,
     current_teacher: Teacher = Depends(get_current_teacher),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     Sincronización inicial - Carga TODOS los datos del año especificado + horizonte.
@@ -63,15 +616,19 @@ async def sync_initial(
 
     El frontend guarda todo en localStorage y lo usa offline.
 
+    Si el cliente envía known_versions (las `versions` de un /sync/initial
+    previo del mismo año) se omiten las entidades que no cambiaron desde
+    entonces: no se consultan, van vacías y se listan en `unchanged`.
+
     Args:
-        request: Año a sincronizar (ej: 2025)
+        request: Año a sincronizar (ej: 2025) y versiones conocidas
         current_teacher: Profesor autenticado (automático)
-        db: Sesión de base de datos
 
     Returns:
         Objeto con TODOS los datos del año + metadata de sync
     """
-    # Timestamp de sincronización
+    # Timestamp de sincronización: ANTES de las consultas (es el last_sync
+    # del primer delta; tomado después podría saltear cambios concurrentes)
     sync_time = datetime.now(timezone.utc)
 
     # ========================================
@@ -87,50 +644,42 @@ async def sync_initial(
     # 1. CARGAR ALUMNOS DEL PROFESOR (todos, activos e inactivos)
     # ========================================
     # Se envían todos para evitar problemas de referencia en histórico
-    students_query = select(Student).where(
+    students_query = select(*_row_columns(Student, StudentResponse)).where(
         Student.teacher_id == current_teacher.id
     )
-    students_result = await db.execute(students_query)
-    students = students_result.scalars().all()
 
     # ========================================
     # 2. CARGAR INSCRIPCIONES
     # ========================================
-    enrollments_query = select(Enrollment).where(
+    enrollments_query = select(*_row_columns(Enrollment, EnrollmentResponse)).where(
         Enrollment.teacher_id == current_teacher.id
     )
-    enrollments_result = await db.execute(enrollments_query)
-    enrollments = enrollments_result.scalars().all()
 
     # ========================================
     # 3. CARGAR HORARIOS (todos, activos e inactivos)
     # ========================================
     # Se envían todos para evitar que el frontend borre clases asociadas
     # a horarios inactivos pero que tienen historial o clases futuras manuales.
-    schedules_query = select(Schedule).where(
+    schedules_query = select(Schedule).options(*_SYNC_SCHEDULE_OPTIONS).where(
         Schedule.teacher_id == current_teacher.id
     )
-    schedules_result = await db.execute(schedules_query)
-    schedules = schedules_result.scalars().all()
 
     # ========================================
     # 4. CARGAR CLASES (año + horizonte)
     # ========================================
-    classes_query = select(Class).where(
+    classes_query = select(Class).options(*_SYNC_CLASS_OPTIONS).where(
         and_(
             Class.teacher_id == current_teacher.id,
             Class.date >= year_start,
             Class.date <= year_end,
         )
     )
-    classes_result = await db.execute(classes_query)
-    classes = classes_result.scalars().all()
 
     # ========================================
     # 5. CARGAR ASISTENCIAS (año + horizonte)
     # ========================================
     attendances_query = (
-        select(Attendance)
+        select(*_row_columns(Attendance, AttendanceResponse))
         .join(Class, Attendance.class_id == Class.id)
         .where(
             and_(
@@ -140,15 +689,12 @@ async def sync_initial(
             )
         )
     )
-    attendances_result = await db.execute(attendances_query)
-    attendances = attendances_result.scalars().all()
 
     # ========================================
     # 6. CARGAR INSTRUMENTOS
     # ========================================
-    instruments_query = select(Instrument)
-    instruments_result = await db.execute(instruments_query)
-    instruments = instruments_result.scalars().all()
+    # Catálogo compartido por todos los profesores: cache en memoria con TTL
+    # (ver instrument.get_all_cached), no se consulta en cada login.
 
     # ========================================
     # 7. CARGAR NOTAS DEL PROFESOR
@@ -156,11 +702,9 @@ async def sync_initial(
     # Solo notas propias del teacher (teacher_id).
     # Las notas de profesores anteriores se cargan
     # on-demand cuando el profesor abre el historial del alumno.
-    notes_query = select(EnrollmentNote).where(
+    notes_query = select(*_row_columns(EnrollmentNote, EnrollmentNoteResponse)).where(
         EnrollmentNote.teacher_id == current_teacher.id
     )
-    notes_result = await db.execute(notes_query)
-    notes = notes_result.scalars().all()
 
     # ========================================
     # 8. CARGAR CREDIT_TRANSACTIONS DEL PROFESOR
@@ -169,55 +713,106 @@ async def sync_initial(
     # NO implementamos Delta Purging para créditos porque el ledger
     # CreditTransaction no hace hard delete en operación normal.
     # Las transacciones solo se crean o actualizan (ej. liberar consumed_credit_tx_id).
-    credit_tx_query = select(CreditTransaction).where(
+    credit_tx_query = select(*_row_columns(CreditTransaction, CreditTransactionResponse)).where(
         CreditTransaction.enrollment_id.in_(
             select(Enrollment.id).where(Enrollment.teacher_id == current_teacher.id)
         )
     )
-    credit_tx_result = await db.execute(credit_tx_query)
-    credit_transactions = credit_tx_result.scalars().all()
 
     # ========================================
-    # 9. METADATA
+    # VERSIONES: omitir lo que el cliente ya tiene
     # ========================================
-    total_records = (
-        len(students)
-        + len(enrollments)
-        + len(schedules)
-        + len(classes)
-        + len(attendances)
-        + len(instruments)
-        + len(notes)
-        + len(credit_transactions)
-    )
+    # Se leen ANTES de las consultas: un cambio concurrente deja la versión
+    # vieja en la respuesta y el próximo sync vuelve a traer la entidad.
+    versions = await _fetch_sync_versions(current_teacher)
+    known_versions = request.known_versions or {}
+    unchanged = [
+        entity
+        for entity, version in versions.items()
+        if known_versions.get(entity) == version
+    ]
 
-    metadata = SyncMetadata(
-        sync_timestamp=sync_time,
-        total_records=total_records,
+    # Sin known_versions útiles la respuesta es la carga completa: se puede
+    # servir (y guardar) desde el cache del body
+    cache_key = (current_teacher.id, request.year)
+    fingerprint = (
+        tuple(sorted(versions.items())),
+        instrument_crud.catalog_version(),
+        settings.CURRENT_DATA_VERSION,
     )
+    if not unchanged:
+        cached_body = _initial_cache_get(cache_key, fingerprint)
+        if cached_body is not None:
+            return Response(content=cached_body, media_type="application/json")
+
+    async def _nothing() -> list:
+        return []
+
+    # Consultas independientes y de solo lectura: en paralelo (sesión propia c/u).
+    # Alumnos, inscripciones, asistencias, notas y créditos no anidan
+    # relaciones: se leen como filas de columnas (ver _row_columns). Horarios
+    # y clases sí (enrollment, attendance) y siguen como objetos ORM.
+    fetches = {
+        "students": lambda: _fetch_rows(students_query),
+        "enrollments": lambda: _fetch_rows(enrollments_query),
+        "schedules": lambda: _fetch_all(schedules_query),
+        "classes": lambda: _fetch_all(classes_query),
+        # Asistencias: la entidad más grande del año; van por cursor del
+        # servidor directo al stream (ver más abajo), no se cargan aquí
+        "attendances": _nothing,
+        "instruments": _fetch_cached_instruments,
+        "notes": lambda: _fetch_rows(notes_query),
+        "credit_transactions": lambda: _fetch_rows(credit_tx_query),
+    }
+    (
+        students,
+        enrollments,
+        schedules,
+        classes,
+        attendances,
+        instruments,
+        notes,
+        credit_transactions,
+    ) = await asyncio.gather(*(
+        _nothing() if entity in unchanged else fetch()
+        for entity, fetch in fetches.items()
+    ))
 
     # ========================================
-    # 10. RESPUESTA
+    # 9. RESPUESTA (streaming)
     # ========================================
-    return InitialSyncResponse(
-        students=list(students),  # type: ignore
-        enrollments=list(enrollments),  # type: ignore
-        schedules=list(schedules),  # type: ignore
-        classes=list(classes),  # type: ignore
-        attendances=list(attendances),  # type: ignore
-        instruments=list(instruments),  # type: ignore
-        notes=list(notes),  # type: ignore
-        credit_transactions=list(credit_transactions),  # type: ignore
-        data_version=settings.CURRENT_DATA_VERSION,
-        metadata=metadata,
+    # El JSON se emite entidad por entidad en fragmentos de
+    # SYNC_STREAM_CHUNK_SIZE filas: sin construir InitialSyncResponse ni el
+    # body completo en memoria, y GZip empieza a comprimir con el primer
+    # fragmento. Las asistencias se leen del cursor a medida que se envían.
+    # response_model queda solo para la documentación OpenAPI.
+    entities = {
+        "students": students,
+        "enrollments": enrollments,
+        "schedules": schedules,
+        "classes": classes,
+        "attendances": (
+            attendances if "attendances" in unchanged
+            else _stream_partitions(attendances_query)
+        ),
+        "instruments": instruments,
+        "notes": notes,
+        "credit_transactions": credit_transactions,
+    }
+    body = _stream_initial_sync(
+        entities, versions, unchanged, settings.CURRENT_DATA_VERSION, sync_time
     )
+    if not unchanged:
+        body = _cache_initial_body(cache_key, fingerprint, body)
+    return StreamingResponse(body, media_type="application/json")
 
 
 @router.get("/delta", response_model=DeltaSyncResponse)
 async def sync_delta(
+    request: Request,
+    response: Response,
     last_sync: str = Query(..., description="ISO datetime del último sync"),
     client_data_version: int = Query(None, description="Versión de datos del cliente"),
-    db: AsyncSession = Depends(get_db),
     current_teacher: Teacher = Depends(get_current_teacher)
 ):
     """
@@ -227,6 +822,10 @@ async def sync_delta(
     - Enrollments suspendidos/reactivados
     - Credit transactions actualizadas
     - Data version check (forzar full sync si versión desactualizada)
+
+    Responde con ETag (versión de los datos del profesor). Si el cliente lo
+    reenvía en If-None-Match y nada cambió desde entonces → 304 sin body y
+    sin ejecutar las consultas de cambios.
     """
     from datetime import datetime
 
@@ -250,148 +849,43 @@ async def sync_delta(
             "sync_timestamp": datetime.now().isoformat()
         }
     
-    # Parsear fecha, manejando posible espacio en lugar de + para timezone
-    try:
-        last_sync_date = datetime.fromisoformat(last_sync.replace('Z', '+00:00'))
-    except ValueError:
-        # Fallback si el formato no es exacto
-        last_sync_date = datetime.now()
+    etag = await _delta_etag(current_teacher)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
 
-    # 1. Schedules activos actualizados
-    active_schedules_result = await db.execute(
-        select(Schedule).where(
-            and_(
-                Schedule.teacher_id == current_teacher.id,
-                Schedule.updated_at > last_sync_date,
-                Schedule.active == True
-            )
-        )
-    )
-    active_schedules = active_schedules_result.scalars().all()
-    
-    # 2. ✅ NUEVO: Schedules desactivados recientemente
-    deactivated_schedules_result = await db.execute(
-        select(Schedule).where(
-            and_(
-                Schedule.teacher_id == current_teacher.id,
-                Schedule.active == False,
-                or_(
-                    Schedule.updated_at > last_sync_date,
-                    Schedule.valid_until >= (last_sync_date.date() if last_sync_date else date.today())
-                )
-            )
-        )
-    )
-    deactivated_schedules = deactivated_schedules_result.scalars().all()
-    
-    # 3. Enrollments actualizados (incluye suspendidos/reactivados)
-    enrollments_result = await db.execute(
-        select(Enrollment).where(
-            and_(
-                Enrollment.teacher_id == current_teacher.id,
-                Enrollment.updated_at > last_sync_date
-            )
-        )
-    )
-    enrollments = enrollments_result.scalars().all()
-    
-    # 4. Clases actualizadas
-    classes_result = await db.execute(
-        select(Class).where(
-            and_(
-                Class.teacher_id == current_teacher.id,
-                Class.updated_at > last_sync_date
-            )
-        )
-    )
-    classes = classes_result.scalars().all()
-    
-    # 5. Estudiantes actualizados
-    students_result = await db.execute(
-        select(Student).where(
-            and_(
-                Student.teacher_id == current_teacher.id,
-                Student.updated_at > last_sync_date
-            )
-        )
-    )
-    students = students_result.scalars().all()
-
-    # 6. Asistencias actualizadas (join con clases del profesor)
-    attendances_result = await db.execute(
-        select(Attendance)
-        .join(Class, Attendance.class_id == Class.id)
-        .where(
-            and_(
-                Class.teacher_id == current_teacher.id,
-                Attendance.updated_at > last_sync_date
-            )
-        )
-    )
-    attendances = attendances_result.scalars().all()
-
-    # 7. Notas del profesor actualizadas desde el último sync
-    notes_result = await db.execute(
-        select(EnrollmentNote).where(
-            and_(
-                EnrollmentNote.teacher_id == current_teacher.id,
-                EnrollmentNote.updated_at > last_sync_date,
-            )
-        )
-    )
-    notes = notes_result.scalars().all()
-
-    # 8. Credit transactions actualizadas desde el último sync
-    # NO implementamos Delta Purging para créditos porque el ledger
-    # CreditTransaction no hace hard delete en operación normal.
-    credit_tx_result = await db.execute(
-        select(CreditTransaction).where(
-            and_(
-                CreditTransaction.enrollment_id.in_(
-                    select(Enrollment.id).where(Enrollment.teacher_id == current_teacher.id)
-                ),
-                CreditTransaction.updated_at > last_sync_date
-            )
-        )
-    )
-    credit_transactions = credit_tx_result.scalars().all()
+    last_sync_date = _parse_last_sync(last_sync)
+    conditions = _delta_conditions(current_teacher, last_sync_date)
 
-    # 9. IDs de TODAS las notas vigentes del profesor (para purgar eliminadas en mobile)
-    valid_notes_result = await db.execute(
-        select(EnrollmentNote.id).where(
-            EnrollmentNote.teacher_id == current_teacher.id
-        )
-    )
-    valid_note_ids = [row[0] for row in valid_notes_result.all()]
+    # Timestamp ANTES de las consultas: el cliente lo usa como last_sync del
+    # próximo delta; tomado al final, un cambio confirmado mientras corren
+    # las consultas (y que ellas no vieron) quedaría antes del siguiente
+    # last_sync y no se enviaría nunca.
+    sync_timestamp = datetime.now().isoformat()
 
-    # 9. IDs de todas las clases vigentes del profesor (para que el móvil
-    #    pueda detectar y purgar clases que fueron eliminadas en el backend).
-    #    Solo seleccionamos la columna id → query muy liviana.
-    today = datetime.now(timezone.utc).date()
-    range_start = date(today.year, 1, 1)
-    range_end   = date(today.year + 1, 3, 31)
-
-    valid_ids_result = await db.execute(
-        select(Class.id).where(
-            and_(
-                Class.teacher_id == current_teacher.id,
-                Class.date >= range_start,
-                Class.date <= range_end,
-            )
-        )
+    # Consultas independientes y de solo lectura: en paralelo (sesión propia
+    # c/u). Los IDs vigentes van juntos en una sola consulta (UNION ALL).
+    (
+        schedules,
+        enrollments,
+        classes,
+        students,
+        attendances,
+        notes,
+        credit_transactions,
+        valid_ids,
+    ) = await asyncio.gather(
+        *(
+            _fetch_all(select(model).options(*_load_options(model)).where(condition))
+            for model, condition in conditions.values()
+        ),
+        _fetch_valid_ids(current_teacher),
     )
-    valid_class_ids = [row[0] for row in valid_ids_result.all()]
 
-    valid_att_result = await db.execute(
-        select(Attendance.id).join(Class, Attendance.class_id == Class.id).where(
-            and_(
-                Class.teacher_id == current_teacher.id,
-                Class.date >= range_start,
-                Class.date <= range_end,
-            )
-        )
-    )
-    valid_attendance_ids = [row[0] for row in valid_att_result.all()]
+    active_schedules = []
+    deactivated_schedules = []
+    for schedule_obj in schedules:
+        (active_schedules if schedule_obj.active else deactivated_schedules).append(schedule_obj)
 
     return {
         "needs_full_sync": False,
@@ -405,13 +899,111 @@ async def sync_delta(
         "attendances": list(attendances),
         "notes": list(notes),
         "credit_transactions": list(credit_transactions),
-        "valid_class_ids": list(valid_class_ids),
-        "valid_attendance_ids": list(valid_attendance_ids),
-        "valid_note_ids": list(valid_note_ids),
-        "sync_timestamp": datetime.now().isoformat()
+        **valid_ids,
+        "sync_timestamp": sync_timestamp
     }
 
 
+@router.get("/delta/summary", response_model=DeltaSummaryResponse)
+async def sync_delta_summary(
+    request: Request,
+    response: Response,
+    last_sync: str = Query(..., description="ISO datetime del último sync"),
+    client_data_version: int = Query(None, description="Versión de datos del cliente"),
+    current_teacher: Teacher = Depends(get_current_teacher)
+):
+    """
+    Delta liviano: solo (id, updated_at) de los registros cambiados.
+
+    Mismos filtros que /sync/delta, sin cuerpos. El cliente compara con sus
+    versiones locales y pide por POST /sync/batch solo los registros que no
+    tiene al día (un "cambio" que ya recibió por otra vía no viaja de nuevo).
+    /sync/delta sigue disponible para clientes que no usan este flujo.
+    """
+    if client_data_version is None or client_data_version < settings.CURRENT_DATA_VERSION:
+        return {
+            "needs_full_sync": True,
+            "sync_timestamp": datetime.now().isoformat()
+        }
+
+    etag = await _delta_etag(current_teacher, "summary")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    last_sync_date = _parse_last_sync(last_sync)
+    conditions = _delta_conditions(current_teacher, last_sync_date)
+
+    # Timestamp ANTES de las consultas: el cliente lo usa como last_sync del
+    # próximo delta; tomado al final, un cambio confirmado mientras corren
+    # las consultas (y que ellas no vieron) quedaría antes del siguiente
+    # last_sync y no se enviaría nunca.
+    sync_timestamp = datetime.now().isoformat()
+
+    # Un solo round-trip: las siete entidades y los IDs vigentes en un
+    # UNION ALL de (id, updated_at, entity). Solo tres columnas por fila: con
+    # los índices (teacher_id, updated_at) casi no se lee el heap.
+    valid_queries = _valid_ids_queries(current_teacher)
+    rows = await _fetch_rows(union_all(
+        *(
+            select(
+                model.id.label("id"),
+                model.updated_at.label("updated_at"),
+                literal(entity).label("entity"),
+            ).where(condition)
+            for entity, (model, condition) in conditions.items()
+        ),
+        *(
+            query.add_columns(null().label("updated_at"), literal(name).label("entity"))
+            for name, query in valid_queries.items()
+        ),
+    ))
+
+    payload: dict[str, list] = {name: [] for name in (*conditions, *valid_queries)}
+    for row in rows:
+        if row.entity in conditions:
+            payload[row.entity].append({"id": row.id, "updated_at": row.updated_at})
+        else:
+            payload[row.entity].append(row.id)
+
+    return {
+        "needs_full_sync": False,
+        **payload,
+        "sync_timestamp": sync_timestamp
+    }
+
+
+@router.post("/batch", response_model=SyncBatchResponse)
+async def sync_batch(
+    request: SyncBatchRequest,
+    current_teacher: Teacher = Depends(get_current_teacher)
+):
+    """
+    Devuelve los registros completos pedidos por ID (segunda fase del delta).
+
+    Solo devuelve registros del profesor autenticado; los IDs ajenos o
+    inexistentes se omiten sin error (el cliente los trata como eliminados).
+    """
+    requested = {
+        entity: ids
+        for entity, ids in request.model_dump().items()
+        if ids
+    }
+    results = await asyncio.gather(*(
+        _fetch_all(
+            select(_DELTA_MODELS[entity])
+            .options(*_load_options(_DELTA_MODELS[entity]))
+            .where(
+                _owned_by(_DELTA_MODELS[entity], current_teacher),
+                _by_ids(_DELTA_MODELS[entity], ids),
+            )
+        )
+        for entity, ids in requested.items()
+    ))
+
+    return dict(zip(requested, results))
+
+
 @router.post("/verify-operations", response_model=VerifyOperationsResponse)
 async def verify_operations(
     request: VerifyOperationsRequest,
@@ -446,7 +1038,7 @@ async def verify_operations(
 
     if ids_by_entity["student"]:
         students_result = await db.execute(
-            select(Student).where(
+            select(Student).options(*_SYNC_NO_RELATIONS).where(
                 and_(
                     Student.teacher_id == current_teacher.id,
                     Student.id.in_(ids_by_entity["student"]),
@@ -457,7 +1049,7 @@ async def verify_operations(
 
     if ids_by_entity["enrollment"]:
         enrollments_result = await db.execute(
-            select(Enrollment).where(
+            select(Enrollment).options(*_SYNC_NO_RELATIONS).where(
                 and_(
                     Enrollment.teacher_id == current_teacher.id,
                     Enrollment.id.in_(ids_by_entity["enrollment"]),
@@ -468,7 +1060,7 @@ async def verify_operations(
 
     if ids_by_entity["schedule"]:
         schedules_result = await db.execute(
-            select(Schedule).where(
+            select(Schedule).options(*_SYNC_NO_RELATIONS).where(
                 and_(
                     Schedule.teacher_id == current_teacher.id,
                     Schedule.id.in_(ids_by_entity["schedule"]),
@@ -479,7 +1071,7 @@ async def verify_operations(
 
     if ids_by_entity["class"]:
         classes_result = await db.execute(
-            select(Class).where(
+            select(Class).options(*_SYNC_NO_RELATIONS).where(
                 and_(
                     Class.teacher_id == current_teacher.id,
                     Class.id.in_(ids_by_entity["class"]),
@@ -490,11 +1082,9 @@ async def verify_operations(
 
     if ids_by_entity["attendance"]:
         attendances_result = await db.execute(
-            select(Attendance)
-            .join(Class, Attendance.class_id == Class.id)
-            .where(
+            select(Attendance).options(*_SYNC_NO_RELATIONS).where(
                 and_(
-                    Class.teacher_id == current_teacher.id,
+                    Attendance.teacher_id == current_teacher.id,
                     Attendance.id.in_(ids_by_entity["attendance"]),
                 )
             )
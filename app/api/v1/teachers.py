@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.security import get_current_teacher
+from app.core.security import get_current_teacher, invalidate_teacher_cache
 from app.core.permissions import resolve_permissions
 from app.crud import teacher
 from app.models.teacher import Teacher
@@ -129,6 +129,7 @@ async def update_my_instruments(
     current_teacher.instruments = list(instruments)
     await db.commit()
     await db.refresh(current_teacher)
+    invalidate_teacher_cache(current_teacher.email)
 
     permissions = resolve_permissions(
         role=current_teacher.role,
@@ -6,6 +6,7 @@ Exporta:
 - engine: Motor de SQLAlchemy
 - SessionLocal: Factory de sesiones
 - get_db: Dependency de FastAPI para obtener sesión de BD
+- get_db_ro: Dependency de solo lectura (réplica si está configurada)
 - init_db: Función para crear tablas
 
 Uso:
@@ -13,7 +14,7 @@ Uso:
 """
 
 from .config import settings
-from .database import engine, async_session_maker, get_db
+from .database import engine, async_session_maker, get_db, get_db_ro
 from .init_db import init_db, drop_db, reset_db
 
 __all__ = [
@@ -24,6 +25,7 @@ __all__ = [
     "engine",
     "async_session_maker",  # ✅ Nombre correcto
     "get_db",
+    "get_db_ro",
     
     # Inicialización
     "init_db",
@@ -11,9 +11,10 @@ Este módulo centraliza todas las configuraciones:
 Las variables pueden ser sobreescritas con variables de entorno (.env)
 """
 
+from functools import cached_property, lru_cache
 from pathlib import Path
-from pydantic import Field, validator
-from typing import List, Optional
+from pydantic import Field, computed_field, validator
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 # Ruta al archivo .env en la raíz del backend
@@ -21,6 +22,21 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 ENV_FILE = BASE_DIR / ".env"
 
 
+def _normalize_database_url(v: Optional[str]) -> str:
+    """Fuerza el driver asyncpg y agrega SSL para Render."""
+    if isinstance(v, str):
+        if v.startswith("postgresql://"):
+            v = v.replace("postgresql://", "postgresql+asyncpg://", 1)
+        
+        # Fix SSL for Render (requires SSL)
+        if "render.com" in v and "ssl=" not in v:
+            if "?" in v:
+                v += "&ssl=require"
+            else:
+                v += "?ssl=require"
+    return v or ""
+
+
 class Settings(BaseSettings):
     """
     Configuración de la aplicación.
@@ -58,17 +74,35 @@ class Settings(BaseSettings):
 
     @validator("DATABASE_URL", pre=True)
     def assemble_db_connection(cls, v: Optional[str], values: dict) -> str:
-        if isinstance(v, str):
-            if v.startswith("postgresql://"):
-                v = v.replace("postgresql://", "postgresql+asyncpg://", 1)
-            
-            # Fix SSL for Render (requires SSL)
-            if "render.com" in v and "ssl=" not in v:
-                if "?" in v:
-                    v += "&ssl=require"
-                else:
-                    v += "?ssl=require"
-        return v or ""
+        return _normalize_database_url(v)
+
+    # Réplica de solo lectura (opcional). Si no se define, las lecturas
+    # marcadas como "ro" usan la BD principal.
+    DATABASE_URL_REPLICA: Optional[str] = None
+
+    @validator("DATABASE_URL_REPLICA", pre=True)
+    def assemble_replica_connection(cls, v: Optional[str], values: dict) -> Optional[str]:
+        return _normalize_database_url(v) or None
+
+    # PgBouncer en modo transaction: el pooling lo hace PgBouncer, SQLAlchemy
+    # no debe mantener su propio pool (NullPool) ni usar prepared statements cacheados
+    USE_PGBOUNCER: bool = False
+
+    # Pool de conexiones del engine principal (sin PgBouncer). El sync lanza
+    # ~8 consultas en paralelo por request (asyncio.gather, una conexión c/u),
+    # así que unas pocas requests concurrentes ya ocupan decenas de conexiones.
+    # Ajustar al max_connections del servidor: (pool_size + max_overflow) por
+    # worker × workers debe quedar por debajo.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    # Segundos esperando una conexión libre antes de responder 503
+    DB_POOL_TIMEOUT: int = 10
+
+    # Carga estricta de relaciones: las consultas con opciones de carga explícitas
+    # usan raiseload("*") en lugar de noload("*"), así un acceso a una relación no
+    # prevista (p. ej. un campo nuevo en un schema) falla en desarrollo/CI en vez
+    # de devolver vacío. En producción queda en False.
+    STRICT_LOADING: bool = False
     
     # ========================================
     # SEGURIDAD Y AUTENTICACIÓN
@@ -76,6 +110,9 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 43200  # 30 días (sliding window)
+    # Costo de bcrypt (2^rounds iteraciones) para hashes NUEVOS; los hashes
+    # existentes guardan su propio costo. Bajarlo solo en desarrollo/tests.
+    BCRYPT_ROUNDS: int = 12
     
     # ========================================
     # API
@@ -93,24 +130,18 @@ class Settings(BaseSettings):
         alias="ALLOWED_ORIGINS" # Le decimos a Pydantic que busque la variable de entorno ALLOWED_ORIGINS
     )
     
-    # 2. LISTA PROCESADA (Lo que usa el middleware)
-    BACKEND_CORS_ORIGINS: List[str] = [] # Se inicializa vacía, se llena en el validador
-    
-    # [ELIMINA las variables ALLOWED_ORIGINS: str y BACKEND_CORS_ORIGINS: List[str] antiguas]
-
-    # ... (otras variables)
-    
-    # CRÍTICO: Este método convierte la cadena del entorno en una lista que FastAPI necesita.
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
-    def assemble_cors_origins(cls, v: Optional[List[str]], values: dict) -> List[str] | List:
-        # Usa la cadena cargada del entorno (CORS_ORIGINS_STR)
-        origins_str = values.get("CORS_ORIGINS_STR", "")
-        if origins_str:
-            # Separa la cadena por comas y elimina espacios en blanco
-            return [url.strip() for url in origins_str.split(',')]
-        
-        # Si no se encontró la variable, devuelve la lista vacía o el valor por defecto
-        return v or []
+    # 2. TUPLA PROCESADA (Lo que usa el middleware)
+    # Se calcula una sola vez por instancia a partir de CORS_ORIGINS_STR
+    # (separada por comas, sin espacios ni entradas vacías). Tupla: inmutable,
+    # el middleware la usa sin copiarla.
+    @computed_field
+    @cached_property
+    def BACKEND_CORS_ORIGINS(self) -> tuple[str, ...]:
+        return tuple(
+            origin.strip()
+            for origin in self.CORS_ORIGINS_STR.split(",")
+            if origin.strip()
+        )
     
     # ========================================
     # TARIFAS POR DEFECTO (opcional)
@@ -133,8 +164,22 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Configuración de la aplicación (una sola instancia por proceso).
+
+    El entorno y el .env se leen una vez; recargas del módulo y dependencias
+    (Depends(get_settings)) reutilizan la misma instancia.
+
+    Returns:
+        Settings ya parseado
+    """
+    return Settings()
+
+
 # Instancia global de configuración
-settings = Settings()
+settings = get_settings()
 
 # Debug: imprimir DATABASE_URL para verificar
 print(f"[CONFIG] DATABASE_URL: {settings.DATABASE_URL}")
\ No newline at end of file
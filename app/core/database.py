@@ -1,17 +1,71 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from typing import AsyncGenerator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from typing import AsyncGenerator, AsyncIterator
+from fastapi import Request
 
 from .config import settings
 
+# Argumentos de conexión asyncpg para conexiones directas (pool propio):
+# - statement_cache_size: cache de prepared statements por conexión en asyncpg
+# - prepared_statement_cache_size: cache del dialecto asyncpg de SQLAlchemy
+# - jit off: las consultas de la app son OLTP cortas; el JIT de Postgres solo
+#   suma tiempo de compilación en planes que nunca lo amortizan
+_ASYNCPG_CONNECT_ARGS = {
+    "statement_cache_size": 2048,
+    "prepared_statement_cache_size": 512,
+    "server_settings": {"jit": "off"},
+}
+
 # Motor de base de datos ASYNC
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verifica conexiones antes de usarlas
-    echo=False,  # True para ver SQL en desarrollo
-    pool_size=5,
-    max_overflow=10,
-    future=True  # SQLAlchemy 2.0 style
-)
+if settings.USE_PGBOUNCER:
+    # Detrás de PgBouncer (transaction pooling): sin pool propio (evita doble pooling
+    # y el SELECT 1 de pre-ping en cada checkout) y sin cache de prepared statements
+    # de asyncpg (no sobreviven al cambio de conexión entre transacciones)
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=NullPool,
+        echo=False,
+        future=True,
+        connect_args={
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+        },
+    )
+else:
+    # Pool explícito: QueuePool (sync) con asyncpg bloquea el event loop
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_pre_ping=True,  # Verifica conexiones antes de usarlas
+        echo=False,  # True para ver SQL en desarrollo
+        pool_size=settings.DB_POOL_SIZE,  # Conexiones persistentes (request + consultas paralelas del sync)
+        max_overflow=settings.DB_MAX_OVERFLOW,  # Conexiones extra en picos
+        pool_timeout=settings.DB_POOL_TIMEOUT,  # Fallar (503) en vez de encolar requests 30s con el pool agotado
+        pool_recycle=1800,  # Reciclar conexiones cada 30 min (evita cortes del servidor)
+        connect_args=_ASYNCPG_CONNECT_ARGS,
+        future=True  # SQLAlchemy 2.0 style
+    )
+
+# Motor de solo lectura (réplica). Sin réplica configurada, es el mismo engine.
+if settings.DATABASE_URL_REPLICA:
+    engine_ro = create_async_engine(
+        settings.DATABASE_URL_REPLICA,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_pre_ping=True,
+        echo=False,
+        pool_size=10,
+        max_overflow=10,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=1800,
+        connect_args=_ASYNCPG_CONNECT_ARGS,
+        future=True
+    )
+else:
+    engine_ro = engine
 
 # Session factory ASYNC
 async_session_maker = async_sessionmaker(
@@ -22,11 +76,45 @@ async_session_maker = async_sessionmaker(
     autoflush=False
 )
 
+# Session factory ASYNC de solo lectura (réplica)
+async_session_maker_ro = async_sessionmaker(
+    engine_ro,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+)
+
+async def warm_up_pool() -> int:
+    """
+    Llena el pool principal abriendo DB_POOL_SIZE conexiones en paralelo.
+
+    Las conexiones vuelven al pool ya autenticadas: el primer minuto de
+    tráfico no paga el handshake de cada una. Con PgBouncer (NullPool)
+    no hay pool que llenar.
+
+    Returns:
+        Cantidad de conexiones abiertas
+    """
+    if settings.USE_PGBOUNCER:
+        return 0
+
+    async def _checkout() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_checkout() for _ in range(settings.DB_POOL_SIZE)))
+    return settings.DB_POOL_SIZE
+
+
 # Dependency para FastAPI (ASYNC)
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency que proporciona una sesión de base de datos asíncrona.
     Se cierra automáticamente al finalizar la request.
+
+    Una sola sesión por request, sin session.begin() envolvente: la conexión
+    se toma del pool al primer query y se devuelve en cada commit/rollback.
     
     Usage:
         @app.get("/endpoint")
@@ -37,4 +125,53 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+@asynccontextmanager
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    Sesión para código fuera de una request (jobs, scripts).
+
+    Context manager directo en lugar de iterar el generador de get_db:
+    la sesión se cierra al salir del bloque, también si hay excepción.
+
+    Usage:
+        async with get_session() as db:
+            ...
+    """
+    async with async_session_maker() as session:
+        yield session
+
+
+def get_request_db(request: Request) -> AsyncSession:
+    """
+    Dependency que devuelve la sesión de la request abierta por DBSessionMiddleware.
+
+    A diferencia de get_db (generador con yield, cuyo cierre FastAPI ejecuta
+    al finalizar las dependencias, después de enviar la respuesta), la sesión
+    la cierra el middleware apenas el handler devuelve la respuesta: la
+    conexión vuelve al pool antes.
+
+    Usage:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_request_db)):
+            ...
+    """
+    return request.state.db
+
+
+async def get_db_ro() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency de solo lectura: sesión sobre la réplica (DATABASE_URL_REPLICA).
+
+    Solo para endpoints/consultas que NO escriben. Si no hay réplica
+    configurada usa la BD principal.
+
+    Usage:
+        @app.post("/login")
+        async def login(db_ro: AsyncSession = Depends(get_db_ro)):
+            ...
+    """
+    async with async_session_maker_ro() as session:
+        yield session
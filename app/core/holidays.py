@@ -97,7 +97,15 @@ HOLIDAYS_2026 = [
 # LISTA COMBINADA DE TODOS LOS FERIADOS
 # ============================================
 
-ALL_HOLIDAYS = HOLIDAYS_2025 + HOLIDAYS_2026
+# frozenset: is_holiday se llama por cada día al generar clases → O(1)
+ALL_HOLIDAYS: frozenset[date] = frozenset(HOLIDAYS_2025 + HOLIDAYS_2026)
+
+# Feriados por año, ya ordenados (get_holidays_by_year / get_holidays_in_range
+# solo recorren los años del rango pedido)
+_HOLIDAYS_BY_YEAR: dict[int, tuple[date, ...]] = {
+    year: tuple(sorted(h for h in ALL_HOLIDAYS if h.year == year))
+    for year in {h.year for h in ALL_HOLIDAYS}
+}
 
 
 # ============================================
@@ -142,7 +150,8 @@ def get_holidays_in_range(start_date: date, end_date: date) -> list[date]:
     """
     return [
         holiday
-        for holiday in ALL_HOLIDAYS
+        for year in range(start_date.year, end_date.year + 1)
+        for holiday in _HOLIDAYS_BY_YEAR.get(year, ())
         if start_date <= holiday <= end_date
     ]
 
@@ -161,8 +170,4 @@ def get_holidays_by_year(year: int) -> list[date]:
         >>> get_holidays_by_year(2025)
         [date(2025, 1, 1), date(2025, 1, 22), ...]
     """
-    return [
-        holiday
-        for holiday in ALL_HOLIDAYS
-        if holiday.year == year
-    ]
+    return list(_HOLIDAYS_BY_YEAR.get(year, ()))
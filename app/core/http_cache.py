@@ -0,0 +1,82 @@
+"""
+Caché HTTP condicional (ETag / If-None-Match)
+
+Permite que los endpoints de lectura respondan 304 Not Modified cuando el
+cliente ya tiene la versión actual, sin serializar de nuevo el payload.
+
+Uso:
+    etag = compute_etag(teacher_id, start_date, end_date, count, max_updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+"""
+
+import hashlib
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def compute_etag(*parts) -> str:
+    """
+    Calcula un ETag débil a partir de los valores que determinan la respuesta.
+
+    Args:
+        *parts: Valores que identifican la versión (ids, rangos, timestamps, conteos)
+
+    Returns:
+        ETag con comillas, listo para el header (ej: 'W/"3f2a..."')
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Indica si el If-None-Match de la request coincide con el ETag actual.
+
+    Args:
+        request: Request entrante
+        etag: ETag de la versión actual
+
+    Returns:
+        True si el cliente ya tiene esta versión
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {value.strip() for value in header.split(",")}
+    # Comparación débil: ignorar el prefijo W/
+    bare = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == bare for candidate in candidates)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """
+    Agrega ETag y Cache-Control (revalidar siempre, caché privada) a la respuesta.
+
+    Args:
+        response: Response de FastAPI (inyectada en el endpoint)
+        etag: ETag de la versión actual
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Construye una respuesta 304 Not Modified (sin body).
+
+    Args:
+        etag: ETag de la versión actual
+
+    Returns:
+        Response 304 con los mismos headers de caché
+    """
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
@@ -31,6 +31,7 @@ Uso:
 
 import sys
 import asyncio
+import logging
 from pathlib import Path
 
 # Agregar el directorio raíz al path para imports
@@ -38,8 +39,12 @@ root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
 from app.core.database import engine
+from app.core.logging import setup_app_logging, shutdown_app_logging
 from app.models import Base
 
+# Nombre fijo: ejecutado con `python -m`, __name__ sería "__main__"
+logger = logging.getLogger("app.core.init_db")
+
 
 async def init_db():
     """
@@ -54,20 +59,18 @@ async def init_db():
     Para recrear tablas, usar drop_db() primero.
     """
     try:
-        print("🔄 Creando tablas en la base de datos...")
-        print(f"📍 Conectando a: {engine.url}")
+        logger.info("🔄 Creando tablas en la base de datos...")
+        logger.info("📍 Conectando a: %s", engine.url)
         
         # Crear todas las tablas (async)
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         
-        print("✅ ¡Tablas creadas exitosamente!")
-        print("\n📋 Tablas creadas:")
-        for table in Base.metadata.sorted_tables:
-            print(f"   - {table.name}")
+        table_list = "\n".join(f"   - {table.name}" for table in Base.metadata.sorted_tables)
+        logger.info("✅ ¡Tablas creadas exitosamente!\n📋 Tablas creadas:\n%s", table_list)
             
     except Exception as e:
-        print(f"❌ Error al crear las tablas: {e}")
+        logger.error("❌ Error al crear las tablas: %s", e)
         sys.exit(1)
 
 
@@ -79,23 +82,26 @@ async def drop_db():
     Solo usar en desarrollo para recrear el schema.
     """
     try:
-        print("⚠️  ADVERTENCIA: Esto eliminará TODAS las tablas")
-        confirm = input("¿Estás seguro? (escribe 'SI' para confirmar): ")
+        # Aviso dentro del prompt: el log va por otro hilo y podría salir después
+        confirm = input(
+            "⚠️  ADVERTENCIA: Esto eliminará TODAS las tablas\n"
+            "¿Estás seguro? (escribe 'SI' para confirmar): "
+        )
         
         if confirm != "SI":
-            print("❌ Operación cancelada")
+            logger.info("❌ Operación cancelada")
             return
             
-        print("🔄 Eliminando tablas...")
+        logger.info("🔄 Eliminando tablas...")
         
         # Eliminar todas las tablas (async)
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
         
-        print("✅ Tablas eliminadas exitosamente")
+        logger.info("✅ Tablas eliminadas exitosamente")
         
     except Exception as e:
-        print(f"❌ Error al eliminar las tablas: {e}")
+        logger.error("❌ Error al eliminar las tablas: %s", e)
         sys.exit(1)
 
 
@@ -106,7 +112,7 @@ async def reset_db():
     ⚠️ CUIDADO: Esta acción es IRREVERSIBLE.
     Útil para desarrollo cuando cambias el schema.
     """
-    print("🔄 Reiniciando base de datos...")
+    logger.info("🔄 Reiniciando base de datos...")
     await drop_db()
     await init_db()
 
@@ -120,20 +126,24 @@ def main():
         python -m app.core.init_db drop      # Eliminar tablas
         python -m app.core.init_db reset     # Reiniciar (eliminar + crear)
     """
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
-        
-        if command == "drop":
-            asyncio.run(drop_db())
-        elif command == "reset":
-            asyncio.run(reset_db())
+    setup_app_logging()
+    try:
+        if len(sys.argv) > 1:
+            command = sys.argv[1].lower()
+            
+            if command == "drop":
+                asyncio.run(drop_db())
+            elif command == "reset":
+                asyncio.run(reset_db())
+            else:
+                logger.error("❌ Comando desconocido: %s (disponibles: drop, reset)", command)
+                sys.exit(1)
         else:
-            print(f"❌ Comando desconocido: {command}")
-            print("Comandos disponibles: drop, reset")
-            sys.exit(1)
-    else:
-        # Por defecto, crear tablas
-        asyncio.run(init_db())
+            # Por defecto, crear tablas
+            asyncio.run(init_db())
+    finally:
+        # Vaciar la cola antes de salir (también en sys.exit)
+        shutdown_app_logging()
 
 
 if __name__ == "__main__":
@@ -6,7 +6,23 @@ NOTA: slowapi lee el .env automaticamente via starlette.Config.
 El .env debe estar en ASCII puro (sin tildes) para evitar
 el error de encoding cp1252 en Windows.
 """
+from fastapi import Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 limiter = Limiter(key_func=get_remote_address)
+
+
+def teacher_key(request: Request) -> str:
+    """
+    Key de rate limit por profesor autenticado (claim `sub` del JWT).
+
+    El payload ya verificado lo deja la dependency de auth en
+    request.state.jwt_payload; sin él (request anónima) se usa la IP.
+    Para endpoints autenticados: varios profesores detrás de la misma
+    IP (NAT, proxy) no comparten el cupo.
+    """
+    payload = getattr(request.state, "jwt_payload", None)
+    if payload and payload.get("sub"):
+        return f"teacher:{payload['sub']}"
+    return get_remote_address(request)
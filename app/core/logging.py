@@ -20,14 +20,73 @@ Uso cuando la acción falla (sin teacher_id):
         success=False,
         detail=f"email: {credentials.email}",
     )
+
+Además configura los loggers del scheduler y de init_db (setup_app_logging),
+que reemplazan sus print(): la escritura a stderr la hace un hilo aparte,
+fuera del event loop.
 """
 
+import logging
+import logging.handlers
+import queue
+
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.security_log import SecurityLog
 
 
+# ── Logging de aplicación (cola + hilo escritor) ──────────────────────────────
+
+APP_LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+# Solo estos loggers pasan a INFO con handler propio; el resto de app.*
+# sigue como antes (sin configurar: solo WARNING o más por lastResort)
+APP_QUEUED_LOGGERS = ("app.core.scheduler", "app.core.init_db")
+
+_log_listener: logging.handlers.QueueListener | None = None
+
+
+def setup_app_logging(level: int = logging.INFO) -> None:
+    """
+    Configura los loggers de APP_QUEUED_LOGGERS con un QueueHandler.
+
+    El event loop solo encola el registro; un QueueListener (hilo propio)
+    lo formatea y escribe en stderr. Idempotente: llamadas repetidas no
+    agregan handlers.
+
+    Args:
+        level: Nivel mínimo de esos loggers (default: INFO)
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()  # stderr
+    stream_handler.setFormatter(logging.Formatter(APP_LOG_FORMAT))
+
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    for name in APP_QUEUED_LOGGERS:
+        queued_logger = logging.getLogger(name)
+        queued_logger.setLevel(level)
+        queued_logger.addHandler(queue_handler)
+        queued_logger.propagate = False
+
+
+def shutdown_app_logging() -> None:
+    """
+    Detiene el QueueListener, escribiendo antes los registros pendientes.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
 # ── Constantes de acciones ────────────────────────────────────────────────────
 
 class Actions:
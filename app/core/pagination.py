@@ -0,0 +1,96 @@
+"""
+Paginación por cursor (keyset)
+
+En lugar de OFFSET (Postgres lee y descarta todas las filas saltadas), el
+cliente envía el cursor de la última fila recibida y la consulta continúa
+desde ahí con un predicado sobre la clave de orden.
+
+El cursor es opaco para el cliente: JSON de la clave de orden codificado
+en base64url sin padding.
+
+Uso:
+    cursor = encode_cursor(last.created_at, last.id)
+    created_at, last_id = decode_cursor(cursor)
+
+    # Claves de orden arbitrarias (valores JSON: str, int...)
+    cursor = encode_keyset(last.name, last.id)
+    name, last_id = decode_keyset(cursor, 2)
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Codifica la clave (created_at, id) de la última fila de una página.
+
+    Args:
+        created_at: created_at de la última fila devuelta
+        row_id: id de la última fila devuelta
+
+    Returns:
+        Cursor base64url (sin padding)
+    """
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decodifica un cursor generado por encode_cursor().
+
+    Args:
+        cursor: Cursor recibido del cliente
+
+    Returns:
+        Tupla (created_at, id)
+
+    Raises:
+        ValueError: Si el cursor está malformado
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at_str, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at_str), int(row_id)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def encode_keyset(*values) -> str:
+    """
+    Codifica una clave de orden arbitraria de la última fila de una página.
+
+    Args:
+        *values: Valores de la clave de orden (serializables a JSON)
+
+    Returns:
+        Cursor base64url (sin padding)
+    """
+    raw = json.dumps(list(values), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_keyset(cursor: str, size: int) -> list:
+    """
+    Decodifica un cursor generado por encode_keyset().
+
+    Args:
+        cursor: Cursor recibido del cliente
+        size: Cantidad de valores esperada en la clave
+
+    Returns:
+        Lista con los valores de la clave (tipos JSON; convertir en el llamador)
+
+    Raises:
+        ValueError: Si el cursor está malformado
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Cursor de paginación inválido")
+    return values
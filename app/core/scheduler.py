@@ -12,17 +12,22 @@ IMPORTANTE:
 - Los jobs corren en el mismo proceso de FastAPI (no requiere workers externos)
 """
 
+import logging
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from datetime import date, datetime, timezone
 
-from app.core.database import get_db, async_session_maker
+from app.core.database import get_session, async_session_maker
+from app.jobs.background import exclusive, JobAlreadyRunning, MONTHLY_JOB_KEY
 from app.jobs.class_generator import generate_monthly_classes
 from app.jobs.financial_jobs import generate_billing_periods, generate_personnel_payments
 from app.models.job_run_log import JobRunLog
 
+logger = logging.getLogger(__name__)
+
 
 # ============================================
 # CREAR SCHEDULER GLOBAL
@@ -49,10 +54,10 @@ async def monthly_billing_periods_job():
     - Calcular descuento aplicando FeeDiscounts vigentes
     - Loguear estadísticas
     """
-    print("[JOB] Iniciando generación mensual de billing periods...")
+    logger.info("[JOB] Iniciando generación mensual de billing periods...")
 
     # Obtener sesión de base de datos
-    async for db in get_db():
+    async with get_session() as db:
         try:
             # Intentar adquirir lock exclusivo con key distinta al job de clases
             lock_result = await db.execute(
@@ -60,20 +65,20 @@ async def monthly_billing_periods_job():
             )
             lock_acquired = lock_result.scalar()
             if not lock_acquired:
-                print("[JOB] Otro worker ya está ejecutando el job de billing periods, omitiendo.")
-                break
+                logger.info("[JOB] Otro worker ya está ejecutando el job de billing periods, omitiendo.")
+                return
 
             result = await generate_billing_periods(db)
 
-            print(f"[JOB] Generación de billing periods completada:")
-            print(f"  - Períodos creados: {result['created']}")
-            print(f"  - Períodos saltados: {result['skipped']}")
-            print(f"  - Enrollments procesados: {result['enrollments_processed']}")
-
-            if result.get('errors'):
-                print(f"  - Errores: {len(result['errors'])}")
-                for error in result['errors'][:5]:  # Mostrar solo primeros 5
-                    print(f"    • {error}")
+            logger.info(
+                "[JOB] Generación de billing periods completada: períodos creados=%s, períodos saltados=%s, enrollments procesados=%s, errores=%s",
+                result['created'],
+                result['skipped'],
+                result['enrollments_processed'],
+                len(result.get('errors') or []),
+            )
+            for error in (result.get('errors') or [])[:5]:  # Mostrar solo primeros 5
+                logger.warning("[JOB]   • %s", error)
 
             # Actualizar marcador de ejecución
             current_month = date.today().strftime("%Y-%m")
@@ -89,12 +94,10 @@ async def monthly_billing_periods_job():
                 ))
 
             await db.commit()
-            print(f"[JOB] Marcador actualizado para {current_month}")
+            logger.info("[JOB] Marcador actualizado para %s", current_month)
 
         except Exception as e:
-            print(f"[JOB] Error en generación de billing periods: {str(e)}")
-
-        break  # Solo usar la primera sesión
+            logger.error("[JOB] Error en generación de billing periods: %s", e)
 
 
 async def monthly_personnel_payments_job():
@@ -111,10 +114,10 @@ async def monthly_personnel_payments_job():
     - Calcular según payment_mode (per_class, monthly_fixed, mixed)
     - Loguear estadísticas
     """
-    print("[JOB] Iniciando generación mensual de personnel payments...")
+    logger.info("[JOB] Iniciando generación mensual de personnel payments...")
 
     # Obtener sesión de base de datos
-    async for db in get_db():
+    async with get_session() as db:
         try:
             # Intentar adquirir lock exclusivo con key distinta
             lock_result = await db.execute(
@@ -122,20 +125,20 @@ async def monthly_personnel_payments_job():
             )
             lock_acquired = lock_result.scalar()
             if not lock_acquired:
-                print("[JOB] Otro worker ya está ejecutando el job de personnel payments, omitiendo.")
-                break
+                logger.info("[JOB] Otro worker ya está ejecutando el job de personnel payments, omitiendo.")
+                return
 
             result = await generate_personnel_payments(db)
 
-            print(f"[JOB] Generación de personnel payments completada:")
-            print(f"  - Liquidaciones creadas: {result['created']}")
-            print(f"  - Liquidaciones saltadas: {result['skipped']}")
-            print(f"  - Teachers procesados: {result['teachers_processed']}")
-
-            if result.get('errors'):
-                print(f"  - Errores: {len(result['errors'])}")
-                for error in result['errors'][:5]:  # Mostrar solo primeros 5
-                    print(f"    • {error}")
+            logger.info(
+                "[JOB] Generación de personnel payments completada: liquidaciones creadas=%s, liquidaciones saltadas=%s, teachers procesados=%s, errores=%s",
+                result['created'],
+                result['skipped'],
+                result['teachers_processed'],
+                len(result.get('errors') or []),
+            )
+            for error in (result.get('errors') or [])[:5]:  # Mostrar solo primeros 5
+                logger.warning("[JOB]   • %s", error)
 
             # Actualizar marcador de ejecución
             current_month = date.today().strftime("%Y-%m")
@@ -151,12 +154,10 @@ async def monthly_personnel_payments_job():
                 ))
 
             await db.commit()
-            print(f"[JOB] Marcador actualizado para {current_month}")
+            logger.info("[JOB] Marcador actualizado para %s", current_month)
 
         except Exception as e:
-            print(f"[JOB] Error en generación de personnel payments: {str(e)}")
-
-        break  # Solo usar la primera sesión
+            logger.error("[JOB] Error en generación de personnel payments: %s", e)
 
 
 async def monthly_class_generation_job():
@@ -172,10 +173,10 @@ async def monthly_class_generation_job():
     - Saltar clases duplicadas y feriados
     - Loguear estadísticas
     """
-    print("[JOB] Iniciando generación mensual de clases...")
+    logger.info("[JOB] Iniciando generación mensual de clases...")
 
     # Obtener sesión de base de datos
-    async for db in get_db():
+    async with get_session() as db:
         try:
             # Intentar adquirir lock exclusivo. Si otro worker ya lo tiene, salir.
             lock_result = await db.execute(
@@ -183,21 +184,27 @@ async def monthly_class_generation_job():
             )
             lock_acquired = lock_result.scalar()
             if not lock_acquired:
-                print("[JOB] Otro worker ya está ejecutando el job, omitiendo.")
-                break
+                logger.info("[JOB] Otro worker ya está ejecutando el job, omitiendo.")
+                return
 
             from_date = date.today().replace(day=1)  # Generar clases a partir del primer día del mes actual
-            result = await generate_monthly_classes(db, from_date=from_date)
-
-            print(f"[JOB] Generación completada:")
-            print(f"  - Clases creadas: {result['created']}")
-            print(f"  - Clases saltadas: {result['skipped']}")
-            print(f"  - Enrollments procesados: {result['enrollments_processed']}")
+            # Misma key que los endpoints manuales: no solapar con una generación en curso
+            try:
+                async with exclusive(MONTHLY_JOB_KEY):
+                    result = await generate_monthly_classes(db, from_date=from_date)
+            except JobAlreadyRunning:
+                logger.info("[JOB] Generación mensual manual en curso, omitiendo.")
+                return
 
-            if result.get('errors'):
-                print(f"  - Errores: {len(result['errors'])}")
-                for error in result['errors'][:5]:  # Mostrar solo primeros 5
-                    print(f"    • {error}")
+            logger.info(
+                "[JOB] Generación completada: clases creadas=%s, clases saltadas=%s, enrollments procesados=%s, errores=%s",
+                result['created'],
+                result['skipped'],
+                result['enrollments_processed'],
+                len(result.get('errors') or []),
+            )
+            for error in (result.get('errors') or [])[:5]:  # Mostrar solo primeros 5
+                logger.warning("[JOB]   • %s", error)
 
             # Actualizar marcador de ejecución
             current_month = date.today().strftime("%Y-%m")
@@ -213,12 +220,10 @@ async def monthly_class_generation_job():
                 ))
 
             await db.commit()
-            print(f"[JOB] Marcador actualizado para {current_month}")
+            logger.info("[JOB] Marcador actualizado para %s", current_month)
 
         except Exception as e:
-            print(f"[JOB] Error en generación mensual: {str(e)}")
-
-        break  # Solo usar la primera sesión
+            logger.error("[JOB] Error en generación mensual: %s", e)
 
 
 async def check_and_run_missed_job():
@@ -246,7 +251,7 @@ async def check_and_run_missed_job():
             )
             lock_acquired = lock_result.scalar()
             if not lock_acquired:
-                print("[SCHEDULER] Otro worker ya está ejecutando check_and_run_missed_job, omitiendo.")
+                logger.info("[SCHEDULER] Otro worker ya está ejecutando check_and_run_missed_job, omitiendo.")
                 return
 
             # Buscar el marcador para "monthly_class_generation"
@@ -254,14 +259,19 @@ async def check_and_run_missed_job():
 
             # Si ya corrió este mes, no hacer nada
             if log_entry and log_entry.last_run_year_month == current_month:
-                print(f"[SCHEDULER] Job mensual ya ejecutado este mes ({current_month}), omitiendo")
+                logger.info("[SCHEDULER] Job mensual ya ejecutado este mes (%s), omitiendo", current_month)
                 return
 
             # No corrió este mes → ejecutar ahora
-            print(f"[SCHEDULER] Job mensual no detectado para {current_month}, ejecutando...")
+            logger.info("[SCHEDULER] Job mensual no detectado para %s, ejecutando...", current_month)
             start_of_month = date.today().replace(day=1)
-            result = await generate_monthly_classes(db, from_date=start_of_month)
-            print(f"[SCHEDULER] Job completado: {result}")
+            try:
+                async with exclusive(MONTHLY_JOB_KEY):
+                    result = await generate_monthly_classes(db, from_date=start_of_month)
+            except JobAlreadyRunning:
+                logger.info("[SCHEDULER] Generación mensual manual en curso, omitiendo")
+                return
+            logger.info("[SCHEDULER] Job completado: %s", result)
 
             # Actualizar o crear el marcador
             if log_entry:
@@ -275,10 +285,10 @@ async def check_and_run_missed_job():
                 ))
 
             await db.commit()
-            print(f"[SCHEDULER] Marcador actualizado para {current_month}")
+            logger.info("[SCHEDULER] Marcador actualizado para %s", current_month)
 
     except Exception as e:
-        print(f"[SCHEDULER] Error en check_and_run_missed_job: {str(e)} — se ejecutará con la primera request")
+        logger.error("[SCHEDULER] Error en check_and_run_missed_job: %s — se ejecutará con la primera request", e)
         # No relanzar la excepción para no interrumpir el startup
 
 
@@ -323,10 +333,11 @@ def start_scheduler():
     # )
 
     scheduler.start()
-    print("[SCHEDULER] ✅ Iniciado - Jobs mensuales configurados:")
-    print("  - Clases: día 1, 02:00 AM")
-    print("  - Billing Periods: día 1, 00:00 AM")
-    print("  - Personnel Payments: deshabilitado (flujo manual)")
+    logger.info(
+        "[SCHEDULER] ✅ Iniciado - Jobs mensuales configurados: "
+        "clases día 1 02:00, billing periods día 1 00:00, "
+        "personnel payments deshabilitado (flujo manual)"
+    )
 
 
 def shutdown_scheduler():
@@ -336,7 +347,7 @@ def shutdown_scheduler():
     Se ejecuta automáticamente en el shutdown event de FastAPI.
     """
     scheduler.shutdown()
-    print("[SCHEDULER] ❌ Detenido")
+    logger.info("[SCHEDULER] ❌ Detenido")
 
 
 # ============================================
@@ -9,39 +9,119 @@ Funcionalidades:
 Uso:
     from app.core.security import get_password_hash, verify_password, create_access_token
     
-    # Hash password
-    hashed = get_password_hash("mi_password")
+    # Hash password (async: bcrypt corre en un thread)
+    hashed = await get_password_hash("mi_password")
     
     # Verificar password
-    is_valid = verify_password("mi_password", hashed)
+    is_valid = await verify_password("mi_password", hashed)
     
     # Crear JWT
     token = create_access_token({"sub": user_email})
 """
 
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
 import bcrypt
-from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+import jwt
+from jwt.exceptions import InvalidTokenError as JWTError
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.teacher import Teacher
 from .config import settings
-from .database import get_db
+from .database import get_db, async_session_maker
+from .permissions import resolve_permissions
 
 # Security scheme para Swagger UI
 security = HTTPBearer()
 
+# Clave, algoritmo y expiración JWT precomputados: PyJWT acepta bytes
+# directamente y así no se re-codifica la clave en cada encode/decode. La
+# configuración no cambia en runtime (get_settings está cacheado).
+_SECRET_BYTES = settings.SECRET_KEY.encode()
+_ALGORITHM = settings.ALGORITHM
+_ALGORITHMS = [_ALGORITHM]
+_DEFAULT_EXPIRE = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Búsqueda del teacher autenticado. Se arma acá y no se usa crud.teacher:
+# ese módulo importa security (hash/verify de passwords), y un import a nivel
+# de módulo en ambos sentidos sería circular.
+_GET_TEACHER_BY_EMAIL_STMT = select(Teacher).where(Teacher.email == bindparam("email"))
+
+
+async def _fetch_teacher_by_email(email: str) -> Teacher | None:
+    """
+    Carga el teacher por email en una sesión propia y de vida corta.
+
+    Args:
+        email: Email del teacher (claim `sub` del JWT ya verificado)
+
+    Returns:
+        Teacher (ya sin sesión), o None si no existe
+    """
+    async with async_session_maker() as session:
+        result = await session.execute(_GET_TEACHER_BY_EMAIL_STMT, {"email": email})
+        return result.scalar_one_or_none()
+
 
 # ========================================
 # PASSWORD HASHING (con bcrypt directo)
 # ========================================
 
-def get_password_hash(password: str) -> str:
+# Cache de verificaciones EXITOSAS: un login repetido (varios dispositivos,
+# reintentos de la app) con el mismo password no vuelve a pagar bcrypt.
+# Por cada hash almacenado se guarda un HMAC-SHA256 del password con una
+# clave aleatoria del proceso (nunca el password ni un hash rápido
+# reutilizable fuera del proceso) y se compara con hmac.compare_digest.
+# Los fallos no se cachean: cada intento fallido paga bcrypt completo.
+# Cambiar el password cambia el hash almacenado → la entrada vieja no aplica.
+PASSWORD_VERIFY_CACHE_TTL_SECONDS = 300
+PASSWORD_VERIFY_CACHE_MAXSIZE = 1024
+
+_verify_cache_key = secrets.token_bytes(32)
+_verify_cache: dict[str, tuple[float, bytes]] = {}
+
+
+def _password_digest(plain_password: str) -> bytes:
+    """HMAC del password con la clave del proceso (clave del cache)."""
+    return hmac.new(_verify_cache_key, plain_password.encode('utf-8'), hashlib.sha256).digest()
+
+
+def _hash_password_sync(password: str) -> str:
+    """Hash bcrypt bloqueante (CPU-bound); usar get_password_hash()."""
+    # bcrypt necesita bytes
+    password_bytes = password.encode('utf-8')
+    # gensalt() genera el salt automáticamente (costo según entorno)
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    # hashpw retorna bytes, lo convertimos a string
+    hashed = bcrypt.hashpw(password_bytes, salt)
+    return hashed.decode('utf-8')
+
+
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    """Verificación bcrypt bloqueante (CPU-bound); usar verify_password()."""
+    # Convertir a bytes
+    password_bytes = plain_password.encode('utf-8')
+    hashed_bytes = hashed_password.encode('utf-8')
+    # Verificar
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+async def get_password_hash(password: str) -> str:
     """
     Hashea un password usando bcrypt.
     
+    bcrypt tarda decenas de ms de CPU: se ejecuta en un thread para no
+    bloquear el event loop (y con él al resto de requests).
+    
     Args:
         password: Password en texto plano
         
@@ -49,21 +129,19 @@ def get_password_hash(password: str) -> str:
         Password hasheado (string)
         
     Example:
-        hashed = get_password_hash("mypassword123")
+        hashed = await get_password_hash("mypassword123")
     """
-    # bcrypt necesita bytes
-    password_bytes = password.encode('utf-8')
-    # gensalt() genera el salt automáticamente
-    salt = bcrypt.gensalt()
-    # hashpw retorna bytes, lo convertimos a string
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+    return await asyncio.to_thread(_hash_password_sync, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica si un password coincide con su hash.
     
+    Se ejecuta en un thread (bcrypt es CPU-bound y bloquearía el event loop).
+    Si el mismo password ya se verificó contra este hash hace poco, responde
+    desde el cache sin correr bcrypt.
+    
     Args:
         plain_password: Password en texto plano
         hashed_password: Password hasheado
@@ -72,13 +150,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         True si coinciden, False si no
         
     Example:
-        is_valid = verify_password("mypassword123", hashed)
+        is_valid = await verify_password("mypassword123", hashed)
     """
-    # Convertir a bytes
-    password_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    # Verificar
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    digest = _password_digest(plain_password)
+    now = time.monotonic()
+
+    cached = _verify_cache.get(hashed_password)
+    if cached is not None and cached[0] > now and hmac.compare_digest(cached[1], digest):
+        return True
+
+    is_valid = await asyncio.to_thread(_verify_password_sync, plain_password, hashed_password)
+
+    if is_valid:
+        if len(_verify_cache) >= PASSWORD_VERIFY_CACHE_MAXSIZE:
+            for expired in [k for k, (expires_at, _) in _verify_cache.items() if expires_at <= now]:
+                del _verify_cache[expired]
+            if len(_verify_cache) >= PASSWORD_VERIFY_CACHE_MAXSIZE:
+                _verify_cache.clear()
+        _verify_cache[hashed_password] = (now + PASSWORD_VERIFY_CACHE_TTL_SECONDS, digest)
+
+    return is_valid
 
 
 # ========================================
@@ -109,25 +200,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         # Default: 30 días (43200 minutos) para sliding window
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+        expire = datetime.now(timezone.utc) + _DEFAULT_EXPIRE
 
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(
         to_encode,
-        str(settings.SECRET_KEY),
-        algorithm=str(settings.ALGORITHM)
+        _SECRET_BYTES,
+        algorithm=_ALGORITHM
     )
     return encoded_jwt
 
 
-def decode_token(token: str) -> dict:
+def decode_token(token: str, request: Request | None = None) -> dict:
     """
     Decodifica y valida un token JWT.
 
+    Si se pasa la request, el payload verificado se guarda en
+    request.state.jwt_payload y las siguientes llamadas de la misma request
+    (dependency de auth, middleware de refresh) no vuelven a verificar la firma.
+
     Args:
         token: Token JWT a decodificar
+        request: Request actual (opcional) para memoizar el payload
 
     Returns:
         Payload del token (dict)
@@ -139,13 +233,17 @@ def decode_token(token: str) -> dict:
         payload = decode_token(token)
         email = payload.get("sub")
     """
+    if request is not None:
+        cached = getattr(request.state, "jwt_payload", None)
+        if cached is not None:
+            return cached
+
     try:
         payload = jwt.decode(
             token,
-            str(settings.SECRET_KEY),
-            algorithms=[str(settings.ALGORITHM)]
+            _SECRET_BYTES,
+            algorithms=_ALGORITHMS
         )
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -153,6 +251,10 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if request is not None:
+        request.state.jwt_payload = payload
+    return payload
+
 
 def should_refresh_token(token: str, refresh_threshold_days: int = 25) -> bool:
     """
@@ -178,33 +280,47 @@ def should_refresh_token(token: str, refresh_threshold_days: int = 25) -> bool:
     try:
         payload = jwt.decode(
             token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
+            _SECRET_BYTES,
+            algorithms=_ALGORITHMS,
             options={"verify_exp": False}  # No validar expiración aquí
         )
+    except JWTError:
+        return False  # Si el token es inválido, no intentar refrescar
+
+    return should_refresh_token_from_payload(payload, refresh_threshold_days)
 
-        exp_timestamp = payload.get("exp")
-        if not exp_timestamp:
-            return True  # Si no tiene exp, refrescar
 
-        expire_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
-        now = datetime.now(timezone.utc)
+def should_refresh_token_from_payload(payload: dict, refresh_threshold_days: int = 25) -> bool:
+    """
+    Igual que should_refresh_token(), pero sobre un payload ya decodificado.
 
-        time_remaining = expire_datetime - now
+    Args:
+        payload: Payload del JWT (p. ej. request.state.jwt_payload)
+        refresh_threshold_days: Días mínimos de vida restante para NO refrescar (default: 25)
 
-        # Si le quedan menos de X días, refrescar
-        return time_remaining < timedelta(days=refresh_threshold_days)
+    Returns:
+        True si el token debe ser refrescado
+    """
+    exp_timestamp = payload.get("exp")
+    if not exp_timestamp:
+        return True  # Si no tiene exp, refrescar
 
-    except JWTError:
-        return False  # Si el token es inválido, no intentar refrescar
+    expire_datetime = datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
+    now = datetime.now(timezone.utc)
 
+    time_remaining = expire_datetime - now
 
-def refresh_access_token(token: str) -> str:
+    # Si le quedan menos de X días, refrescar
+    return time_remaining < timedelta(days=refresh_threshold_days)
+
+
+def refresh_access_token(token: str, request: Request | None = None) -> str:
     """
     Refresca un token JWT válido, emitiendo uno nuevo con 30 días adicionales.
 
     Args:
         token: Token JWT actual (debe ser válido)
+        request: Request actual (opcional); reutiliza request.state.jwt_payload
 
     Returns:
         Nuevo token JWT con 30 días de expiración
@@ -220,7 +336,7 @@ def refresh_access_token(token: str) -> str:
         Solo refresca el timestamp de expiración, mantiene el mismo payload (sub, etc).
     """
     # Validar y extraer payload del token actual
-    payload = decode_token(token)  # Esto valida que sea legítimo
+    payload = decode_token(token, request)  # Esto valida que sea legítimo
 
     email = payload.get("sub")
     if not email:
@@ -234,11 +350,154 @@ def refresh_access_token(token: str) -> str:
     return new_token
 
 
+# ========================================
+# CACHE DE TEACHER AUTENTICADO (TTL)
+# ========================================
+
+# Cada request autenticada buscaba el teacher por email en la BD.
+# Se cachea una copia desacoplada (detached) por email durante unos segundos
+# y se adjunta a la sesión de la request con merge(load=False), sin SQL.
+# La invalidación es por proceso: con varios workers, el TTL es lo que acota
+# cuánto tarda en verse en los demás un cambio de rol/activo/permisos.
+TEACHER_CACHE_TTL_SECONDS = 30
+TEACHER_CACHE_MAXSIZE = 2048
+
+_teacher_cache: dict[str, tuple[float, object]] = {}
+
+
+def invalidate_teacher_cache(email: str | None = None) -> None:
+    """
+    Invalida el cache de teachers autenticados.
+
+    Llamar cuando cambian datos que afectan la autorización o el perfil
+    (password, email, rol, activo, permisos, instrumentos).
+
+    Args:
+        email: Email del teacher a invalidar (None = vaciar todo el cache)
+    """
+    if email is None:
+        _teacher_cache.clear()
+    else:
+        _teacher_cache.pop(email, None)
+
+
+async def _load_cached_teacher(email: str):
+    """
+    Obtiene la copia cacheada (detached) del teacher por email.
+
+    En cache miss carga el teacher en una sesión propia y de vida corta, para
+    que la copia cacheada nunca quede ligada (ni modificada) por una request.
+
+    Args:
+        email: Email del teacher (claim `sub` del JWT ya verificado)
+
+    Returns:
+        Teacher detached (solo lectura), o None si no existe
+    """
+    now = time.monotonic()
+    entry = _teacher_cache.get(email)
+
+    if entry is None or entry[0] <= now:
+        teacher_obj = await _fetch_teacher_by_email(email)
+
+        if teacher_obj is None:
+            _teacher_cache.pop(email, None)
+            return None
+
+        if len(_teacher_cache) >= TEACHER_CACHE_MAXSIZE:
+            # Descartar la entrada más antigua (orden de inserción)
+            _teacher_cache.pop(next(iter(_teacher_cache)), None)
+        _teacher_cache[email] = (now + TEACHER_CACHE_TTL_SECONDS, teacher_obj)
+        entry = _teacher_cache[email]
+
+    return entry[1]
+
+
+async def _get_cached_teacher(db: AsyncSession, email: str):
+    """
+    Obtiene el teacher por email usando el cache TTL.
+
+    Args:
+        db: Sesión de la request (a la que se adjunta el teacher)
+        email: Email del teacher (claim `sub` del JWT ya verificado)
+
+    Returns:
+        Teacher adjunto a `db`, o None si no existe
+    """
+    teacher_obj = await _load_cached_teacher(email)
+    if teacher_obj is None:
+        return None
+
+    # Adjuntar una copia a la sesión de la request (no emite SQL)
+    return await db.merge(teacher_obj, load=False)
+
+
+# ========================================
+# CACHE DE TOKENS VERIFICADOS (TTL)
+# ========================================
+
+# El mismo token llega en todas las requests de una sesión de la app; verificar
+# la firma y decodificar el JWT en cada una es trabajo repetido. Se cachea el
+# payload ya verificado, con clave = hash del token (no se guarda el token en
+# claro) y nunca más allá de su `exp`.
+TOKEN_CACHE_TTL_SECONDS = 60
+TOKEN_CACHE_MAXSIZE = 10_000
+
+_token_cache: dict[bytes, tuple[float, dict]] = {}
+
+
+def _decode_token_cached(token: str, request: Request | None = None) -> dict:
+    """
+    decode_token() con cache TTL por hash del token.
+
+    El payload también queda en request.state.jwt_payload para el resto de
+    la request (middleware de refresh).
+
+    Args:
+        token: Token JWT
+        request: Request actual (opcional)
+
+    Returns:
+        Payload del token (dict)
+
+    Raises:
+        HTTPException 401: Si el token es inválido o expirado
+    """
+    if request is not None:
+        cached = getattr(request.state, "jwt_payload", None)
+        if cached is not None:
+            return cached
+
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.time()
+    entry = _token_cache.get(key)
+
+    if entry is not None and entry[0] > now:
+        if request is not None:
+            request.state.jwt_payload = entry[1]
+        return entry[1]
+
+    payload = decode_token(token, request)
+
+    expires_at = now + TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, float(exp))
+
+    if len(_token_cache) >= TOKEN_CACHE_MAXSIZE:
+        # Descartar la entrada más antigua (orden de inserción)
+        _token_cache.pop(next(iter(_token_cache)), None)
+    _token_cache[key] = (expires_at, payload)
+
+    return payload
+
+
 # ========================================
 # DEPENDENCY PARA FASTAPI
 # ========================================
 
 async def get_current_teacher(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ):
@@ -260,8 +519,8 @@ async def get_current_teacher(
     # Extraer token
     token = credentials.credentials
     
-    # Decodificar token
-    payload = decode_token(token)
+    # Decodificar token (cache TTL por hash del token)
+    payload = _decode_token_cached(token, request)
     email: str | None = payload.get("sub")
     
     if email is None:
@@ -271,9 +530,8 @@ async def get_current_teacher(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Buscar teacher en BD
-    from app.crud import teacher as teacher_crud
-    teacher_obj = await teacher_crud.get_by_email(db, email)
+    # Buscar teacher (cache TTL, BD solo en miss)
+    teacher_obj = await _get_cached_teacher(db, email)
     
     if teacher_obj is None:
         raise HTTPException(
@@ -285,6 +543,120 @@ async def get_current_teacher(
     return teacher_obj
 
 
+@dataclass(frozen=True, slots=True)
+class TeacherPrincipal:
+    """
+    Identidad del teacher autenticado, sin sesión de BD.
+
+    Contiene solo lo que usan las verificaciones de pertenencia
+    (owned_by_teacher) y los filtros por profesor: id y organization_id.
+    """
+    id: int
+    email: str
+    organization_id: int | None
+    role: str
+
+
+async def get_current_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> TeacherPrincipal:
+    """
+    Dependency liviana - obtiene la identidad del teacher autenticado.
+
+    A diferencia de get_current_teacher no abre una sesión de BD ni adjunta
+    el Teacher a ninguna: el JWT (cache de tokens) da el email y el cache de
+    teachers da id/organization_id. Solo hay SQL en un miss del cache.
+    Usar en endpoints que solo necesitan el id y la organización.
+
+    Usage:
+        @router.get("/")
+        async def list_items(
+            current_teacher: TeacherPrincipal = Depends(get_current_principal)
+        ):
+            return await crud.get_multi(db, current_teacher.id)
+
+    Raises:
+        HTTPException 401: Si el token es inválido o el teacher no existe
+    """
+    return await _resolve_principal(credentials.credentials, request)
+
+
+async def _resolve_principal(token: str, request: Request | None = None) -> TeacherPrincipal:
+    """
+    Resuelve la identidad del teacher a partir del token (caches de token y teacher).
+
+    Args:
+        token: Token JWT del header Authorization
+        request: Request actual (opcional), para memoizar el payload
+
+    Returns:
+        TeacherPrincipal del teacher autenticado
+
+    Raises:
+        HTTPException 401: Si el token es inválido o el teacher no existe
+    """
+    payload = _decode_token_cached(token, request)
+    email: str | None = payload.get("sub")
+
+    if email is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    teacher_obj = await _load_cached_teacher(email)
+
+    if teacher_obj is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Teacher no encontrado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return TeacherPrincipal(
+        id=teacher_obj.id,
+        email=teacher_obj.email,
+        organization_id=teacher_obj.organization_id,
+        role=teacher_obj.role,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class AuthCtx:
+    """
+    Contexto de una request autenticada: sesión de la request + identidad.
+
+    db es la sesión abierta por DBSessionMiddleware (request.state.db).
+    """
+    db: AsyncSession
+    teacher: TeacherPrincipal
+
+
+async def get_auth_ctx(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> AuthCtx:
+    """
+    Dependency combinada - sesión de la request + teacher autenticado.
+
+    Reemplaza el par Depends(get_request_db) + Depends(get_current_principal)
+    por un solo nodo en el grafo de dependencias (la sesión se lee directo de
+    request.state, sin sub-dependency).
+
+    Usage:
+        @router.get("/")
+        async def list_items(ctx: AuthCtx = Depends(get_auth_ctx)):
+            return await crud.get_multi(ctx.db, ctx.teacher.id)
+
+    Raises:
+        HTTPException 401: Si el token es inválido o el teacher no existe
+    """
+    teacher = await _resolve_principal(credentials.credentials, request)
+    return AuthCtx(db=request.state.db, teacher=teacher)
+
+
 # ========================================
 # CONTROL DE ROLES
 # ========================================
@@ -328,7 +700,6 @@ def require_permission(permission: str):
     Reemplaza require_role() como mecanismo principal de autorización.
     """
     async def _check(current_teacher=Depends(get_current_teacher)):
-        from app.core.permissions import resolve_permissions
         perms = resolve_permissions(
             current_teacher.role,
             current_teacher.organization_id,
@@ -371,11 +742,7 @@ async def get_current_teacher_ws(
         raise Exception("Token inválido - sin email")
 
     # Buscar teacher en BD
-    from app.crud import teacher as teacher_crud
-    from app.core.database import async_session_maker
-
-    async with async_session_maker() as session:
-        teacher_obj = await teacher_crud.get_by_email(session, email)
+    teacher_obj = await _fetch_teacher_by_email(email)
 
     if teacher_obj is None:
         raise Exception("Teacher no encontrado")
@@ -3,15 +3,22 @@ CRUD operations for Attendance model
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, bindparam, exists
+from sqlalchemy.orm import noload
 from app.models.attendance import Attendance, AttendanceStatus
-from app.models.enrollment import Enrollment
 from app.models.class_model import Class, ClassStatus
 from app.services import credit_service
 from app.models.credit_transaction import CreditTransactionSource, CreditTransactionReferenceType
+from app.models.teacher import Teacher
+from app.crud.ownership import owned_by_teacher
 from app.schemas.attendance import AttendanceCreate, AttendanceUpdate
 
 
+# Sentencias preconstruidas (hot path): se arman una vez al importar el módulo
+_GET_ATTENDANCE_STMT = select(Attendance).where(Attendance.id == bindparam("attendance_id"))
+_GET_BY_CLASS_STMT = select(Attendance).where(Attendance.class_id == bindparam("class_id"))
+
+
 async def get(db: AsyncSession, attendance_id: int) -> Attendance | None:
     """
     Obtener una asistencia por ID
@@ -23,10 +30,100 @@ async def get(db: AsyncSession, attendance_id: int) -> Attendance | None:
     Returns:
         Attendance si existe, None si no
     """
+    result = await db.execute(_GET_ATTENDANCE_STMT, {"attendance_id": attendance_id})
+    return result.scalar_one_or_none()
+
+
+async def owned_by(
+    db: AsyncSession,
+    attendance_id: int,
+    teacher: Teacher
+) -> int | None:
+    """
+    Verificar pertenencia de una asistencia sin materializar filas ORM
+
+    Una sola consulta escalar (Attendance JOIN Class con el predicado de
+    pertenencia en el WHERE, LIMIT 1). Devuelve el teacher_id de la clase
+    porque los endpoints lo necesitan para notificar por WebSocket.
+
+    Args:
+        db: Sesión de base de datos
+        attendance_id: ID de la asistencia
+        teacher: Profesor autenticado
+
+    Returns:
+        teacher_id de la clase si la asistencia existe y le pertenece, None si no
+    """
+    if attendance_id is None or attendance_id <= 0:
+        return None
+
+    return await db.scalar(
+        select(Class.teacher_id)
+        .select_from(Attendance)
+        .join(Class, Class.id == Attendance.class_id)
+        .where(
+            Attendance.id == attendance_id,
+            owned_by_teacher(Class.teacher_id, teacher)
+        )
+        .limit(1)
+    )
+
+
+async def exists_by_id(db: AsyncSession, attendance_id: int) -> bool:
+    """
+    Verificar si existe una asistencia (para distinguir 404 de 403)
+
+    Args:
+        db: Sesión de base de datos
+        attendance_id: ID de la asistencia
+
+    Returns:
+        True si existe, False si no
+    """
+    if attendance_id is None or attendance_id <= 0:
+        return False
+
     result = await db.execute(
-        select(Attendance).where(Attendance.id == attendance_id)
+        select(exists().where(Attendance.id == attendance_id))
     )
-    return result.scalar_one_or_none()
+    return bool(result.scalar())
+
+
+async def get_with_class_owner(
+    db: AsyncSession,
+    class_id: int,
+    teacher: Teacher
+) -> tuple[bool, Attendance | None] | None:
+    """
+    Verificar pertenencia de una clase y obtener su asistencia en una sola consulta
+
+    Usa Class LEFT JOIN Attendance y evalúa el predicado de pertenencia como
+    columna, así se distingue en un solo viaje: clase inexistente, clase ajena,
+    clase sin asistencia y clase con asistencia.
+
+    Args:
+        db: Sesión de base de datos
+        class_id: ID de la clase
+        teacher: Profesor autenticado
+
+    Returns:
+        None si la clase no existe,
+        tupla (pertenece al profesor, Attendance o None) si existe
+    """
+    if class_id is None or class_id <= 0:
+        return None
+
+    result = await db.execute(
+        select(owned_by_teacher(Class.teacher_id, teacher).label("owned"), Attendance)
+        .select_from(Class)
+        .outerjoin(Attendance, Attendance.class_id == Class.id)
+        .options(noload(Attendance.class_))
+        .where(Class.id == class_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return bool(row[0]), row[1]
 
 
 async def get_by_class(db: AsyncSession, class_id: int) -> Attendance | None:
@@ -42,9 +139,7 @@ async def get_by_class(db: AsyncSession, class_id: int) -> Attendance | None:
     Returns:
         Attendance si existe, None si no está marcada
     """
-    result = await db.execute(
-        select(Attendance).where(Attendance.class_id == class_id)
-    )
+    result = await db.execute(_GET_BY_CLASS_STMT, {"class_id": class_id})
     return result.scalar_one_or_none()
 
 
@@ -79,8 +174,11 @@ async def create(db: AsyncSession, attendance_data: AttendanceCreate) -> Attenda
     if not class_obj:
         raise ValueError(f"Clase {attendance_data.class_id} no encontrada")
     
-    # Crear la asistencia
-    attendance = Attendance(**attendance_data.model_dump())
+    # Crear la asistencia (teacher_id copiado de la clase para sync sin JOIN)
+    attendance = Attendance(
+        **attendance_data.model_dump(),
+        teacher_id=class_obj.teacher_id,
+    )
     db.add(attendance)
 
     # Flush para obtener el ID de la asistencia antes de crear la transacción
@@ -90,21 +188,16 @@ async def create(db: AsyncSession, attendance_data: AttendanceCreate) -> Attenda
     class_obj.status = ClassStatus.COMPLETED
 
     # Si es license, otorgar crédito y registrar transacción
+    # (por ID: el UPDATE condicional de credit_service no necesita el SELECT)
     if attendance_data.status == AttendanceStatus.LICENSE:
-        result = await db.execute(
-            select(Enrollment).where(Enrollment.id == class_obj.enrollment_id)
+        await credit_service.apply(
+            db=db,
+            enrollment=class_obj.enrollment_id,
+            amount=1,
+            source_type=CreditTransactionSource.LICENSE,
+            reference_id=attendance.id,
+            reference_type=CreditTransactionReferenceType.ATTENDANCE,
         )
-        enrollment = result.scalar_one_or_none()
-
-        if enrollment:
-            await credit_service.apply(
-                db=db,
-                enrollment=enrollment,
-                amount=1,
-                source_type=CreditTransactionSource.LICENSE,
-                reference_id=attendance.id,
-                reference_type=CreditTransactionReferenceType.ATTENDANCE,
-            )
 
     await db.commit()
     await db.refresh(attendance)
@@ -147,50 +240,44 @@ async def delete(db: AsyncSession, attendance_id: int) -> bool:
     if attendance.status == AttendanceStatus.LICENSE:
 
         if class_obj:
-            result = await db.execute(
-                select(Enrollment).where(Enrollment.id == class_obj.enrollment_id)
-            )
-            enrollment = result.scalar_one_or_none()
-
-            if enrollment:
-                # Buscar la transacción LICENSE original para liberar el consumed_credit_tx_id
-                from app.models.credit_transaction import CreditTransaction
-                license_tx_result = await db.execute(
-                    select(CreditTransaction)
-                    .where(
-                        CreditTransaction.enrollment_id == class_obj.enrollment_id,
-                        CreditTransaction.source_type == CreditTransactionSource.LICENSE,
-                        CreditTransaction.reference_id == attendance.id,
-                    )
-                    .order_by(CreditTransaction.created_at.desc())
-                    .limit(1)
+            # Buscar la transacción LICENSE original para liberar el consumed_credit_tx_id
+            from app.models.credit_transaction import CreditTransaction
+            license_tx_result = await db.execute(
+                select(CreditTransaction)
+                .where(
+                    CreditTransaction.enrollment_id == class_obj.enrollment_id,
+                    CreditTransaction.source_type == CreditTransactionSource.LICENSE,
+                    CreditTransaction.reference_id == attendance.id,
                 )
-                license_tx = license_tx_result.scalars().first()
-
-                # Verificar si algún RECOVERY_CLASS consumió esta licencia
-                if license_tx:
-                    recovery_tx_result = await db.execute(
-                        select(CreditTransaction).where(
-                            CreditTransaction.consumed_credit_tx_id == license_tx.id,
-                            CreditTransaction.source_type == CreditTransactionSource.RECOVERY_CLASS
-                        )
-                    )
-                    recovery_tx = recovery_tx_result.scalar_one_or_none()
-                    if recovery_tx:
-                        raise ValueError("No se puede eliminar asistencia 'license' porque el alumno ya usó los créditos")
+                .order_by(CreditTransaction.created_at.desc())
+                .limit(1)
+            )
+            license_tx = license_tx_result.scalars().first()
 
-                try:
-                    await credit_service.apply(
-                        db=db,
-                        enrollment=enrollment,
-                        amount=-1,
-                        source_type=CreditTransactionSource.LICENSE_REVERSAL,
-                        reference_id=attendance.id,
-                        reference_type=CreditTransactionReferenceType.ATTENDANCE,
+            # Verificar si algún RECOVERY_CLASS consumió esta licencia
+            if license_tx:
+                recovery_tx_result = await db.execute(
+                    select(CreditTransaction).where(
+                        CreditTransaction.consumed_credit_tx_id == license_tx.id,
+                        CreditTransaction.source_type == CreditTransactionSource.RECOVERY_CLASS
                     )
-                except ValueError:
+                )
+                recovery_tx = recovery_tx_result.scalar_one_or_none()
+                if recovery_tx:
                     raise ValueError("No se puede eliminar asistencia 'license' porque el alumno ya usó los créditos")
 
+            try:
+                await credit_service.apply(
+                    db=db,
+                    enrollment=class_obj.enrollment_id,
+                    amount=-1,
+                    source_type=CreditTransactionSource.LICENSE_REVERSAL,
+                    reference_id=attendance.id,
+                    reference_type=CreditTransactionReferenceType.ATTENDANCE,
+                )
+            except ValueError:
+                raise ValueError("No se puede eliminar asistencia 'license' porque el alumno ya usó los créditos")
+
     await db.delete(attendance)
     if class_obj:
         class_obj.status = ClassStatus.SCHEDULED
@@ -245,67 +332,61 @@ async def update(
             class_obj = result.scalar_one_or_none()
             
             if class_obj:
-                result = await db.execute(
-                    select(Enrollment).where(Enrollment.id == class_obj.enrollment_id)
-                )
-                enrollment = result.scalar_one_or_none()
-                
-                if enrollment:
-                    # Caso 1: Cambia A license (otorgar crédito)
-                    if old_status != AttendanceStatus.LICENSE and new_status == AttendanceStatus.LICENSE:
-                        license_tx = await credit_service.apply(
+                # Caso 1: Cambia A license (otorgar crédito)
+                if old_status != AttendanceStatus.LICENSE and new_status == AttendanceStatus.LICENSE:
+                    license_tx = await credit_service.apply(
+                        db=db,
+                        enrollment=class_obj.enrollment_id,
+                        amount=1,
+                        source_type=CreditTransactionSource.LICENSE,
+                        reference_id=attendance.id,
+                        reference_type=CreditTransactionReferenceType.ATTENDANCE,
+                    )
+                    if license_tx is None:
+                        raise ValueError("La licencia ya estaba activa para esta asistencia")
+
+                # Caso 2: Cambia DESDE license (quitar crédito)
+                elif old_status == AttendanceStatus.LICENSE and new_status != AttendanceStatus.LICENSE:
+                    # Buscar la transacción LICENSE original para liberar el consumed_credit_tx_id
+                    from app.models.credit_transaction import CreditTransaction
+                    license_tx_result = await db.execute(
+                        select(CreditTransaction)
+                        .where(
+                            CreditTransaction.enrollment_id == class_obj.enrollment_id,
+                            CreditTransaction.source_type == CreditTransactionSource.LICENSE,
+                            CreditTransaction.reference_id == attendance.id,
+                        )
+                        .order_by(CreditTransaction.created_at.desc())
+                        .limit(1)
+                    )
+                    license_tx = license_tx_result.scalars().first()
+
+                    # Verificar si algún RECOVERY_CLASS consumió esta licencia
+                    if license_tx:
+                        recovery_tx_result = await db.execute(
+                            select(CreditTransaction).where(
+                                CreditTransaction.consumed_credit_tx_id == license_tx.id,
+                                CreditTransaction.source_type == CreditTransactionSource.RECOVERY_CLASS
+                            )
+                        )
+                        recovery_tx = recovery_tx_result.scalar_one_or_none()
+                        if recovery_tx:
+                            raise ValueError("No se puede eliminar asistencia 'license' porque el alumno ya usó los créditos")
+
+                    try:
+                        reversal_tx = await credit_service.apply(
                             db=db,
-                            enrollment=enrollment,
-                            amount=1,
-                            source_type=CreditTransactionSource.LICENSE,
+                            enrollment=class_obj.enrollment_id,
+                            amount=-1,
+                            source_type=CreditTransactionSource.LICENSE_REVERSAL,
                             reference_id=attendance.id,
                             reference_type=CreditTransactionReferenceType.ATTENDANCE,
                         )
-                        if license_tx is None:
-                            raise ValueError("La licencia ya estaba activa para esta asistencia")
-
-                    # Caso 2: Cambia DESDE license (quitar crédito)
-                    elif old_status == AttendanceStatus.LICENSE and new_status != AttendanceStatus.LICENSE:
-                        # Buscar la transacción LICENSE original para liberar el consumed_credit_tx_id
-                        from app.models.credit_transaction import CreditTransaction
-                        license_tx_result = await db.execute(
-                            select(CreditTransaction)
-                            .where(
-                                CreditTransaction.enrollment_id == class_obj.enrollment_id,
-                                CreditTransaction.source_type == CreditTransactionSource.LICENSE,
-                                CreditTransaction.reference_id == attendance.id,
-                            )
-                            .order_by(CreditTransaction.created_at.desc())
-                            .limit(1)
-                        )
-                        license_tx = license_tx_result.scalars().first()
-
-                        # Verificar si algún RECOVERY_CLASS consumió esta licencia
-                        if license_tx:
-                            recovery_tx_result = await db.execute(
-                                select(CreditTransaction).where(
-                                    CreditTransaction.consumed_credit_tx_id == license_tx.id,
-                                    CreditTransaction.source_type == CreditTransactionSource.RECOVERY_CLASS
-                                )
-                            )
-                            recovery_tx = recovery_tx_result.scalar_one_or_none()
-                            if recovery_tx:
-                                raise ValueError("No se puede eliminar asistencia 'license' porque el alumno ya usó los créditos")
-
-                        try:
-                            reversal_tx = await credit_service.apply(
-                                db=db,
-                                enrollment=enrollment,
-                                amount=-1,
-                                source_type=CreditTransactionSource.LICENSE_REVERSAL,
-                                reference_id=attendance.id,
-                                reference_type=CreditTransactionReferenceType.ATTENDANCE,
-                            )
-                            if reversal_tx is None:
-                                raise ValueError("La reversión de licencia ya estaba aplicada")
-                        except ValueError as exc:
-                            raise ValueError(str(exc)) from exc
-    
+                        if reversal_tx is None:
+                            raise ValueError("La reversión de licencia ya estaba aplicada")
+                    except ValueError as exc:
+                        raise ValueError(str(exc)) from exc
+
     # Aplicar cambios
     for field, value in update_data.items():
         setattr(attendance, field, value)
@@ -163,7 +163,7 @@ class BatchProcessor:
                 if obj:
                     # Si es recuperación, usar lógica específica que devuelve crédito
                     if obj.type == ClassType.RECOVERY:
-                        await class_crud.delete_recovery(self.db, target_id)
+                        await class_crud.delete_recovery(self.db, target_id, class_obj=obj)
                     else:
                         await self.db.delete(obj)
                         await self.db.commit()
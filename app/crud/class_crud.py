@@ -4,22 +4,69 @@ CRUD operations for Class model
 
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, not_, exists
-from sqlalchemy.orm import aliased
+from sqlalchemy import select, and_, not_, exists, func, bindparam, update as sa_update
+from sqlalchemy.orm import aliased, selectinload, noload
 from datetime import datetime, date
 from app.models.class_model import Class, ClassStatus, ClassType
 from app.models.enrollment import Enrollment
+from app.models.teacher import Teacher
+from app.models.attendance import Attendance
+from app.models.student import Student
 from app.services import credit_service
 from app.models.credit_transaction import CreditTransactionSource, CreditTransactionReferenceType
+from app.crud.ownership import owned_by_teacher
 from app.schemas.class_schema import ClassCreate, ClassUpdate
 
 logger = logging.getLogger(__name__)
 
 
+# ========================================
+# SENTENCIAS PRECONSTRUIDAS (hot path)
+# ========================================
+# Se construyen una sola vez al importar el módulo; los valores se pasan
+# como parámetros en cada execute().
+
+# Carga justa para ClassResponse: attendance + enrollment.student, cada uno con
+# un único SELECT ... IN (...). El resto de relaciones selectin del modelo
+# (schedule, teacher, room, y en cascada schedules/classes/... del enrollment)
+# no se usan en la respuesta y se omiten.
+_CLASS_RESPONSE_OPTIONS = (
+    selectinload(Class.attendance).noload("*"),
+    selectinload(Class.enrollment).options(
+        selectinload(Enrollment.student).noload("*"),
+        noload("*"),
+    ),
+    noload("*"),
+)
+
+_GET_PAGE_WITH_TOTAL_STMT = (
+    select(Class, func.count().over().label("total"))
+    .options(*_CLASS_RESPONSE_OPTIONS)
+    .where(Class.teacher_id == bindparam("teacher_id"))
+    .order_by(Class.date.desc(), Class.time.desc())
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+_GET_BY_DATE_RANGE_STMT = (
+    select(Class)
+    .options(*_CLASS_RESPONSE_OPTIONS)
+    .where(
+        Class.teacher_id == bindparam("teacher_id"),
+        Class.date >= bindparam("start_date"),
+        Class.date <= bindparam("end_date")
+    )
+    .order_by(Class.date, Class.time)
+)
+
+
 async def get(db: AsyncSession, class_id: int) -> Class | None:
     """
     Obtener una clase por ID
     
+    Si la clase ya fue cargada en esta sesión (misma request) se devuelve
+    sin consultar la BD.
+    
     Args:
         db: Sesión de base de datos
         class_id: ID de la clase
@@ -32,12 +79,134 @@ async def get(db: AsyncSession, class_id: int) -> Class | None:
     if class_id is None or class_id <= 0:
         return None
 
+    # Memoización por request: la sesión es por request y su identity map ya
+    # guarda las clases cargadas por PK. db.get() lo consulta antes de ir a la BD,
+    # así que repetir get() con el mismo id dentro de un handler no emite SQL.
+    return await db.get(Class, class_id)
+
+
+def _owned_by(teacher: Teacher):
+    """
+    Predicado SQL de pertenencia de una clase al profesor autenticado
+
+    Args:
+        teacher: Profesor autenticado
+
+    Returns:
+        Expresión booleana para usar en un WHERE
+    """
+    return owned_by_teacher(Class.teacher_id, teacher)
+
+
+async def get_for_teacher(db: AsyncSession, class_id: int, teacher: Teacher) -> Class | None:
+    """
+    Obtener una clase por ID solo si pertenece al profesor (una sola consulta)
+
+    Args:
+        db: Sesión de base de datos
+        class_id: ID de la clase
+        teacher: Profesor autenticado
+
+    Returns:
+        Class si existe y le pertenece, None en cualquier otro caso
+        (usar exists_by_id() para distinguir 404 de 403)
+    """
+    if class_id is None or class_id <= 0:
+        return None
+
     result = await db.execute(
-        select(Class).where(Class.id == class_id)
+        select(Class).where(Class.id == class_id, _owned_by(teacher))
     )
     return result.scalar_one_or_none()
 
 
+async def get_owner_id_for_teacher(
+    db: AsyncSession,
+    class_id: int,
+    teacher: Teacher
+) -> int | None:
+    """
+    Obtener solo el teacher_id de una clase si pertenece al profesor
+
+    Para verificaciones de pertenencia donde no se usa la clase: selecciona
+    la columna en lugar de hidratar Class (y sus relaciones selectin).
+
+    Args:
+        db: Sesión de base de datos
+        class_id: ID de la clase
+        teacher: Profesor autenticado
+
+    Returns:
+        teacher_id de la clase si existe y le pertenece, None en cualquier otro caso
+        (usar exists_by_id() para distinguir 404 de 403)
+    """
+    if class_id is None or class_id <= 0:
+        return None
+
+    return await db.scalar(
+        select(Class.teacher_id).where(Class.id == class_id, _owned_by(teacher))
+    )
+
+
+async def exists_by_id(db: AsyncSession, class_id: int) -> bool:
+    """
+    Verificar si existe una clase (sin cargar la fila ni sus relaciones)
+
+    Args:
+        db: Sesión de base de datos
+        class_id: ID de la clase
+
+    Returns:
+        True si existe, False si no
+    """
+    if class_id is None or class_id <= 0:
+        return False
+
+    result = await db.execute(
+        select(exists().where(Class.id == class_id))
+    )
+    return bool(result.scalar())
+
+
+async def get_assignment_context(
+    db: AsyncSession,
+    teacher_id: int,
+    enrollment_id: int | None
+) -> tuple[int | None, int | None]:
+    """
+    Datos para validar la creación de una clase, en una sola consulta
+
+    Reúne en un SELECT con dos subconsultas escalares lo que antes eran dos
+    lecturas independientes (teacher destino + enrollment completo con sus
+    relaciones selectin), de las que solo se usaba una columna de cada una.
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor al que se asigna la clase
+        enrollment_id: ID de la inscripción (None para clases 'extra')
+
+    Returns:
+        Tupla (organization_id del profesor destino, teacher_id de la inscripción).
+        El segundo valor es None si la inscripción no existe o no se indicó.
+    """
+    teacher_org_id = (
+        select(Teacher.organization_id)
+        .where(Teacher.id == teacher_id)
+        .scalar_subquery()
+    )
+    enrollment_teacher_id = (
+        select(Enrollment.teacher_id)
+        .where(Enrollment.id == enrollment_id)
+        .scalar_subquery()
+    )
+
+    if enrollment_id is None:
+        return await db.scalar(select(teacher_org_id)), None
+
+    row = (await db.execute(select(teacher_org_id, enrollment_teacher_id))).one()
+    return row[0], row[1]
+
+
 async def get_multi(
     db: AsyncSession,
     teacher_id: int,
@@ -56,14 +225,47 @@ async def get_multi(
     Returns:
         Lista de Classes del profesor, ordenadas por fecha/hora más reciente
     """
+    classes, _ = await get_multi_with_total(db, teacher_id, skip=skip, limit=limit)
+    return classes
+
+
+async def get_multi_with_total(
+    db: AsyncSession,
+    teacher_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> tuple[list[Class], int]:
+    """
+    Obtener una página de clases de un profesor + el total, en una sola consulta
+
+    El total se calcula con COUNT(*) OVER () junto a las filas de la página,
+    evitando un SELECT COUNT(*) aparte.
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+        skip: Cantidad de registros a saltar (paginación)
+        limit: Cantidad máxima de registros a retornar
+
+    Returns:
+        Tupla (clases de la página, total de clases del profesor)
+    """
     result = await db.execute(
-        select(Class)
-        .where(Class.teacher_id == teacher_id)
-        .offset(skip)
-        .limit(limit)
-        .order_by(Class.date.desc(), Class.time.desc())
+        _GET_PAGE_WITH_TOTAL_STMT,
+        {"teacher_id": teacher_id, "skip": skip, "limit": limit}
     )
-    return list(result.scalars().all())
+    rows = result.all()
+
+    if rows:
+        return [row[0] for row in rows], rows[0][1]
+
+    # Página vacía: la ventana no devuelve filas, contar aparte solo si hubo skip
+    if skip == 0:
+        return [], 0
+    total = await db.scalar(
+        select(func.count()).select_from(Class).where(Class.teacher_id == teacher_id)
+    )
+    return [], total or 0
 
 
 async def get_by_date_range(
@@ -87,15 +289,54 @@ async def get_by_date_range(
         Lista de Classes en el rango, ordenadas por fecha/hora
     """
     result = await db.execute(
-        select(Class)
+        _GET_BY_DATE_RANGE_STMT,
+        {"teacher_id": teacher_id, "start_date": start_date, "end_date": end_date}
+    )
+    return list(result.scalars().all())
+
+
+async def get_date_range_version(
+    db: AsyncSession,
+    teacher_id: int,
+    start_date: date,
+    end_date: date
+) -> tuple:
+    """
+    Obtener la "versión" de las clases de un rango (para ETag del calendario)
+
+    Una sola consulta de agregados: cantidad de clases y máximo updated_at de
+    la clase y de las relaciones que viajan anidadas en ClassResponse
+    (attendance, enrollment, student). Si algo cambia, cambia la tupla.
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+        start_date: Fecha inicio (inclusiva)
+        end_date: Fecha fin (inclusiva)
+
+    Returns:
+        Tupla (count, max class.updated_at, max attendance.updated_at,
+               max enrollment.updated_at, max student.updated_at)
+    """
+    result = await db.execute(
+        select(
+            func.count(Class.id),
+            func.max(Class.updated_at),
+            func.max(Attendance.updated_at),
+            func.max(Enrollment.updated_at),
+            func.max(Student.updated_at),
+        )
+        .select_from(Class)
+        .outerjoin(Attendance, Attendance.class_id == Class.id)
+        .outerjoin(Enrollment, Enrollment.id == Class.enrollment_id)
+        .outerjoin(Student, Student.id == Enrollment.student_id)
         .where(
             Class.teacher_id == teacher_id,
             Class.date >= start_date,
             Class.date <= end_date
         )
-        .order_by(Class.date, Class.time)
     )
-    return list(result.scalars().all())
+    return tuple(result.one())
 
 
 async def create(db: AsyncSession, class_data: ClassCreate) -> Class:
@@ -191,30 +432,6 @@ async def create_recovery(
     if enrollment.credits < 1:
         raise ValueError(f"No hay créditos disponibles. Créditos actuales: {enrollment.credits}")
 
-    # Validar que no exista ya una recuperación para el mismo enrollment+fecha+hora.
-    # Esto previene duplicados por doble-tap o reintento de sync concurrente.
-    duplicate_result = await db.execute(
-        select(Class).where(
-            and_(
-                Class.enrollment_id == class_data.enrollment_id,
-                Class.date == class_data.date,
-                Class.time == class_data.time,
-                Class.type == ClassType.RECOVERY,
-                Class.status != ClassStatus.CANCELLED,
-            )
-        )
-    )
-    existing_recovery = duplicate_result.scalar_one_or_none()
-    if existing_recovery:
-        logger.warning(
-            f"create_recovery: duplicada enrollment {class_data.enrollment_id} "
-            f"{class_data.date} {class_data.time} (ID existente {existing_recovery.id})"
-        )
-        raise ValueError(
-            f"Ya existe una recuperación para esta inscripción el "
-            f"{class_data.date} a las {str(class_data.time)[:5]} (ID: {existing_recovery.id})"
-        )
-
     # Buscar créditos disponibles (LICENSE o MANUAL_ADJUSTMENT) que no hayan sido consumidos
     # Un crédito está disponible si no existe ninguna RECOVERY_CLASS con consumed_credit_tx_id apuntando a él
     from app.models.credit_transaction import CreditTransaction
@@ -243,8 +460,9 @@ async def create_recovery(
         )
     )
 
-    available_credits_result = await db.execute(
-        select(CreditTransaction)
+    # FIFO: el crédito disponible más antiguo
+    available_credit_id = (
+        select(CreditTransaction.id)
         .where(
             CreditTransaction.enrollment_id == class_data.enrollment_id,
             CreditTransaction.source_type.in_([
@@ -263,14 +481,43 @@ async def create_recovery(
             )
         )
         .order_by(CreditTransaction.created_at.asc())
+        .limit(1)
+        .scalar_subquery()
     )
-    available_credits = available_credits_result.scalars().all()
 
-    if not available_credits:
-        raise ValueError(f"No hay créditos disponibles para consumir. Créditos actuales: {enrollment.credits}")
+    # Recuperación duplicada para el mismo enrollment+fecha+hora.
+    # Esto previene duplicados por doble-tap o reintento de sync concurrente.
+    existing_recovery_id = (
+        select(Class.id)
+        .where(
+            Class.enrollment_id == class_data.enrollment_id,
+            Class.date == class_data.date,
+            Class.time == class_data.time,
+            Class.type == ClassType.RECOVERY,
+            Class.status != ClassStatus.CANCELLED,
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
 
-    # FIFO: tomar el crédito más antiguo disponible
-    credit_to_consume = available_credits[0]
+    # Ambas lecturas son independientes: un solo SELECT con dos subconsultas escalares
+    checks = (await db.execute(
+        select(existing_recovery_id, available_credit_id)
+    )).one()
+    existing_recovery_id, credit_to_consume_id = checks[0], checks[1]
+
+    if existing_recovery_id is not None:
+        logger.warning(
+            f"create_recovery: duplicada enrollment {class_data.enrollment_id} "
+            f"{class_data.date} {class_data.time} (ID existente {existing_recovery_id})"
+        )
+        raise ValueError(
+            f"Ya existe una recuperación para esta inscripción el "
+            f"{class_data.date} a las {str(class_data.time)[:5]} (ID: {existing_recovery_id})"
+        )
+
+    if credit_to_consume_id is None:
+        raise ValueError(f"No hay créditos disponibles para consumir. Créditos actuales: {enrollment.credits}")
 
     # Crear la clase de recuperación
     class_dict = class_data.model_dump()
@@ -296,7 +543,7 @@ async def create_recovery(
         source_type=CreditTransactionSource.RECOVERY_CLASS,
         reference_id=class_obj.id,
         reference_type=CreditTransactionReferenceType.CLASS,
-        consumed_credit_tx_id=credit_to_consume.id,
+        consumed_credit_tx_id=credit_to_consume_id,
     )
 
     # Guardar ambos cambios en una transacción
@@ -311,7 +558,8 @@ async def create_recovery(
 async def update(
     db: AsyncSession,
     class_id: int,
-    class_data: ClassUpdate
+    class_data: ClassUpdate,
+    teacher: Teacher | None = None
 ) -> Class | None:
     """
     Actualizar una clase existente
@@ -319,26 +567,21 @@ async def update(
     IMPORTANTE: NO permite cambiar el 'type' de la clase
     Para crear recuperaciones usar create_recovery()
     
+    Si se pasa `teacher`, la pertenencia se valida en el mismo
+    UPDATE ... RETURNING (una sola consulta, sin SELECT previo).
+    
     Args:
         db: Sesión de base de datos
         class_id: ID de la clase a actualizar
         class_data: Datos a actualizar (solo campos no None)
+        teacher: Profesor autenticado (opcional, filtra por pertenencia)
     
     Returns:
-        Class actualizada si existe, None si no
+        Class actualizada si existe (y pertenece al profesor), None si no
     
     Raises:
         ValueError: Si se intenta cambiar el campo 'type'
     """
-    # Obtener la clase
-    result = await db.execute(
-        select(Class).where(Class.id == class_id)
-    )
-    class_obj = result.scalar_one_or_none()
-    
-    if not class_obj:
-        return None
-    
     # Actualizar solo campos que no sean None
     update_data = class_data.model_dump(exclude_unset=True)
     
@@ -346,6 +589,28 @@ async def update(
     if 'type' in update_data:
         raise ValueError("No se puede cambiar el tipo de clase. Para crear recuperaciones usar create_recovery()")
     
+    if teacher is not None:
+        if not update_data:
+            return await get_for_teacher(db, class_id, teacher)
+        if class_id is None or class_id <= 0:
+            return None
+        result = await db.execute(
+            sa_update(Class)
+            .where(Class.id == class_id, _owned_by(teacher))
+            .values(**update_data)
+            .returning(Class)
+            .execution_options(populate_existing=True)
+        )
+        class_obj = result.scalar_one_or_none()
+        await db.commit()
+        return class_obj
+    
+    # Obtener la clase
+    class_obj = await get(db, class_id)
+    
+    if not class_obj:
+        return None
+    
     for field, value in update_data.items():
         setattr(class_obj, field, value)
     
@@ -355,25 +620,44 @@ async def update(
     return class_obj
 
 
-async def cancel(db: AsyncSession, class_id: int) -> Class | None:
+async def cancel(
+    db: AsyncSession,
+    class_id: int,
+    teacher: Teacher | None = None
+) -> Class | None:
     """
     Cancelar una clase
     
     Cambia status a 'cancelled'
     Las clases canceladas NO se cobran
     
+    Si se pasa `teacher`, la pertenencia se valida en el mismo
+    UPDATE ... RETURNING (una sola consulta, sin SELECT previo).
+    
     Args:
         db: Sesión de base de datos
         class_id: ID de la clase a cancelar
+        teacher: Profesor autenticado (opcional, filtra por pertenencia)
     
     Returns:
-        Class cancelada si existe, None si no
+        Class cancelada si existe (y pertenece al profesor), None si no
     """
+    if teacher is not None:
+        if class_id is None or class_id <= 0:
+            return None
+        result = await db.execute(
+            sa_update(Class)
+            .where(Class.id == class_id, _owned_by(teacher))
+            .values(status=ClassStatus.CANCELLED)
+            .returning(Class)
+            .execution_options(populate_existing=True)
+        )
+        class_obj = result.scalar_one_or_none()
+        await db.commit()
+        return class_obj
+    
     # Obtener la clase
-    result = await db.execute(
-        select(Class).where(Class.id == class_id)
-    )
-    class_obj = result.scalar_one_or_none()
+    class_obj = await get(db, class_id)
     
     if not class_obj:
         return None
@@ -387,7 +671,11 @@ async def cancel(db: AsyncSession, class_id: int) -> Class | None:
     return class_obj
 
 
-async def delete_recovery(db: AsyncSession, class_id: int) -> bool:
+async def delete_recovery(
+    db: AsyncSession,
+    class_id: int,
+    class_obj: Class | None = None
+) -> bool:
     """
     Eliminar una clase de recuperación (físicamente)
 
@@ -398,6 +686,7 @@ async def delete_recovery(db: AsyncSession, class_id: int) -> bool:
     Args:
         db: Sesión de base de datos
         class_id: ID de la clase de recuperación a eliminar
+        class_obj: Clase ya cargada por el llamador (evita volver a consultarla)
 
     Returns:
         True si se eliminó correctamente
@@ -405,11 +694,9 @@ async def delete_recovery(db: AsyncSession, class_id: int) -> bool:
     Raises:
         ValueError: Si no es recovery, tiene attendance, o no existe
     """
-    # Obtener la clase
-    result = await db.execute(
-        select(Class).where(Class.id == class_id)
-    )
-    class_obj = result.scalar_one_or_none()
+    # Obtener la clase (si el llamador no la cargó ya)
+    if class_obj is None:
+        class_obj = await get(db, class_id)
 
     if not class_obj:
         raise ValueError(f"Clase {class_id} no existe")
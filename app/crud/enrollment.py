@@ -3,20 +3,40 @@ CRUD operations for Enrollment model - REACTIVACIÓN CON VALIDACIÓN COMPLETA
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update as sa_update, and_, or_, extract
+from sqlalchemy import select, lambda_stmt, delete, insert, update as sa_update, and_, or_, extract, exists, tuple_, func, cast, literal_column, String, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import selectinload, noload, raiseload
 from datetime import date, datetime, time as time_type
 from typing import Optional
 
-from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.core.config import settings
+from app.models.enrollment import Enrollment, EnrollmentStatus, EnrollmentLevel
 from app.models.schedule import Schedule
 from app.models.class_model import Class, ClassStatus, ClassType
 from app.models.student import Student
 from app.models.attendance import Attendance
+from app.models.teacher import Teacher
+from app.models.instrument import Instrument
 from app.models.credit_transaction import CreditTransaction, CreditTransactionSource
+from app.crud.ownership import owned_by_teacher
 from app.schemas.enrollment import EnrollmentCreate, EnrollmentUpdate
 from app.services import credit_service
 
 
+# Relaciones que EnrollmentResponse usa (teacher_name, instrument_name): se
+# cargan con un SELECT ... IN (...) por relación para toda la página. El resto
+# de relaciones selectin del modelo (student, schedules, classes, historial)
+# no aparecen en la respuesta y se omiten (o fallan al accederse con
+# STRICT_LOADING, para detectar cargas no previstas en desarrollo/CI).
+_skip_rest = raiseload if settings.STRICT_LOADING else noload
+
+_ENROLLMENT_RESPONSE_OPTIONS = (
+    selectinload(Enrollment.teacher).options(_skip_rest("*")),
+    selectinload(Enrollment.instrument).options(_skip_rest("*")),
+    _skip_rest("*"),
+)
+
+
 async def get(db: AsyncSession, enrollment_id: int) -> Enrollment | None:
     """Obtener una inscripción por ID"""
     result = await db.execute(
@@ -25,41 +45,311 @@ async def get(db: AsyncSession, enrollment_id: int) -> Enrollment | None:
     return result.scalar_one_or_none()
 
 
+def _owned_by(teacher: Teacher):
+    """
+    Predicado SQL de pertenencia de una inscripción al profesor autenticado
+
+    Args:
+        teacher: Profesor autenticado
+
+    Returns:
+        Expresión booleana para usar en un WHERE
+    """
+    return owned_by_teacher(Enrollment.teacher_id, teacher)
+
+
+async def get_for_teacher(
+    db: AsyncSession,
+    enrollment_id: int,
+    teacher: Teacher
+) -> Enrollment | None:
+    """
+    Obtener una inscripción por ID solo si pertenece al profesor (una sola consulta)
+
+    Args:
+        db: Sesión de base de datos
+        enrollment_id: ID de la inscripción
+        teacher: Profesor autenticado
+
+    Returns:
+        Enrollment si existe y le pertenece, None en cualquier otro caso
+        (usar exists_by_id() para distinguir 404 de 403)
+    """
+    if enrollment_id is None or enrollment_id <= 0:
+        return None
+
+    # lambda_stmt: el SQL compilado se cachea por ubicación del lambda y los
+    # valores capturados (ids) viajan como bind params. Es el mismo predicado
+    # que _owned_by(), con una variante por forma de consulta (org / independiente).
+    stmt = lambda_stmt(lambda: select(Enrollment).where(Enrollment.id == enrollment_id))
+    if teacher.organization_id:
+        organization_id = teacher.organization_id
+        stmt += lambda s: s.where(
+            Enrollment.teacher_id.in_(
+                select(Teacher.id).where(Teacher.organization_id == organization_id)
+            )
+        )
+    else:
+        teacher_id = teacher.id
+        stmt += lambda s: s.where(Enrollment.teacher_id == teacher_id)
+
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def exists_by_id(db: AsyncSession, enrollment_id: int) -> bool:
+    """
+    Verificar si existe una inscripción (sin cargar la fila ni sus relaciones)
+
+    Args:
+        db: Sesión de base de datos
+        enrollment_id: ID de la inscripción
+
+    Returns:
+        True si existe, False si no
+    """
+    if enrollment_id is None or enrollment_id <= 0:
+        return False
+
+    result = await db.execute(
+        select(exists().where(Enrollment.id == enrollment_id))
+    )
+    return bool(result.scalar())
+
+
 async def get_multi(
     db: AsyncSession,
     teacher_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[tuple[datetime, int]] = None
 ) -> list[Enrollment]:
-    """Obtener múltiples inscripciones de un profesor"""
-    result = await db.execute(
+    """
+    Obtener múltiples inscripciones de un profesor
+
+    Orden estable (created_at DESC, id DESC). Con `after` (clave de la última
+    fila de la página anterior) pagina por keyset sobre el índice
+    (teacher_id, created_at, id) en lugar de usar OFFSET.
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+        skip: Registros a saltar (solo si no se usa `after`)
+        limit: Máximo de registros
+        after: Tupla (created_at, id) desde la que continuar (opcional)
+
+    Returns:
+        Lista de inscripciones
+    """
+    stmt = (
         select(Enrollment)
+        .options(*_ENROLLMENT_RESPONSE_OPTIONS)
         .where(Enrollment.teacher_id == teacher_id)
-        .offset(skip)
+        .order_by(Enrollment.created_at.desc(), Enrollment.id.desc())
         .limit(limit)
-        .order_by(Enrollment.created_at.desc())
     )
+    if after is not None:
+        stmt = stmt.where(tuple_(Enrollment.created_at, Enrollment.id) < tuple_(*after))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    result = await db.execute(stmt)
     return list(result.scalars().all())
 
 
+async def get_multi_json(
+    db: AsyncSession,
+    teacher_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[tuple[datetime, int]] = None
+) -> tuple[str, Optional[tuple[datetime, int]]]:
+    """
+    Página de inscripciones de un profesor serializada por Postgres (json_agg)
+
+    Mismo orden y paginación que get_multi(), pero Postgres arma el JSON de
+    EnrollmentResponse (con teacher_name e instrument_name vía JOIN) y Python
+    recibe un único string: sin objetos ORM, sin selectinload y sin Pydantic.
+
+    Pide limit + 1 filas para saber si hay página siguiente en la misma
+    consulta.
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+        skip: Registros a saltar (solo si no se usa `after`)
+        limit: Máximo de registros
+        after: Tupla (created_at, id) desde la que continuar (opcional)
+
+    Returns:
+        Tupla (JSON de la página, clave (created_at, id) de la última fila si
+        hay página siguiente o None)
+    """
+    page_stmt = (
+        select(
+            Enrollment.id,
+            Enrollment.student_id,
+            Enrollment.instrument_id,
+            Enrollment.teacher_id,
+            Enrollment.status,
+            func.coalesce(Enrollment.level, EnrollmentLevel.ELEMENTAL).label("level"),
+            Enrollment.credits,
+            Enrollment.format,
+            Enrollment.manual_credit_dates,
+            Enrollment.partial_sessions,
+            Enrollment.enrolled_date,
+            Enrollment.suspended_at,
+            Enrollment.suspended_until,
+            Enrollment.suspended_reason,
+            Enrollment.withdrawn_date,
+            cast(Enrollment.sync_id, String).label("sync_id"),
+            Enrollment.created_at,
+            Enrollment.updated_at,
+            # Decimal → string con 2 decimales, igual que lo serializa Pydantic
+            cast(Enrollment.base_monthly_fee, String).label("base_monthly_fee"),
+            cast(Enrollment.enrollment_fee, String).label("enrollment_fee"),
+            Teacher.name.label("teacher_name"),
+            Instrument.name.label("instrument_name"),
+        )
+        .select_from(Enrollment)
+        .outerjoin(Teacher, Teacher.id == Enrollment.teacher_id)
+        .outerjoin(Instrument, Instrument.id == Enrollment.instrument_id)
+        .where(Enrollment.teacher_id == teacher_id)
+        .order_by(Enrollment.created_at.desc(), Enrollment.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        page_stmt = page_stmt.where(tuple_(Enrollment.created_at, Enrollment.id) < tuple_(*after))
+    elif skip:
+        page_stmt = page_stmt.offset(skip)
+
+    # row_number se calcula sobre la página ya recortada (OFFSET/LIMIT van después
+    # de las funciones ventana en el mismo SELECT)
+    limited = page_stmt.subquery()
+    page = select(
+        limited,
+        func.row_number().over(
+            order_by=(limited.c.created_at.desc(), limited.c.id.desc())
+        ).label("rn"),
+    ).subquery()
+
+    # Claves como literales SQL ('nombre'): un bind sin tipo en json_build_object
+    # no se puede inferir y asyncpg lo rechaza (IndeterminateDatatypeError)
+    fields = [column for column in page.c if column.name != "rn"]
+    item = func.json_build_object(
+        *[part for column in fields for part in (literal_column(f"'{column.name}'"), column)]
+    )
+
+    result = await db.execute(
+        select(
+            # ::text: el dialecto asyncpg decodifica json a list; el endpoint
+            # necesita el cuerpo ya serializado
+            cast(
+                func.json_agg(aggregate_order_by(item, page.c.rn)).filter(page.c.rn <= limit),
+                Text,
+            ),
+            func.count(),
+            func.max(page.c.created_at).filter(page.c.rn == limit),
+            func.max(page.c.id).filter(page.c.rn == limit),
+        ).select_from(page)
+    )
+    payload, row_count, last_created_at, last_id = result.one()
+
+    next_key = (last_created_at, last_id) if row_count > limit else None
+    return payload or "[]", next_key
+
+
 async def get_by_student(db: AsyncSession, student_id: int) -> list[Enrollment]:
     """Obtener todas las inscripciones de un alumno"""
     result = await db.execute(
         select(Enrollment)
+        .options(*_ENROLLMENT_RESPONSE_OPTIONS)
         .where(Enrollment.student_id == student_id)
         .order_by(Enrollment.created_at.desc())
     )
     return list(result.scalars().all())
 
 
+async def get_create_context(
+    db: AsyncSession,
+    student_id: int,
+    instrument_id: int,
+    selected_teacher_id: int | None = None
+):
+    """
+    Datos para validar la creación de una inscripción, en una sola consulta
+
+    Reúne en un SELECT de subconsultas escalares lo que antes eran hasta
+    cuatro lecturas independientes (alumno, su profesor, profesor
+    seleccionado e instrumento), de las que solo se usaban columnas sueltas.
+
+    Args:
+        db: Sesión de base de datos
+        student_id: ID del alumno (solo alumnos activos)
+        instrument_id: ID del instrumento
+        selected_teacher_id: ID del profesor elegido para la inscripción (opcional)
+
+    Returns:
+        Fila con student_teacher_id, student_teacher_org_id, instrument_name,
+        instrument_active y selected_teacher_org_id. student_teacher_id e
+        instrument_name son None si el alumno / instrumento no existen.
+    """
+    student_teacher_id = (
+        select(Student.teacher_id)
+        .where(Student.id == student_id, Student.active == True)
+        .scalar_subquery()
+    )
+    student_teacher_org_id = (
+        select(Teacher.organization_id)
+        .join(Student, Student.teacher_id == Teacher.id)
+        .where(Student.id == student_id, Student.active == True)
+        .scalar_subquery()
+    )
+    instrument_name = (
+        select(Instrument.name)
+        .where(Instrument.id == instrument_id)
+        .scalar_subquery()
+    )
+    instrument_active = (
+        select(Instrument.active)
+        .where(Instrument.id == instrument_id)
+        .scalar_subquery()
+    )
+    selected_teacher_org_id = (
+        select(Teacher.organization_id)
+        .where(Teacher.id == selected_teacher_id)
+        .scalar_subquery()
+    )
+
+    result = await db.execute(
+        select(
+            student_teacher_id.label("student_teacher_id"),
+            student_teacher_org_id.label("student_teacher_org_id"),
+            instrument_name.label("instrument_name"),
+            instrument_active.label("instrument_active"),
+            selected_teacher_org_id.label("selected_teacher_org_id"),
+        )
+    )
+    return result.one()
+
+
 async def create(db: AsyncSession, enrollment_data: EnrollmentCreate) -> Enrollment:
-    """Crear una inscripción nueva"""
-    enrollment = Enrollment(**enrollment_data.model_dump())
-    
-    db.add(enrollment)
+    """
+    Crear una inscripción nueva
+
+    INSERT ... RETURNING trae la fila completa (id, defaults del servidor,
+    created_at/updated_at) en el mismo round trip; luego un único COMMIT.
+    Antes era INSERT + COMMIT + refresh(), y el refresh disparaba además los
+    selectin de todas las relaciones (alumno, profesor, horarios, clases...).
+    """
+    result = await db.execute(
+        insert(Enrollment)
+        .values(**enrollment_data.model_dump())
+        .returning(Enrollment)
+    )
+    enrollment = result.scalar_one()
     await db.commit()
-    await db.refresh(enrollment)
-    
+
     return enrollment
 
 
@@ -131,7 +421,8 @@ async def suspend(
     db: AsyncSession,
     enrollment_id: int,
     reason: Optional[str] = None,
-    until_date: Optional[date] = None
+    until_date: Optional[date] = None,
+    teacher: Optional[Teacher] = None
 ) -> dict:
     """
     Suspender una inscripción temporalmente.
@@ -142,34 +433,55 @@ async def suspend(
     3. Guardar suspended_reason (opcional)
     4. ELIMINAR todas las clases futuras (scheduled)
     
+    El cambio de estado es un único UPDATE ... RETURNING condicionado a que
+    no esté ya suspendida y, si se pasa teacher, a que le pertenezca.
+    
     Args:
         db: Sesión de base de datos
         enrollment_id: ID de la inscripción a suspender
         reason: Motivo de la suspensión (opcional)
         until_date: Fecha hasta cuándo está suspendido (opcional)
+        teacher: Profesor autenticado (opcional). Si se pasa, la pertenencia
+            se verifica en el mismo UPDATE
     
     Returns:
-        dict con enrollment actualizado y cantidad de clases eliminadas
+        dict con enrollment actualizado y cantidad de clases eliminadas.
+        Si la inscripción no existe o no pertenece al profesor, enrollment es None
+        (usar exists_by_id() para distinguir 404 de 403)
     """
-    # Obtener la inscripción
+    today = date.today()
+    
+    # 1. Actualizar estado del enrollment (pertenencia y estado previo en el WHERE)
+    conditions = [
+        Enrollment.id == enrollment_id,
+        Enrollment.status != EnrollmentStatus.SUSPENDED
+    ]
+    if teacher is not None:
+        conditions.append(_owned_by(teacher))
+    
     result = await db.execute(
-        select(Enrollment).where(Enrollment.id == enrollment_id)
+        sa_update(Enrollment)
+        .where(*conditions)
+        .values(
+            status=EnrollmentStatus.SUSPENDED,
+            suspended_at=today,
+            suspended_reason=reason,
+            suspended_until=until_date
+        )
+        .returning(Enrollment)
+        .execution_options(populate_existing=True)
     )
     enrollment = result.scalar_one_or_none()
     
     if not enrollment:
-        return {"error": "Enrollment no encontrado", "enrollment": None, "classes_deleted": 0}
-    
-    if enrollment.status == EnrollmentStatus.SUSPENDED:
-        return {"error": "El enrollment ya está suspendido", "enrollment": enrollment, "classes_deleted": 0}
-    
-    today = date.today()
-    
-    # 1. Actualizar estado del enrollment
-    enrollment.status = EnrollmentStatus.SUSPENDED
-    enrollment.suspended_at = today
-    enrollment.suspended_reason = reason
-    enrollment.suspended_until = until_date
+        # Camino de error: ¿no existe / no es suya, o ya estaba suspendida?
+        if teacher is not None:
+            existing = await get_for_teacher(db, enrollment_id, teacher)
+        else:
+            existing = await get(db, enrollment_id)
+        if not existing:
+            return {"error": "Enrollment no encontrado", "enrollment": None, "classes_deleted": 0}
+        return {"error": "El enrollment ya está suspendido", "enrollment": existing, "classes_deleted": 0}
     
     # 2. ELIMINAR clases futuras (físicamente, no cancelar)
     # Solo eliminar clases con status='scheduled' y fecha >= hoy
@@ -193,6 +505,71 @@ async def suspend(
     }
 
 
+async def suspend_many(
+    db: AsyncSession,
+    enrollment_ids: list[int],
+    teacher: Teacher,
+    reason: Optional[str] = None,
+    until_date: Optional[date] = None
+) -> dict:
+    """
+    Suspender varias inscripciones en un solo UPDATE ... RETURNING.
+
+    Mismas acciones que suspend(), aplicadas a todo el lote: solo se
+    suspenden las inscripciones que existen, pertenecen al profesor (o a su
+    organización) y no estaban ya suspendidas.
+
+    Args:
+        db: Sesión de base de datos
+        enrollment_ids: IDs de las inscripciones a suspender
+        teacher: Profesor autenticado
+        reason: Motivo de la suspensión (opcional)
+        until_date: Fecha hasta cuándo están suspendidas (opcional)
+
+    Returns:
+        dict con suspended (lista de (id, teacher_id)) y classes_deleted
+    """
+    today = date.today()
+
+    result = await db.execute(
+        sa_update(Enrollment)
+        .where(
+            Enrollment.id.in_(enrollment_ids),
+            Enrollment.status != EnrollmentStatus.SUSPENDED,
+            _owned_by(teacher)
+        )
+        .values(
+            status=EnrollmentStatus.SUSPENDED,
+            suspended_at=today,
+            suspended_reason=reason,
+            suspended_until=until_date
+        )
+        .returning(Enrollment.id, Enrollment.teacher_id)
+        .execution_options(synchronize_session=False)
+    )
+    suspended = [(row.id, row.teacher_id) for row in result]
+
+    classes_deleted = 0
+    if suspended:
+        delete_result = await db.execute(
+            delete(Class).where(
+                and_(
+                    Class.enrollment_id.in_([enrollment_id for enrollment_id, _ in suspended]),
+                    Class.date >= today,
+                    Class.status == ClassStatus.SCHEDULED
+                )
+            )
+        )
+        classes_deleted = delete_result.rowcount
+
+    await db.commit()
+
+    return {
+        "suspended": suspended,
+        "classes_deleted": classes_deleted
+    }
+
+
 # ========================================
 # REACTIVACIÓN - IGUAL QUE CAMBIO DE HORARIO
 # ========================================
@@ -675,30 +1052,59 @@ async def reactivate(
 
 async def withdraw(
     db: AsyncSession,
-    enrollment_id: int
+    enrollment_id: int,
+    teacher: Optional[Teacher] = None
 ) -> dict:
-    """Retirar una inscripción definitivamente."""
+    """
+    Retirar una inscripción definitivamente.
+
+    El cambio de estado es un único UPDATE ... RETURNING condicionado a que
+    no esté ya retirada y, si se pasa teacher, a que le pertenezca.
+
+    Args:
+        db: Sesión de base de datos
+        enrollment_id: ID de la inscripción a retirar
+        teacher: Profesor autenticado (opcional). Si se pasa, la pertenencia
+            se verifica en el mismo UPDATE
+
+    Returns:
+        dict con enrollment actualizado y cantidad de clases eliminadas.
+        Si la inscripción no existe o no pertenece al profesor, enrollment es None
+        (usar exists_by_id() para distinguir 404 de 403)
+    """
+    today = date.today()
+
+    conditions = [
+        Enrollment.id == enrollment_id,
+        Enrollment.status != EnrollmentStatus.WITHDRAWN
+    ]
+    if teacher is not None:
+        conditions.append(_owned_by(teacher))
+
     result = await db.execute(
-        select(Enrollment).where(Enrollment.id == enrollment_id)
+        sa_update(Enrollment)
+        .where(*conditions)
+        .values(status=EnrollmentStatus.WITHDRAWN, withdrawn_date=today)
+        .returning(Enrollment)
+        .execution_options(populate_existing=True)
     )
     enrollment = result.scalar_one_or_none()
     
     if not enrollment:
-        return {"error": "Enrollment no encontrado", "enrollment": None, "classes_deleted": 0}
-    
-    if enrollment.status == EnrollmentStatus.WITHDRAWN:
-        return {"error": "El enrollment ya está retirado", "enrollment": enrollment, "classes_deleted": 0}
-    
-    today = date.today()
-    
-    enrollment.status = EnrollmentStatus.WITHDRAWN
-    enrollment.withdrawn_date = today
+        # Camino de error: ¿no existe / no es suya, o ya estaba retirada?
+        if teacher is not None:
+            existing = await get_for_teacher(db, enrollment_id, teacher)
+        else:
+            existing = await get(db, enrollment_id)
+        if not existing:
+            return {"error": "Enrollment no encontrado", "enrollment": None, "classes_deleted": 0}
+        return {"error": "El enrollment ya está retirado", "enrollment": existing, "classes_deleted": 0}
     
-    schedules_result = await db.execute(
-        select(Schedule).where(Schedule.enrollment_id == enrollment_id)
+    await db.execute(
+        sa_update(Schedule)
+        .where(Schedule.enrollment_id == enrollment_id)
+        .values(active=False)
     )
-    for schedule in schedules_result.scalars().all():
-        schedule.active = False
     
     delete_result = await db.execute(
         delete(Class).where(
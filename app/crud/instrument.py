@@ -2,10 +2,65 @@
 CRUD operations for Instrument model
 """
 
+import asyncio
+import time
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.instrument import Instrument
-from app.schemas.instrument import InstrumentCreate, InstrumentUpdate
+from app.schemas.instrument import InstrumentCreate, InstrumentUpdate, InstrumentResponse
+
+
+# ========================================
+# CACHE DEL CATÁLOGO ACTIVO
+# ========================================
+# El catálogo casi no cambia (se carga con el seed) y se pide en cada
+# dropdown. Se guarda ya convertido a InstrumentResponse (sin objetos ORM
+# atados a una sesión) por proceso/worker. create/update lo invalidan en el
+# worker que atiende el cambio; en los demás caduca por TTL.
+ACTIVE_INSTRUMENTS_CACHE_TTL_SECONDS = 300
+
+_active_cache: tuple[float, list[InstrumentResponse]] | None = None
+
+# Catálogo completo (activos e inactivos) para /sync/initial, compartido por
+# todos los profesores. Cada entrada guarda la versión del catálogo con la que
+# se cargó: si create/update la incrementa mientras una recarga está en curso,
+# esa recarga no se reutiliza. El lock evita que varios logins simultáneos con
+# el cache vencido lancen la misma consulta a la vez.
+_catalog_version = 0
+_all_cache: tuple[float, int, list[InstrumentResponse]] | None = None
+_all_cache_lock = asyncio.Lock()
+
+
+def invalidate_active_cache() -> None:
+    """
+    Invalida los caches del catálogo de instrumentos (activos y completo).
+
+    Llamar después de crear/actualizar instrumentos.
+    """
+    global _active_cache, _all_cache, _catalog_version
+    _catalog_version += 1
+    _active_cache = None
+    _all_cache = None
+
+
+def catalog_version() -> int:
+    """
+    Versión del catálogo en este proceso (cambia con cada create/update).
+
+    Sirve para invalidar caches que incluyen el catálogo (ej. el body de
+    /sync/initial).
+    """
+    return _catalog_version
+
+
+def _all_cache_valid(now: float) -> bool:
+    """True si el catálogo completo cacheado sigue vigente."""
+    return (
+        _all_cache is not None
+        and _all_cache[0] > now
+        and _all_cache[1] == _catalog_version
+    )
 
 
 async def get(db: AsyncSession, instrument_id: int) -> Instrument | None:
@@ -70,6 +125,67 @@ async def get_active(db: AsyncSession) -> list[Instrument]:
     return list(result.scalars().all())
 
 
+async def get_active_cached(db: AsyncSession) -> list[InstrumentResponse]:
+    """
+    Obtener instrumentos activos desde el cache TTL (consulta solo si caducó)
+
+    Args:
+        db: Sesión de base de datos (solo se usa si el cache caducó)
+
+    Returns:
+        Lista de InstrumentResponse activos, ordenados alfabéticamente
+    """
+    global _active_cache
+    now = time.monotonic()
+
+    if _active_cache is None or _active_cache[0] <= now:
+        instruments = await get_active(db)
+        _active_cache = (
+            now + ACTIVE_INSTRUMENTS_CACHE_TTL_SECONDS,
+            [InstrumentResponse.model_validate(inst) for inst in instruments],
+        )
+
+    return _active_cache[1]
+
+
+async def get_all_cached(db: AsyncSession) -> list[InstrumentResponse]:
+    """
+    Obtener todos los instrumentos (activos e inactivos) desde el cache TTL
+
+    Si el cache caducó, solo una corrutina consulta la base; las demás
+    esperan el lock y reutilizan el resultado.
+
+    Args:
+        db: Sesión de base de datos (solo se usa si el cache caducó)
+
+    Returns:
+        Lista de InstrumentResponse de todo el catálogo
+    """
+    global _all_cache
+
+    if _all_cache_valid(time.monotonic()):
+        return _all_cache[2]
+
+    async with _all_cache_lock:
+        now = time.monotonic()
+        if _all_cache_valid(now):
+            return _all_cache[2]
+
+        version = _catalog_version
+        result = await db.execute(select(Instrument))
+        instruments = [
+            InstrumentResponse.model_validate(inst)
+            for inst in result.scalars().all()
+        ]
+        if version == _catalog_version:
+            _all_cache = (
+                now + ACTIVE_INSTRUMENTS_CACHE_TTL_SECONDS,
+                version,
+                instruments,
+            )
+        return instruments
+
+
 async def create(db: AsyncSession, instrument_data: InstrumentCreate) -> Instrument:
     """
     Crear un instrumento nuevo
@@ -86,6 +202,7 @@ async def create(db: AsyncSession, instrument_data: InstrumentCreate) -> Instrum
     db.add(instrument)
     await db.commit()
     await db.refresh(instrument)
+    invalidate_active_cache()
     
     return instrument
 
@@ -125,5 +242,6 @@ async def update(
     
     await db.commit()
     await db.refresh(instrument)
+    invalidate_active_cache()
     
     return instrument
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""
+Predicados SQL de pertenencia (teacher / organización)
+
+Regla única de autorización de la app, expresada como condición de WHERE
+para poder verificar pertenencia en la misma consulta que lee o modifica:
+- Teacher con organización: el recurso debe ser de algún teacher de su organización
+- Teacher independiente: el recurso debe ser suyo
+"""
+
+from sqlalchemy import select
+
+from app.models.teacher import Teacher
+
+
+def owned_by_teacher(teacher_id_column, teacher: Teacher):
+    """
+    Predicado SQL de pertenencia de un recurso al profesor autenticado
+
+    Args:
+        teacher_id_column: Columna teacher_id del recurso (ej: Class.teacher_id)
+        teacher: Profesor autenticado
+
+    Returns:
+        Expresión booleana para usar en un WHERE
+    """
+    if teacher.organization_id:
+        return teacher_id_column.in_(
+            select(Teacher.id).where(Teacher.organization_id == teacher.organization_id)
+        )
+    return teacher_id_column == teacher.id
@@ -3,22 +3,68 @@ CRUD operations for Schedule model
 """
 
 import logging
+import time as time_mod
 from datetime import date, time
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update as sql_update, and_, or_, func, extract
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, delete, insert, update as sql_update, and_, or_, func, extract, exists, tuple_
+from sqlalchemy.orm import selectinload, noload, raiseload
 from app.models.schedule import Schedule, DayOfWeek
 from app.models.attendance import Attendance
 from app.models.enrollment import Enrollment, EnrollmentStatus
 from app.models.class_model import ClassFormat, Class, ClassType, ClassStatus
 from app.models.student import Student
+from app.models.teacher import Teacher
+from app.crud.ownership import owned_by_teacher
 from app.schemas.schedule import ScheduleCreate, ScheduleUpdate
 from app.core.config import settings
-from app.jobs.class_generator import generate_classes_for_enrollment, _generate_classes_for_schedule
+from app.jobs.class_generator import generate_classes_for_enrollment, _generate_classes_for_schedule, _insert_classes
 
 logger = logging.getLogger(__name__)
 
 
+# ========================================
+# CACHE DE VALIDACIÓN DE SLOTS
+# ========================================
+# El formulario de inscripción llama a /schedules/validate-slot en cada
+# cambio de día/hora/formato. El resultado solo cambia cuando se modifican
+# horarios del profesor, así que se cachea (en memoria del proceso) por
+# (teacher_id, day, time, format, duration) con TTL corto. Las mutaciones de
+# horarios de este módulo invalidan las entradas del profesor; el TTL acota
+# la desactualización por cambios hechos por otras vías (otro worker,
+# suspensión/retiro de inscripciones).
+
+SLOT_VALIDATION_CACHE_TTL_SECONDS = 10
+SLOT_VALIDATION_CACHE_MAXSIZE = 2048
+
+_slot_cache: dict[tuple, tuple[float, dict]] = {}
+
+
+def invalidate_slot_cache(teacher_id: int) -> None:
+    """
+    Descarta las validaciones de slot cacheadas de un profesor.
+
+    Args:
+        teacher_id: ID del profesor cuyos horarios cambiaron
+    """
+    for key in [key for key in _slot_cache if key[0] == teacher_id]:
+        _slot_cache.pop(key, None)
+
+
+# ========================================
+# OPCIONES DE CARGA PARA RESPUESTAS
+# ========================================
+# ScheduleResponse solo anida la inscripción (id, format). Las demás
+# relaciones selectin del modelo (teacher, room, classes) y las de la propia
+# inscripción (alumno, instrumento, clases, historial...) no aparecen en la
+# respuesta: se omiten (o fallan con STRICT_LOADING).
+_skip_rest = raiseload if settings.STRICT_LOADING else noload
+
+_SCHEDULE_RESPONSE_OPTIONS = (
+    selectinload(Schedule.enrollment).options(_skip_rest("*")),
+    _skip_rest("*"),
+)
+
+
 async def get(db: AsyncSession, schedule_id: int) -> Schedule | None:
     """
     Obtener un horario por ID
@@ -36,35 +82,118 @@ async def get(db: AsyncSession, schedule_id: int) -> Schedule | None:
     return result.scalar_one_or_none()
 
 
+async def get_for_teacher(
+    db: AsyncSession,
+    schedule_id: int,
+    teacher: Teacher
+) -> Schedule | None:
+    """
+    Obtener un horario por ID solo si pertenece al profesor (una sola consulta)
+
+    Args:
+        db: Sesión de base de datos
+        schedule_id: ID del horario
+        teacher: Profesor autenticado
+
+    Returns:
+        Schedule si existe y le pertenece, None en cualquier otro caso
+        (usar exists_by_id() para distinguir 404 de 403)
+    """
+    result = await db.execute(
+        select(Schedule).where(
+            Schedule.id == schedule_id,
+            owned_by_teacher(Schedule.teacher_id, teacher)
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def exists_by_id(db: AsyncSession, schedule_id: int) -> bool:
+    """
+    Verificar si existe un horario (sin cargar la fila ni sus relaciones)
+
+    Args:
+        db: Sesión de base de datos
+        schedule_id: ID del horario
+
+    Returns:
+        True si existe, False si no
+    """
+    result = await db.execute(
+        select(exists().where(Schedule.id == schedule_id))
+    )
+    return bool(result.scalar())
+
+
 async def get_multi(
     db: AsyncSession,
     teacher_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: tuple[DayOfWeek, time, int] | None = None
 ) -> list[Schedule]:
     """
     Obtener múltiples horarios de un profesor
 
+    Orden estable (day, time, id). Con `after` (clave de la última fila de la
+    página anterior) pagina por keyset sobre el índice (teacher_id, day, time)
+    en lugar de usar OFFSET.
+
     Args:
         db: Sesión de base de datos
         teacher_id: ID del profesor
-        skip: Cantidad de registros a saltar (paginación)
+        skip: Cantidad de registros a saltar (solo si no se usa `after`)
         limit: Cantidad máxima de registros a retornar
+        after: Tupla (day, time, id) desde la que continuar (opcional)
 
     Returns:
         Lista de Schedules del profesor, ordenados por día y hora
     """
-    result = await db.execute(
+    stmt = (
         select(Schedule)
-        .options(selectinload(Schedule.enrollment))  # Cargar enrollment para validaciones
+        .options(*_SCHEDULE_RESPONSE_OPTIONS)
         .where(Schedule.teacher_id == teacher_id)
-        .offset(skip)
+        .order_by(Schedule.day, Schedule.time, Schedule.id)
         .limit(limit)
-        .order_by(Schedule.day, Schedule.time)
     )
+    if after is not None:
+        # types=: el día se bindea con el tipo de la columna (valor 'monday')
+        keyset = tuple_(*after, types=[Schedule.day.type, Schedule.time.type, Schedule.id.type])
+        stmt = stmt.where(tuple_(Schedule.day, Schedule.time, Schedule.id) > keyset)
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    result = await db.execute(stmt)
     return list(result.scalars().all())
 
 
+async def get_multi_version(db: AsyncSession, teacher_id: int) -> tuple:
+    """
+    Obtener la "versión" de los horarios de un profesor (para ETag del listado)
+
+    Una sola consulta de agregados: cantidad de horarios y máximo updated_at
+    del horario y de la inscripción que viaja anidada en ScheduleResponse.
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+
+    Returns:
+        Tupla (count, max schedule.updated_at, max enrollment.updated_at)
+    """
+    result = await db.execute(
+        select(
+            func.count(Schedule.id),
+            func.max(Schedule.updated_at),
+            func.max(Enrollment.updated_at),
+        )
+        .select_from(Schedule)
+        .outerjoin(Enrollment, Enrollment.id == Schedule.enrollment_id)
+        .where(Schedule.teacher_id == teacher_id)
+    )
+    return tuple(result.one())
+
+
 async def get_by_enrollment(
     db: AsyncSession,
     enrollment_id: int
@@ -84,12 +213,54 @@ async def get_by_enrollment(
     """
     result = await db.execute(
         select(Schedule)
+        .options(*_SCHEDULE_RESPONSE_OPTIONS)
         .where(Schedule.enrollment_id == enrollment_id)
         .order_by(Schedule.day, Schedule.time)
     )
     return list(result.scalars().all())
 
 
+async def get_by_enrollment_for_teacher(
+    db: AsyncSession,
+    enrollment_id: int,
+    teacher: Teacher
+) -> list[Schedule] | None:
+    """
+    Horarios de una inscripción del profesor, verificando pertenencia en la misma consulta
+
+    enrollments LEFT JOIN schedules filtrado por el predicado de pertenencia:
+    si la inscripción es del profesor siempre hay al menos una fila (con
+    Schedule NULL si no tiene horarios); si no hay filas, la inscripción no
+    existe o no le pertenece.
+
+    Args:
+        db: Sesión de base de datos
+        enrollment_id: ID de la inscripción
+        teacher: Profesor autenticado
+
+    Returns:
+        Lista de Schedules ordenados por día y hora (puede ser vacía), o None si
+        la inscripción no existe o no pertenece al profesor (usar
+        enrollment.exists_by_id() para distinguir 404 de 403)
+    """
+    result = await db.execute(
+        select(Enrollment.id, Schedule)
+        .select_from(Enrollment)
+        .outerjoin(Schedule, Schedule.enrollment_id == Enrollment.id)
+        .options(*_SCHEDULE_RESPONSE_OPTIONS)
+        .where(
+            Enrollment.id == enrollment_id,
+            owned_by_teacher(Enrollment.teacher_id, teacher)
+        )
+        .order_by(Schedule.day, Schedule.time)
+    )
+    rows = result.all()
+
+    if not rows:
+        return None
+    return [row.Schedule for row in rows if row.Schedule is not None]
+
+
 async def check_schedule_conflict(
     db: AsyncSession,
     teacher_id: int,
@@ -141,13 +312,12 @@ async def check_schedule_conflict(
 
     logger.info(f"Hora inicio: {time_obj}, Hora fin: {end_time}")
 
-    # Si se pasa enrollment_id, consultar el formato
+    # Si se pasa enrollment_id, consultar el formato. db.get() resuelve desde
+    # el identity map de la sesión (por request) cuando el router ya cargó la
+    # inscripción para verificar pertenencia: sin un segundo SELECT por id
     current_format = None
     if enrollment_id:
-        result = await db.execute(
-            select(Enrollment).where(Enrollment.id == enrollment_id)
-        )
-        enrollment = result.scalar_one_or_none()
+        enrollment = await db.get(Enrollment, enrollment_id)
         if enrollment:
             current_format = enrollment.format
             logger.info(f"Formato del enrollment: {current_format}")
@@ -213,10 +383,7 @@ async def check_schedule_conflict(
             if curr_fmt_str == "group":
                 existing_enrollment = existing.enrollment
                 if not existing_enrollment and existing.enrollment_id is not None:
-                    result_enrollment = await db.execute(
-                        select(Enrollment).where(Enrollment.id == existing.enrollment_id)
-                    )
-                    existing_enrollment = result_enrollment.scalar_one_or_none()
+                    existing_enrollment = await db.get(Enrollment, existing.enrollment_id)
 
                 if existing_enrollment:
                     exist_fmt_str = extract_format(existing_enrollment.format)
@@ -248,7 +415,11 @@ async def check_schedule_conflict(
     return None
 
 
-async def create(db: AsyncSession, schedule_data: ScheduleCreate) -> Schedule:
+async def create(
+    db: AsyncSession,
+    schedule_data: ScheduleCreate,
+    commit: bool = True
+) -> Schedule:
     """
     Crear un horario nuevo (template recurrente)
 
@@ -261,12 +432,15 @@ async def create(db: AsyncSession, schedule_data: ScheduleCreate) -> Schedule:
     Args:
         db: Sesión de base de datos
         schedule_data: Datos del horario a crear
+        commit: Si False, no hace commit ni invalida el cache de slots: el
+            llamador maneja la transacción (async with db.begin()) y un
+            ValueError la revierte completa (horario + clases)
 
     Returns:
         Schedule creado con id asignado
 
     Raises:
-        ValueError: Si hay conflicto de horarios
+        ValueError: Si hay conflicto de horarios o falla la generación de clases
     """
     # Verificar conflicto de horarios
     conflict = await check_schedule_conflict(
@@ -291,11 +465,16 @@ async def create(db: AsyncSession, schedule_data: ScheduleCreate) -> Schedule:
             f"(Inscripción ID: {conflict.enrollment_id})"
         )
 
-    schedule = Schedule(**schedule_data.model_dump())
-
-    db.add(schedule)
-    await db.commit()
-    await db.refresh(schedule)
+    # INSERT ... RETURNING: la fila completa vuelve en el mismo round trip
+    # (sin refresh posterior)
+    result = await db.execute(
+        insert(Schedule)
+        .values(**schedule_data.model_dump())
+        .returning(Schedule)
+    )
+    schedule = result.scalar_one()
+    if commit:
+        await db.commit()
 
     # 🔥 GENERAR CLASES AUTOMÁTICAMENTE (mes actual + 2 meses siguientes)
     logger.info(f"Generando clases automáticas para enrollment {schedule_data.enrollment_id}...")
@@ -304,7 +483,8 @@ async def create(db: AsyncSession, schedule_data: ScheduleCreate) -> Schedule:
             db,
             schedule_data.enrollment_id,
             months_ahead=2,
-            from_date=schedule.valid_from
+            from_date=schedule.valid_from,
+            commit=commit
         )
         logger.info(f"Clases generadas: {stats}")
 
@@ -318,7 +498,9 @@ async def create(db: AsyncSession, schedule_data: ScheduleCreate) -> Schedule:
             raise ValueError(msg)
 
         # Persistir las clases generadas en la misma transacción.
-        await db.commit()
+        if commit:
+            await db.commit()
+            invalidate_slot_cache(schedule.teacher_id)
 
     except Exception as e:
         logger.error(f"Error al generar clases automáticas para schedule {schedule.id}: {e}", exc_info=True)
@@ -330,7 +512,8 @@ async def create(db: AsyncSession, schedule_data: ScheduleCreate) -> Schedule:
 async def update(
     db: AsyncSession,
     schedule_id: int,
-    schedule_data: ScheduleUpdate
+    schedule_data: ScheduleUpdate,
+    commit: bool = True
 ) -> Schedule | None:
     """
     Actualizar un horario existente
@@ -341,6 +524,8 @@ async def update(
         db: Sesión de base de datos
         schedule_id: ID del horario a actualizar
         schedule_data: Datos a actualizar (solo campos no None)
+        commit: Si False, solo hace flush (la transacción la maneja el llamador,
+            que también invalida el cache de slots)
 
     Returns:
         Schedule actualizado si existe, None si no
@@ -405,7 +590,11 @@ async def update(
             .values(room_id=update_data.get('room_id'))
         )
 
-    await db.commit()
+    if commit:
+        await db.commit()
+        invalidate_slot_cache(schedule_obj.teacher_id)
+    else:
+        await db.flush()
     await db.refresh(schedule_obj)
 
     return schedule_obj
@@ -415,26 +604,47 @@ async def validate_slot_availability(
     db: AsyncSession,
     teacher_id: int,
     day: str,
-    time: str,
+    time: time,
     format: ClassFormat,
     duration: int = 45,
 ) -> dict:
-    from datetime import datetime, timedelta
+    """
+    Validar disponibilidad de un slot del profesor
 
-    if isinstance(time, str):
-        if len(time) == 5:
-            time = f"{time}:00"
-        time_obj = datetime.strptime(time, "%H:%M:%S").time()
-    else:
-        time_obj = time
+    La ocupación se agrega en Postgres: una sola consulta devuelve los grupos
+    (hora, duración, formato) que se solapan con el slot pedido, con el número
+    de alumnos y un nombre de alumno de ejemplo. Antes se cargaban todos los
+    horarios del día con su inscripción y alumno (y sus cascadas selectin)
+    para filtrar el solape en Python.
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+        day: Día de la semana
+        time: Hora de inicio (ya parseada en la capa HTTP)
+        format: Formato deseado
+        duration: Duración en minutos
 
-    new_start = time_obj
-    new_end = (datetime.combine(datetime.today(), time_obj) + timedelta(minutes=duration)).time()
+    Returns:
+        dict con available, message, current_students, max_students,
+        existing_format y conflict
+    """
+    from datetime import datetime, timedelta
+
+    new_start = time
+    new_end = (datetime.combine(datetime.today(), time) + timedelta(minutes=duration)).time()
+    schedule_end = Schedule.time + func.make_interval(0, 0, 0, 0, 0, Schedule.duration)
 
     result = await db.execute(
-        select(Schedule)
-        .options(selectinload(Schedule.enrollment).selectinload(Enrollment.student))
+        select(
+            Schedule.time,
+            Schedule.duration,
+            Enrollment.format,
+            func.count().label("students"),
+            func.min(Student.name).label("student_name"),
+        )
         .join(Enrollment, Schedule.enrollment_id == Enrollment.id)
+        .outerjoin(Student, Enrollment.student_id == Student.id)
         .where(
             and_(
                 Schedule.teacher_id == teacher_id,
@@ -444,20 +654,17 @@ async def validate_slot_availability(
                 or_(
                     Schedule.valid_until == None,
                     Schedule.valid_until >= datetime.today().date()
-                )
+                ),
+                Schedule.time < new_end,
+                schedule_end > new_start,
             )
         )
+        .group_by(Schedule.time, Schedule.duration, Enrollment.format)
+        .order_by(func.count().desc(), Schedule.time)
     )
-    all_day_schedules = result.scalars().all()
+    groups = result.all()
 
-    overlapping = []
-    for s in all_day_schedules:
-        s_start = s.time
-        s_end = (datetime.combine(datetime.today(), s_start) + timedelta(minutes=s.duration)).time()
-        if new_start < s_end and new_end > s_start:
-            overlapping.append(s)
-
-    if not overlapping:
+    if not groups:
         max_capacity = settings.MAX_GROUP_CLASS_SIZE if format == ClassFormat.GROUP else 1
         return {
             "available": True,
@@ -468,63 +675,42 @@ async def validate_slot_availability(
             "conflict": False
         }
 
-    exact_matches = [s for s in overlapping if s.time == time_obj and s.duration == duration]
-    partial_overlaps = [s for s in overlapping if not (s.time == time_obj and s.duration == duration)]
+    exact_matches = [g for g in groups if g.time == time and g.duration == duration]
+    partial_overlaps = [g for g in groups if not (g.time == time and g.duration == duration)]
 
     if partial_overlaps:
         first = partial_overlaps[0]
-        enrollment_obj = first.enrollment or (await db.execute(
-            select(Enrollment).where(Enrollment.id == first.enrollment_id)
-        )).scalar_one()
         overlap_start = first.time.strftime('%H:%M')
         overlap_end = (datetime.combine(datetime.today(), first.time) + timedelta(minutes=first.duration)).strftime('%H:%M')
-        student_name = None
-        if getattr(enrollment_obj, 'student', None):
-            student_name = enrollment_obj.student.name
-        else:
-            student_record = await db.execute(select(Student).where(Student.id == enrollment_obj.student_id))
-            student_record = student_record.scalar_one_or_none()
-            student_name = student_record.name if student_record else None
-        student_suffix = f" de {student_name}" if student_name else ''
+        student_suffix = f" de {first.student_name}" if first.student_name else ''
         return {
             "available": False,
             "message": f"Conflicto con clase de {overlap_start} a {overlap_end}{student_suffix}",
-            "current_students": len(overlapping),
+            "current_students": sum(g.students for g in groups),
             "max_students": settings.MAX_GROUP_CLASS_SIZE if format == ClassFormat.GROUP else 1,
-            "existing_format": enrollment_obj.format.value,
+            "existing_format": first.format.value,
             "conflict": True
         }
 
     first = exact_matches[0]
-    existing_enrollment = first.enrollment or (await db.execute(
-        select(Enrollment).where(Enrollment.id == first.enrollment_id)
-    )).scalar_one()
-    existing_format = existing_enrollment.format
+    existing_format = first.format
+    current_count = sum(g.students for g in exact_matches)
 
     if existing_format != format:
         format_name = "individual" if existing_format == ClassFormat.INDIVIDUAL else "grupal"
         return {
             "available": False,
             "message": f"Este horario ya existe como {format_name}",
-            "current_students": len(exact_matches),
+            "current_students": current_count,
             "max_students": settings.MAX_GROUP_CLASS_SIZE if existing_format == ClassFormat.GROUP else 1,
             "existing_format": existing_format.value,
             "conflict": True
         }
 
-    current_count = len(exact_matches)
-
     if existing_format == ClassFormat.INDIVIDUAL:
         exact_start = first.time.strftime('%H:%M')
         exact_end = (datetime.combine(datetime.today(), first.time) + timedelta(minutes=first.duration)).strftime('%H:%M')
-        student_name = None
-        if getattr(existing_enrollment, 'student', None):
-            student_name = existing_enrollment.student.name
-        else:
-            student_record = await db.execute(select(Student).where(Student.id == existing_enrollment.student_id))
-            student_record = student_record.scalar_one_or_none()
-            student_name = student_record.name if student_record else None
-        student_suffix = f" de {student_name}" if student_name else ''
+        student_suffix = f" de {first.student_name}" if first.student_name else ''
         return {
             "available": False,
             "message": f"Conflicto con clase individual de {exact_start} a {exact_end}{student_suffix}",
@@ -555,6 +741,47 @@ async def validate_slot_availability(
     }
 
 
+async def validate_slot_availability_cached(
+    db: AsyncSession,
+    teacher_id: int,
+    day: str,
+    time: time,
+    format: ClassFormat,
+    duration: int = 45,
+) -> dict:
+    """
+    validate_slot_availability() con cache TTL por profesor/slot
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+        day: Día de la semana
+        time: Hora de inicio (datetime.time; "15:00" y "15:00:00" son la misma clave)
+        format: Formato deseado
+        duration: Duración en minutos
+
+    Returns:
+        dict con la disponibilidad del slot (el mismo de validate_slot_availability)
+    """
+    key = (teacher_id, day, time, format.value, duration)
+    now = time_mod.monotonic()
+
+    cached = _slot_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    result = await validate_slot_availability(db, teacher_id, day, time, format, duration)
+
+    if len(_slot_cache) >= SLOT_VALIDATION_CACHE_MAXSIZE:
+        for expired in [k for k, (expires_at, _) in _slot_cache.items() if expires_at <= now]:
+            del _slot_cache[expired]
+        if len(_slot_cache) >= SLOT_VALIDATION_CACHE_MAXSIZE:
+            _slot_cache.clear()
+    _slot_cache[key] = (now + SLOT_VALIDATION_CACHE_TTL_SECONDS, result)
+
+    return result
+
+
 async def validate_schedule_removal(
     db: AsyncSession,
     schedule_id: int,
@@ -758,6 +985,7 @@ async def remove_schedule_with_history(
     
     await db.commit()
     await db.refresh(schedule)
+    invalidate_slot_cache(schedule.teacher_id)
     
     return {
         "schedule_id": schedule.id,
@@ -791,8 +1019,10 @@ async def remove(db: AsyncSession, schedule_id: int) -> bool:
         return False
 
     # Eliminar físicamente (las clases ya creadas permanecen)
+    teacher_id = schedule.teacher_id
     await db.delete(schedule)
     await db.commit()
+    invalidate_slot_cache(teacher_id)
 
     return True
 
@@ -979,9 +1209,12 @@ async def reactivate_schedule(
         msg = f"Generación parcial/errores: {stats.get('errors')}"
         raise ValueError(msg)
 
-    classes_generated = stats.get("created", 0)
+    classes_generated = len(stats["rows"])
+    if classes_generated:
+        await _insert_classes(db, stats["rows"])
 
     await db.commit()
+    invalidate_slot_cache(new_schedule.teacher_id)
 
     return {
         "old_schedule_id": schedule_id,
@@ -1173,6 +1406,7 @@ async def change_schedule(
 
     # 9. Commit
     await db.commit()
+    invalidate_slot_cache(new_schedule.teacher_id)
 
     return {
         "old_schedule_id": schedule_id,
@@ -3,8 +3,10 @@ CRUD operations for Student model
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, delete, exists, and_, func, tuple_
 from app.models.student import Student
+from app.models.teacher import Teacher
+from app.crud.ownership import owned_by_teacher
 from app.schemas.student import StudentCreate, StudentUpdate
 
 
@@ -28,37 +30,123 @@ async def get(db: AsyncSession, student_id: int) -> Student | None:
     return result.scalar_one_or_none()
 
 
+async def get_for_teacher(
+    db: AsyncSession,
+    student_id: int,
+    teacher: Teacher,
+    include_inactive: bool = False
+) -> Student | None:
+    """
+    Obtener un alumno por ID solo si pertenece al profesor (una sola consulta)
+
+    Args:
+        db: Sesión de base de datos
+        student_id: ID del alumno
+        teacher: Profesor autenticado
+        include_inactive: Incluir alumnos dados de baja (active=False)
+
+    Returns:
+        Student si existe y le pertenece, None en cualquier otro caso
+        (usar exists_by_id() para distinguir 404 de 403)
+    """
+    query = select(Student).where(
+        Student.id == student_id,
+        owned_by_teacher(Student.teacher_id, teacher)
+    )
+    if not include_inactive:
+        query = query.where(Student.active == True)
+
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def exists_by_id(
+    db: AsyncSession,
+    student_id: int,
+    include_inactive: bool = False
+) -> bool:
+    """
+    Verificar si existe un alumno (sin cargar la fila ni sus relaciones)
+
+    Args:
+        db: Sesión de base de datos
+        student_id: ID del alumno
+        include_inactive: Contar también alumnos dados de baja
+
+    Returns:
+        True si existe, False si no
+    """
+    condition = Student.id == student_id
+    if not include_inactive:
+        condition = and_(condition, Student.active == True)
+
+    result = await db.execute(select(exists().where(condition)))
+    return bool(result.scalar())
+
+
 async def get_multi(
     db: AsyncSession,
     teacher_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: tuple[str, int] | None = None
 ) -> list[Student]:
     """
     Obtener múltiples alumnos de un profesor
     
+    Orden estable (name, id). Con `after` (clave de la última fila de la
+    página anterior) pagina por keyset sobre el índice parcial
+    (teacher_id, name) WHERE active en lugar de usar OFFSET.
+    
     Args:
         db: Sesión de base de datos
         teacher_id: ID del profesor
-        skip: Cantidad de registros a saltar (paginación)
+        skip: Cantidad de registros a saltar (solo si no se usa `after`)
         limit: Cantidad máxima de registros a retornar
+        after: Tupla (name, id) desde la que continuar (opcional)
     
     Returns:
         Lista de Students activos del profesor
     """
-    result = await db.execute(
+    stmt = (
         select(Student)
         .where(
             Student.teacher_id == teacher_id,
             Student.active == True
         )
-        .offset(skip)
+        .order_by(Student.name, Student.id)
         .limit(limit)
-        .order_by(Student.name)
     )
+    if after is not None:
+        stmt = stmt.where(tuple_(Student.name, Student.id) > tuple_(*after))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    result = await db.execute(stmt)
     return list(result.scalars().all())
 
 
+async def get_multi_version(db: AsyncSession, teacher_id: int) -> tuple:
+    """
+    Obtener la "versión" de los alumnos activos de un profesor (para ETag del listado)
+
+    Args:
+        db: Sesión de base de datos
+        teacher_id: ID del profesor
+
+    Returns:
+        Tupla (count, max updated_at) de los alumnos activos
+    """
+    result = await db.execute(
+        select(func.count(Student.id), func.max(Student.updated_at))
+        .where(
+            Student.teacher_id == teacher_id,
+            Student.active == True
+        )
+    )
+    return tuple(result.one())
+
+
 async def create(db: AsyncSession, student_data: StudentCreate) -> Student:
     """
     Crear un alumno nuevo
@@ -70,11 +158,15 @@ async def create(db: AsyncSession, student_data: StudentCreate) -> Student:
     Returns:
         Student creado con id asignado
     """
-    student = Student(**student_data.model_dump())
-    
-    db.add(student)
+    # INSERT ... RETURNING: la fila completa vuelve en el mismo round trip
+    # (sin refresh posterior)
+    result = await db.execute(
+        insert(Student)
+        .values(**student_data.model_dump())
+        .returning(Student)
+    )
+    student = result.scalar_one()
     await db.commit()
-    await db.refresh(student)
     
     return student
 
@@ -143,6 +235,43 @@ async def remove(db: AsyncSession, student_id: int) -> bool:
     
     return True
 
+async def remove_for_teacher(
+    db: AsyncSession,
+    student_id: int,
+    teacher: Teacher
+) -> int | None:
+    """
+    Eliminar físicamente un alumno del profesor en una sola sentencia
+
+    DELETE ... WHERE id AND pertenencia RETURNING teacher_id: sin cargar el
+    alumno ni sus inscripciones. La cascada (inscripciones, horarios, clases,
+    eventos...) la resuelve Postgres con los ON DELETE CASCADE de las FKs, en
+    lugar de la cascada del ORM que cargaba y borraba fila por fila.
+
+    Args:
+        db: Sesión de base de datos
+        student_id: ID del alumno a eliminar
+        teacher: Profesor autenticado
+
+    Returns:
+        teacher_id del alumno eliminado, o None si no existe o no pertenece al
+        profesor (usar exists_by_id() para distinguir 404 de 403)
+    """
+    result = await db.execute(
+        delete(Student)
+        .where(
+            Student.id == student_id,
+            owned_by_teacher(Student.teacher_id, teacher)
+        )
+        .returning(Student.teacher_id)
+        .execution_options(synchronize_session=False)
+    )
+    teacher_id = result.scalar_one_or_none()
+    await db.commit()
+
+    return teacher_id
+
+
 async def soft_delete(db: AsyncSession, student_id: int) -> bool:
     """
     Eliminar un alumno (soft-delete)
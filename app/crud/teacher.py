@@ -4,9 +4,10 @@ CRUD operations for Teacher model
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models.teacher import Teacher
 from app.schemas.teacher import TeacherCreate, TeacherUpdate
-from app.core.security import verify_password, get_password_hash
+from app.core.security import verify_password, get_password_hash, invalidate_teacher_cache
 
 
 async def get(db: AsyncSession, teacher_id: int) -> Teacher | None:
@@ -43,27 +44,33 @@ async def get_by_email(db: AsyncSession, email: str) -> Teacher | None:
     return result.scalar_one_or_none()
 
 
-async def create(db: AsyncSession, teacher_data: TeacherCreate) -> Teacher:
+async def create(db: AsyncSession, teacher_data: TeacherCreate) -> Teacher | None:
     """
     Crear un profesor nuevo
     
+    Usa INSERT ... ON CONFLICT (email) DO NOTHING RETURNING: la verificación de
+    email único y la inserción son una sola sentencia atómica (sin carrera entre
+    dos registros simultáneos con el mismo email).
+    
     Args:
         db: Sesión de base de datos
         teacher_data: Datos del profesor a crear
     
     Returns:
-        Teacher creado con id asignado
+        Teacher creado con id asignado, None si el email ya está registrado
     """
     # Hashear el password antes de guardar
     teacher_dict = teacher_data.model_dump()
-    teacher_dict['password_hash'] = get_password_hash(teacher_dict.pop('password'))
-    
-    # Crear el objeto Teacher
-    teacher = Teacher(**teacher_dict)
+    teacher_dict['password_hash'] = await get_password_hash(teacher_dict.pop('password'))
     
-    db.add(teacher)
+    result = await db.execute(
+        pg_insert(Teacher)
+        .values(**teacher_dict)
+        .on_conflict_do_nothing(index_elements=[Teacher.email])
+        .returning(Teacher)
+    )
+    teacher = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(teacher)
     
     return teacher
 
@@ -95,10 +102,11 @@ async def update(
     
     # Actualizar solo campos que no sean None
     update_data = teacher_data.model_dump(exclude_unset=True)
+    previous_email = teacher.email
     
     # Si se actualiza el password, hashearlo
     if 'password' in update_data:
-        update_data['password_hash'] = get_password_hash(update_data.pop('password'))
+        update_data['password_hash'] = await get_password_hash(update_data.pop('password'))
     
     for field, value in update_data.items():
         setattr(teacher, field, value)
@@ -106,6 +114,9 @@ async def update(
     await db.commit()
     await db.refresh(teacher)
     
+    # El teacher autenticado está cacheado por email (ver security)
+    invalidate_teacher_cache(previous_email)
+    
     return teacher
 
 
@@ -132,7 +143,7 @@ async def authenticate(
         return None
     
     # Verificar password
-    if not verify_password(password, teacher.password_hash):
+    if not await verify_password(password, teacher.password_hash):
         return None
     
     return teacher
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+Ejecución de jobs en segundo plano (in-process)
+
+Los endpoints que disparan jobs largos (generación mensual de clases) no
+deben retener la request HTTP ni su sesión de BD durante minutos. Este
+módulo lanza el job como una tarea asyncio con su PROPIA sesión y guarda su
+estado en memoria para consultarlo después por job_id.
+
+Limitaciones (a propósito, sin broker externo):
+- El estado vive en el proceso: GET /jobs/status/{job_id} debe llegar al
+  mismo worker que aceptó el job; en otro worker responde 404.
+- Si el proceso se reinicia, los jobs en curso se pierden (el job mensual
+  se recupera con check_and_run_missed_job).
+
+Coalescing: los jobs con `key` no se duplican. Si ya hay uno en curso con la
+misma key, submit_job() lanza JobAlreadyRunning con el job_id existente (el
+endpoint responde 409). exclusive(key) aplica la misma regla a trabajos que
+corren dentro de la request.
+
+Uso:
+    job_id = submit_job("generate_monthly_classes", lambda db: generate_monthly_classes(db), key="monthly")
+    job = get_job(job_id)  # {"status": "running", ...}
+"""
+
+import asyncio
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# Máximo de jobs recordados (se descartan primero los más antiguos ya terminados)
+MAX_TRACKED_JOBS = 100
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+_jobs: dict[str, dict[str, Any]] = {}
+
+# Referencias fuertes a las tareas en curso (asyncio solo guarda referencias débiles)
+_tasks: set[asyncio.Task] = set()
+
+# key → job_id (o None si corre dentro de una request) de los trabajos en curso
+_active_keys: dict[str, str | None] = {}
+
+# Key de coalescing del job mensual (recorre todos los enrollments: uno a la vez).
+# La comparten los endpoints de /jobs y el scheduler (cron y job perdido).
+MONTHLY_JOB_KEY = "jobs:monthly:global"
+
+
+class JobAlreadyRunning(Exception):
+    """Ya hay un trabajo en curso con la misma key."""
+
+    def __init__(self, key: str, job_id: str | None = None):
+        self.key = key
+        self.job_id = job_id
+        super().__init__(f"Ya hay un job en curso para '{key}'")
+
+
+def _prune_jobs() -> None:
+    """Descarta los jobs terminados más antiguos si se supera MAX_TRACKED_JOBS."""
+    while len(_jobs) > MAX_TRACKED_JOBS:
+        finished = next(
+            (job_id for job_id, job in _jobs.items() if job["status"] in (JOB_COMPLETED, JOB_FAILED)),
+            None
+        )
+        if finished is None:
+            break
+        _jobs.pop(finished, None)
+
+
+def claim_key(key: str, job_id: str | None = None) -> None:
+    """
+    Reserva una key de coalescing.
+
+    Args:
+        key: Clave del trabajo
+        job_id: Job en segundo plano asociado (None si corre dentro de la request)
+
+    Raises:
+        JobAlreadyRunning: Si la key ya está tomada
+    """
+    if key in _active_keys:
+        raise JobAlreadyRunning(key, _active_keys[key])
+    _active_keys[key] = job_id
+
+
+def ensure_key_free(key: str) -> None:
+    """
+    Verifica que no haya un trabajo en curso con `key`, sin reservarla.
+
+    Args:
+        key: Clave de coalescing
+
+    Raises:
+        JobAlreadyRunning: Si la key ya está tomada
+    """
+    if key in _active_keys:
+        raise JobAlreadyRunning(key, _active_keys[key])
+
+
+def release_key(key: str) -> None:
+    """Libera una key tomada con claim_key() (idempotente)."""
+    _active_keys.pop(key, None)
+
+
+async def _run_job(job_id: str, job_fn: Callable[[AsyncSession], Awaitable[Any]]) -> None:
+    """Ejecuta el job con una sesión propia y registra el resultado."""
+    job = _jobs[job_id]
+    job["status"] = JOB_RUNNING
+    job["started_at"] = datetime.now(timezone.utc)
+
+    try:
+        async with async_session_maker() as db:
+            job["result"] = await job_fn(db)
+        job["status"] = JOB_COMPLETED
+    except Exception as e:
+        logger.exception("job %s (%s) falló", job_id, job["name"])
+        job["status"] = JOB_FAILED
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = datetime.now(timezone.utc)
+        if job["key"] is not None:
+            release_key(job["key"])
+
+
+def submit_job(
+    name: str,
+    job_fn: Callable[[AsyncSession], Awaitable[Any]],
+    key: str | None = None
+) -> str:
+    """
+    Lanza un job en segundo plano.
+
+    Args:
+        name: Nombre del job (para logs y consulta de estado)
+        job_fn: Función async que recibe la sesión propia del job y devuelve su resultado
+        key: Clave de coalescing (opcional); no puede haber dos jobs en curso con la misma
+
+    Returns:
+        job_id para consultar el estado con get_job()
+
+    Raises:
+        JobAlreadyRunning: Si ya hay un job en curso con la misma key
+    """
+    job_id = uuid.uuid4().hex
+    if key is not None:
+        claim_key(key, job_id)
+
+    _jobs[job_id] = {
+        "job_id": job_id,
+        "name": name,
+        "key": key,
+        "status": JOB_QUEUED,
+        "created_at": datetime.now(timezone.utc),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+    }
+    _prune_jobs()
+
+    task = asyncio.create_task(_run_job(job_id, job_fn), name=f"job:{name}:{job_id}")
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+    return job_id
+
+
+def get_job(job_id: str) -> dict[str, Any] | None:
+    """
+    Estado de un job lanzado con submit_job().
+
+    Args:
+        job_id: ID devuelto por submit_job()
+
+    Returns:
+        dict con job_id, name, status, timestamps, result y error; None si no se conoce
+    """
+    return _jobs.get(job_id)
+
+
+@asynccontextmanager
+async def exclusive(key: str) -> AsyncIterator[None]:
+    """
+    Ejecuta un bloque como trabajo exclusivo para `key` (dentro de la request).
+
+    Args:
+        key: Clave de coalescing compartida con submit_job()
+
+    Raises:
+        JobAlreadyRunning: Si ya hay un trabajo en curso con la misma key
+    """
+    claim_key(key)
+    try:
+        yield
+    finally:
+        release_key(key)
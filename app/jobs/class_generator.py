@@ -23,6 +23,7 @@ FUNCIONES PRINCIPALES:
 """
 
 import logging
+from collections.abc import AsyncIterator
 from datetime import date, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, update, delete, insert
@@ -37,6 +38,26 @@ from sqlalchemy import exists
 
 logger = logging.getLogger(__name__)
 
+# Enrollments leídos por consulta en el job mensual (keyset por id)
+MONTHLY_JOB_BATCH_SIZE = 500
+
+# Desde cuántas clases nuevas se insertan con COPY en lugar de INSERT multi-fila
+CLASS_COPY_MIN_ROWS = 100
+
+# Columnas cargadas por COPY (el resto toma su server_default: timestamps, partial_sessions)
+_CLASS_COPY_COLUMNS = (
+    "schedule_id",
+    "enrollment_id",
+    "teacher_id",
+    "date",
+    "time",
+    "duration",
+    "status",
+    "type",
+    "format",
+    "room_id",
+)
+
 
 # ============================================
 # MAPEO DE DÍAS DE LA SEMANA
@@ -89,7 +110,8 @@ async def generate_classes_for_enrollment(
     db: AsyncSession,
     enrollment_id: int,
     months_ahead: int = 2,
-    from_date: date | None = None
+    from_date: date | None = None,
+    commit: bool = True
 ) -> dict:
     """
     Genera clases para una inscripción específica.
@@ -106,6 +128,7 @@ async def generate_classes_for_enrollment(
         enrollment_id: ID de la inscripción
         months_ahead: Cuántos meses completos adicionales generar (default: 2)
         from_date: Fecha desde la cual generar (default: hoy)
+        commit: Si False, no hace commit (la transacción la maneja el llamador)
 
     Returns:
         dict: Estadísticas de generación
@@ -157,12 +180,21 @@ async def generate_classes_for_enrollment(
 
     stats = {"created": 0, "skipped": 0, "errors": [], "schedules_processed": 0}
 
-    # Para cada Schedule, generar clases
+    # Para cada Schedule, calcular las clases nuevas; se insertan todas juntas
+    pending_rows = []
+    pending_keys = set()
     for schedule in schedules:
         result = await _generate_classes_for_schedule(
             db, schedule, enrollment, months_ahead, from_date
         )
-        stats["created"] += result["created"]
+        for row in result["rows"]:
+            # Dos horarios del mismo enrollment pueden caer en la misma fecha/hora
+            key = (row['date'], row['time'], row['type'])
+            if key in pending_keys:
+                stats["skipped"] += 1
+                continue
+            pending_keys.add(key)
+            pending_rows.append(row)
         stats["skipped"] += result["skipped"]
         stats["errors"].extend(result["errors"])
         stats["schedules_processed"] += 1
@@ -170,7 +202,15 @@ async def generate_classes_for_enrollment(
         if "date_range" not in stats and "date_range" in result:
             stats["date_range"] = result["date_range"]
 
-    await db.commit()
+    if pending_rows:
+        try:
+            await _insert_classes(db, pending_rows)
+            stats["created"] = len(pending_rows)
+        except Exception as e:
+            stats["errors"].append(f"Error al insertar clases: {str(e)}")
+
+    if commit:
+        await db.commit()
     return stats
 
 
@@ -196,9 +236,10 @@ async def _generate_classes_for_schedule(
         from_date: Fecha base desde la cual calcular
 
     Returns:
-        dict: Estadísticas {created, skipped, errors, date_range}
+        dict: {rows, skipped, errors, date_range}; rows son las clases nuevas
+        (aún sin insertar, las inserta generate_classes_for_enrollment)
     """
-    stats = {"created": 0, "skipped": 0, "errors": []}
+    stats = {"rows": [], "skipped": 0, "errors": []}
 
     # BUG FIX: Respetar valid_from del schedule.
     # Si el alumno se inscribió DESPUÉS de from_date, no generar clases
@@ -293,45 +334,157 @@ async def _generate_classes_for_schedule(
           ]
           
           stats["skipped"] += len(classes_to_insert) - len(new_classes)
-          
-          if new_classes:
-            await db.execute(insert(Class).values(new_classes))
-            stats["created"] = len(new_classes)
+          stats["rows"] = new_classes
             
         except Exception as e:
-          stats["errors"].append(f"Error al insertar clases: {str(e)}")
+          stats["errors"].append(f"Error al verificar clases existentes: {str(e)}")
 
     return stats
 
 
+async def _insert_classes(db: AsyncSession, rows: list[dict]) -> None:
+    """
+    Inserta clases generadas en la transacción de la sesión.
+
+    Lotes chicos van por un INSERT multi-fila; desde CLASS_COPY_MIN_ROWS se usa
+    COPY (copy_records_to_table de asyncpg), que valida y escribe todas las
+    filas en una sola operación.
+
+    Args:
+        db: Sesión de base de datos
+        rows: Clases a insertar (dicts con las columnas de _CLASS_COPY_COLUMNS)
+    """
+    if len(rows) < CLASS_COPY_MIN_ROWS:
+        await db.execute(insert(Class).values(rows))
+        return
+
+    # Los enums son VARCHAR (native_enum=False): COPY recibe su valor en texto
+    records = [
+        (
+            row['schedule_id'],
+            row['enrollment_id'],
+            row['teacher_id'],
+            row['date'],
+            row['time'],
+            row['duration'],
+            row['status'].value,
+            row['type'].value,
+            row['format'].value,
+            row['room_id'],
+        )
+        for row in rows
+    ]
+
+    # Misma conexión (y transacción) que la sesión
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        Class.__tablename__,
+        records=records,
+        columns=_CLASS_COPY_COLUMNS,
+    )
+
+
 # ============================================
 # JOB MENSUAL AUTOMÁTICO
 # ============================================
 
-async def generate_monthly_classes(db: AsyncSession, from_date: date | None = None) -> dict:
+async def iter_monthly_generation(
+    db: AsyncSession,
+    from_date: date | None = None
+) -> AsyncIterator[tuple[int, dict]]:
     """
-    Job mensual: Genera clases para todos los enrollments activos.
+    Generación mensual enrollment por enrollment (generador async).
+
+    Produce el resultado de cada enrollment apenas termina, para poder
+    reportar progreso sin acumular nada: solo se leen los IDs de los
+    enrollments activos (generate_classes_for_enrollment carga cada uno).
+
+    Los IDs se leen en lotes de MONTHLY_JOB_BATCH_SIZE por keyset
+    (id > último ORDER BY id), no todos de una vez: memoria acotada y cada
+    lote es un range scan del índice parcial de activos. No se usa un cursor
+    de servidor porque generate_classes_for_enrollment hace commit por
+    enrollment y eso cerraría el cursor.
 
     Args:
         db: Sesión de base de datos
-        from_date: Fecha desde la cual generar (default: hoy).
-                   Pasar date.today().replace(day=1) para backfill desde inicio de mes.
+        from_date: Fecha desde la cual generar (default: hoy)
 
-    Returns:
-        dict: Estadísticas de generación
+    Yields:
+        Tupla (enrollment_id, resultado de generate_classes_for_enrollment)
     """
     if from_date is None:
         from_date = date.today()
 
-    result = await db.execute(
-        select(Enrollment).where(
-            Enrollment.status == EnrollmentStatus.ACTIVE
+    logger.info(f"generate_monthly_classes: procesando enrollments activos desde {from_date}")
+
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(Enrollment.id)
+            .where(
+                Enrollment.status == EnrollmentStatus.ACTIVE,
+                Enrollment.id > last_id
+            )
+            .order_by(Enrollment.id)
+            .limit(MONTHLY_JOB_BATCH_SIZE)
         )
-    )
-    enrollments = result.scalars().all()
+        enrollment_ids = result.scalars().all()
+        if not enrollment_ids:
+            break
+        last_id = enrollment_ids[-1]
+
+        for enrollment_id in enrollment_ids:
+            result = await generate_classes_for_enrollment(
+                db,
+                enrollment_id,
+                months_ahead=2,
+                from_date=from_date
+            )
+
+            if "error" not in result:
+                logger.info(f"generate_monthly_classes: enrollment {enrollment_id} -> created {result['created']} skipped {result['skipped']}")
+            else:
+                logger.warning(f"generate_monthly_classes: enrollment {enrollment_id} error {result['error']}")
+
+            yield enrollment_id, result
+
+        if len(enrollment_ids) < MONTHLY_JOB_BATCH_SIZE:
+            break
+
+
+def accumulate_generation_stats(total_stats: dict, enrollment_id: int, result: dict) -> None:
+    """
+    Suma el resultado de un enrollment a las estadísticas del job mensual.
+
+    Args:
+        total_stats: Estadísticas acumuladas (se modifica en el lugar)
+        enrollment_id: ID del enrollment procesado
+        result: Resultado de generate_classes_for_enrollment
+    """
+    if "error" not in result:
+        total_stats["created"] += result["created"]
+        total_stats["skipped"] += result["skipped"]
+        total_stats["errors"].extend(result.get("errors", []))
+        total_stats["enrollments_processed"] += 1
+    else:
+        total_stats["errors"].append(
+            f"Enrollment {enrollment_id}: {result['error']}"
+        )
+
 
-    logger.info(f"generate_monthly_classes: procesando {len(enrollments)} enrollments desde {from_date}")
+async def generate_monthly_classes(db: AsyncSession, from_date: date | None = None) -> dict:
+    """
+    Job mensual: Genera clases para todos los enrollments activos.
 
+    Args:
+        db: Sesión de base de datos
+        from_date: Fecha desde la cual generar (default: hoy).
+                   Pasar date.today().replace(day=1) para backfill desde inicio de mes.
+
+    Returns:
+        dict: Estadísticas de generación
+    """
     total_stats = {
         "created": 0,
         "skipped": 0,
@@ -339,25 +492,8 @@ async def generate_monthly_classes(db: AsyncSession, from_date: date | None = No
         "errors": []
     }
 
-    for enrollment in enrollments:
-        result = await generate_classes_for_enrollment(
-            db,
-            enrollment.id,
-            months_ahead=2,
-            from_date=from_date
-        )
-
-        if "error" not in result:
-            total_stats["created"] += result["created"]
-            total_stats["skipped"] += result["skipped"]
-            total_stats["errors"].extend(result.get("errors", []))
-            total_stats["enrollments_processed"] += 1
-            logger.info(f"generate_monthly_classes: enrollment {enrollment.id} -> created {result['created']} skipped {result['skipped']}")
-        else:
-            total_stats["errors"].append(
-                f"Enrollment {enrollment.id}: {result['error']}"
-            )
-            logger.warning(f"generate_monthly_classes: enrollment {enrollment.id} error {result['error']}")
+    async for enrollment_id, result in iter_monthly_generation(db, from_date):
+        accumulate_generation_stats(total_stats, enrollment_id, result)
 
     await db.commit()
     return total_stats
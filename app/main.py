@@ -17,6 +17,10 @@ Arquitectura:
 
 Para iniciar el servidor:
     uvicorn app.main:app --reload
+
+En producción (uvloop + httptools, ver requirements.txt):
+    uvicorn app.main:app --loop uvloop --http httptools --workers N
+    # o con gunicorn: UvicornWorker los selecciona solo (loop/http = "auto")
     
 Para crear las tablas:
     python -m app.core.init_db
@@ -24,8 +28,10 @@ Para crear las tablas:
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from slowapi.errors import RateLimitExceeded
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 import logging
@@ -41,9 +47,16 @@ class WsTokenFilter(logging.Filter):
 for logger_name in ["uvicorn.access", "uvicorn.error", "websockets.server", "gunicorn.access"]:
     logging.getLogger(logger_name).addFilter(WsTokenFilter())
 
+logger = logging.getLogger(__name__)
+
 from app.core.config import settings
+from app.core.logging import setup_app_logging, shutdown_app_logging
+
+# Loggers del scheduler e init_db: escritura a stderr en un hilo aparte
+setup_app_logging()
+from app.core.database import async_session_maker
 from app.core.scheduler import start_scheduler, shutdown_scheduler, check_and_run_missed_job
-from app.core.security import should_refresh_token, refresh_access_token
+from app.core.security import decode_token, should_refresh_token_from_payload, refresh_access_token
 
 # ========================================
 # IMPORTAR ROUTERS
@@ -129,10 +142,15 @@ class TokenRefreshMiddleware(BaseHTTPMiddleware):
                 token = auth_header.replace("Bearer ", "")
 
                 try:
+                    # Payload ya verificado por la dependency de auth
+                    # (request.state.jwt_payload); solo se decodifica si
+                    # el endpoint no era autenticado
+                    payload = decode_token(token, request)
+
                     # Verificar si el token debe ser refrescado
-                    if should_refresh_token(token):
+                    if should_refresh_token_from_payload(payload):
                         # Emitir nuevo token
-                        new_token = refresh_access_token(token)
+                        new_token = refresh_access_token(token, request)
 
                         # Añadir header con nuevo token
                         response.headers["X-New-Token"] = new_token
@@ -145,6 +163,25 @@ class TokenRefreshMiddleware(BaseHTTPMiddleware):
         return response
 
 
+# ========================================
+# MIDDLEWARE DE SESIÓN DE BD POR REQUEST
+# ========================================
+
+class DBSessionMiddleware(BaseHTTPMiddleware):
+    """
+    Abre una AsyncSession por request en request.state.db (get_request_db).
+
+    La sesión se cierra en cuanto el handler devuelve la respuesta, sin
+    esperar a la finalización de dependencias de FastAPI. Crear la sesión no
+    toma conexión: solo se pide al pool en el primer query.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        async with async_session_maker() as session:
+            request.state.db = session
+            return await call_next(request)
+
+
 # ========================================
 # CREAR APLICACIÓN FASTAPI
 # ========================================
@@ -161,6 +198,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url=_docs_url,
     redoc_url=_redoc_url,
+    # orjson para todas las respuestas JSON (los routers que no fijan su propia
+    # clase heredan esta): serialización en C, date/datetime nativos
+    default_response_class=ORJSONResponse,
 )
 
 # Registrar rate limiter en la app
@@ -173,6 +213,14 @@ app.add_exception_handler(
     ),
 )
 
+# ========================================
+# SESIÓN DE BD POR REQUEST
+# ========================================
+
+# Se agrega primero para que sea el middleware más interno: la sesión vive
+# solo lo que dura el handler
+app.add_middleware(DBSessionMiddleware)
+
 # ========================================
 # CONFIGURAR CORS
 # ========================================
@@ -183,7 +231,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-New-Token"],
+    expose_headers=["X-New-Token", "X-Next-Cursor"],
 )
 
 # ========================================
@@ -193,6 +241,18 @@ app.add_middleware(
 # IMPORTANTE: Debe ir DESPUÉS de CORS para que el header X-New-Token sea accesible
 app.add_middleware(TokenRefreshMiddleware)
 
+# ========================================
+# COMPRESIÓN DE RESPUESTAS
+# ========================================
+
+# Se agrega al final para que sea el middleware más externo y comprima la
+# respuesta ya completa. El calendario mensual y el sync devuelven JSON muy
+# repetitivo (se reduce ~5-10x); por debajo de 500 bytes no compensa.
+# compresslevel=6 (Starlette usa 9 por defecto): en payloads grandes como
+# /sync/initial el nivel 9 cuesta bastante más CPU para ganar ~1-2% de tamaño.
+# GZipMiddleware ya agrega `Vary: Accept-Encoding`.
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
+
 # ========================================
 # EVENTOS DE CICLO DE VIDA
 # ========================================
@@ -242,6 +302,14 @@ async def startup_event():
 
     if not _db_ready:
         print(">> Warmup no completado — Neon despertará con la primera request")
+    else:
+        # Llenar el pool antes de arrancar scheduler y tráfico
+        try:
+            from app.core.database import warm_up_pool
+            opened = await warm_up_pool()
+            print(f">> Pool de conexiones precargado ({opened} conexiones)")
+        except Exception as e:
+            print(f">> Precarga del pool fallida: {e}")
 
     # Crear tablas faltantes (JobRunLog)
     try:
@@ -274,6 +342,7 @@ async def startup_event():
 async def shutdown_event():
     print(">> Cerrando ProfesorSYS API...")
     shutdown_scheduler()
+    shutdown_app_logging()
 
 
 # ========================================
@@ -296,6 +365,27 @@ async def health_check():
     return {"status": "ok"}
 
 
+if settings.ENVIRONMENT != "production":
+    @app.get("/health/db-pool", tags=["Health"])
+    async def db_pool_status():
+        """Estado de los pools de conexiones (solo fuera de producción).
+        Sirve para dimensionar DB_POOL_SIZE / DB_MAX_OVERFLOW bajo carga."""
+        from app.core.database import engine, engine_ro
+
+        pools = {"primary": engine.pool}
+        if engine_ro is not engine:
+            pools["replica"] = engine_ro.pool
+        # pool.status() es texto; con NullPool (PgBouncer) no hay contadores
+        return {
+            name: {
+                "status": pool.status(),
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            }
+            for name, pool in pools.items()
+        }
+
+
 # ========================================
 # INCLUIR ROUTERS (API v1)
 # ========================================
@@ -329,6 +419,21 @@ async def not_found_handler(request: Request, exc):
     })
 
 
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Pool de conexiones agotado (pool_timeout): 503 para que el cliente
+    # reintente, en lugar de un 500 genérico
+    logger.warning(f"Pool de BD agotado en {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "Service Unavailable",
+            "message": "El servidor está ocupado, intenta de nuevo en unos segundos",
+        },
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc):
     return JSONResponse(status_code=500, content={
@@ -86,6 +86,7 @@ from .attendance import (
 from .suspension_history import SuspensionHistory
 from .security_log import SecurityLog
 from .job_run_log import JobRunLog
+from .teacher_sync_version import TeacherSyncVersion
 
 # ========================================
 # MODELOS FINANCIEROS
@@ -151,6 +152,7 @@ __all__ = [
     "SuspensionHistory",
     "SecurityLog",
     "JobRunLog",
+    "TeacherSyncVersion",
     
     # Modelos Financieros
     "FeeDiscount",
@@ -21,7 +21,7 @@ Estados de asistencia:
 - license: Alumno pidió licencia (justificada, genera crédito)
 """
 
-from sqlalchemy import String, Integer, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import String, Integer, ForeignKey, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 import enum
@@ -56,6 +56,7 @@ class Attendance(Base, TimestampMixin):
     Atributos principales:
         id: Identificador único del registro de asistencia
         class_id: FK a la clase (UNIQUE, relación 1:1)
+        teacher_id: FK al profesor (copia de class.teacher_id, evita JOIN en sync)
         status: Estado de asistencia (present, absent, license)
         notes: Notas opcionales sobre la asistencia
         
@@ -117,6 +118,13 @@ class Attendance(Base, TimestampMixin):
         index=True,
         comment="ID de la clase (relación 1:1)"
     )
+
+    teacher_id: Mapped[int] = mapped_column(
+        ForeignKey("teachers.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="ID del profesor (redundante con la clase, evita el JOIN en sync)"
+    )
     
     status: Mapped[AttendanceStatus] = mapped_column(
         SQLEnum(AttendanceStatus, native_enum=False, values_callable=lambda x: [e.value for e in x]),
@@ -151,6 +159,15 @@ class Attendance(Base, TimestampMixin):
         lazy="selectin"
     )
 
+    # ========================================
+    # ÍNDICES
+    # ========================================
+
+    __table_args__ = (
+        # Sync delta: WHERE teacher_id = ? AND updated_at > ? (migración 022)
+        Index("ix_attendances_teacher_updated", "teacher_id", "updated_at"),
+    )
+
     def __repr__(self) -> str:
         """Representación string del objeto para debugging"""
         return f"<Attendance(id={self.id}, class_id={self.class_id}, status='{self.status}')>"
\ No newline at end of file
@@ -36,7 +36,7 @@ Formatos:
 """
 
 from datetime import date as dt_date, time as dt_time
-from sqlalchemy import Integer, Date, Time, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Integer, Date, Time, ForeignKey, Enum as SQLEnum, JSON, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, TYPE_CHECKING
 import enum
@@ -161,6 +161,21 @@ class Class(Base, TimestampMixin):
     """
     __tablename__ = "classes"
 
+    __table_args__ = (
+        # Calendario (teacher + rango de fechas ordenado por fecha/hora) y listado
+        # paginado (mismo índice recorrido hacia atrás para ORDER BY date DESC, time DESC)
+        Index("ix_classes_teacher_date_time", "teacher_id", "date", "time"),
+        # Borrado de clases futuras programadas de un horario (jobs); migración 019
+        Index(
+            "ix_classes_scheduled_schedule_date",
+            "schedule_id",
+            "date",
+            postgresql_where=text("status = 'scheduled'")
+        ),
+        # Sync delta: WHERE teacher_id = ? AND updated_at > ? (migración 021)
+        Index("ix_classes_teacher_updated", "teacher_id", "updated_at"),
+    )
+
     # ========================================
     # CAMPOS PRINCIPALES
     # ========================================
@@ -23,7 +23,7 @@ Tipos de referencia (reference_type):
 """
 
 from datetime import datetime
-from sqlalchemy import String, Integer, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import String, Integer, ForeignKey, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING, Optional
 import enum
@@ -206,6 +206,15 @@ class CreditTransaction(Base, TimestampMixin):
         lazy="selectin"
     )
 
+    # ========================================
+    # ÍNDICES
+    # ========================================
+
+    __table_args__ = (
+        # Sync delta: WHERE enrollment_id IN (...) AND updated_at > ? (migración 021)
+        Index("ix_credit_transactions_enrollment_updated", "enrollment_id", "updated_at"),
+    )
+
     def __repr__(self) -> str:
         """Representación string del objeto para debugging"""
         return (
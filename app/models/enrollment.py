@@ -32,7 +32,7 @@ Estados posibles:
 
 from datetime import date
 from decimal import Decimal
-from sqlalchemy import String, Integer, Date, Enum as SQLEnum, ForeignKey, CheckConstraint, UniqueConstraint, ARRAY, JSON, Numeric
+from sqlalchemy import String, Integer, Date, Enum as SQLEnum, ForeignKey, CheckConstraint, UniqueConstraint, ARRAY, JSON, Numeric, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, TYPE_CHECKING
 import enum
@@ -359,6 +359,18 @@ class Enrollment(Base, TimestampMixin):
             'instrument_id', 
             name='uq_student_instrument'
         ),
+        # Listado paginado por cursor: WHERE teacher_id = ? ORDER BY created_at DESC, id DESC
+        # (el índice se recorre hacia atrás)
+        Index("ix_enrollments_teacher_created_id", "teacher_id", "created_at", "id"),
+        # Solo activos: recorrido del job mensual y listados de activos por profesor
+        Index(
+            "ix_enrollments_active_teacher_id",
+            "teacher_id",
+            "id",
+            postgresql_where=text("status = 'active'")
+        ),
+        # Sync delta: WHERE teacher_id = ? AND updated_at > ? (migración 021)
+        Index("ix_enrollments_teacher_updated", "teacher_id", "updated_at"),
     )
 
     def __repr__(self) -> str:
@@ -17,7 +17,7 @@ from decimal import Decimal
 # pyrefly: ignore [missing-import]
 from sqlalchemy import (
     String, Text, Date, DateTime, Boolean, Enum as SQLEnum,
-    ForeignKey, CheckConstraint, Numeric, Integer
+    ForeignKey, CheckConstraint, Numeric, Integer, Index
 )
 # pyrefly: ignore [missing-import]
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -82,6 +82,8 @@ class EnrollmentNote(Base, TimestampMixin):
             "score IS NULL OR (score >= 0 AND score <= 100)",
             name="check_note_score_range",
         ),
+        # Sync delta: WHERE teacher_id = ? AND updated_at > ? (migración 021)
+        Index("ix_enrollment_notes_teacher_updated", "teacher_id", "updated_at"),
     )
 
     def __repr__(self) -> str:
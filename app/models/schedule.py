@@ -30,7 +30,7 @@ Cambio de horario:
 """
 
 from datetime import date as dt_date, time as dt_time
-from sqlalchemy import Integer, Date, Time, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Integer, Date, Time, Boolean, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, Optional, TYPE_CHECKING
 import enum
@@ -238,6 +238,18 @@ class Schedule(Base, TimestampMixin):
         lazy="selectin"
     )
 
+    # ========================================
+    # ÍNDICES
+    # ========================================
+
+    __table_args__ = (
+        # Listado del profesor: WHERE teacher_id = ? ORDER BY day, time
+        # (y validación de slots: WHERE teacher_id = ? AND day = ?)
+        Index("ix_schedules_teacher_day_time", "teacher_id", "day", "time"),
+        # Sync delta: WHERE teacher_id = ? AND updated_at > ? (migración 021)
+        Index("ix_schedules_teacher_updated", "teacher_id", "updated_at"),
+    )
+
     def __repr__(self) -> str:
         """Representación string del objeto para debugging"""
         return f"<Schedule(id={self.id}, day='{self.day}', time={self.time}, enrollment_id={self.enrollment_id})>"
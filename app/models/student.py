@@ -26,7 +26,7 @@ Arquitectura:
 """
 
 from datetime import date
-from sqlalchemy import String, Integer, Date, ForeignKey, Text, Boolean
+from sqlalchemy import String, Integer, Date, ForeignKey, Text, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, TYPE_CHECKING
 
@@ -181,6 +181,23 @@ class Student(Base, TimestampMixin):
         lazy="noload"
     )
 
+    # ========================================
+    # ÍNDICES
+    # ========================================
+
+    __table_args__ = (
+        # Listado de activos: WHERE teacher_id = ? AND active ORDER BY name
+        # (parcial: los alumnos dados de baja nunca se listan)
+        Index(
+            "ix_students_active_teacher_name",
+            "teacher_id",
+            "name",
+            postgresql_where=text("active = true")
+        ),
+        # Sync delta: WHERE teacher_id = ? AND updated_at > ? (migración 021)
+        Index("ix_students_teacher_updated", "teacher_id", "updated_at"),
+    )
+
     def __repr__(self) -> str:
         """Representación string del objeto para debugging"""
         return f"<Student(id={self.id}, name='{self.name}', teacher_id={self.teacher_id})>"
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Modelo TeacherSyncVersion - Versión de los datos de sync por profesor
+
+Contador por (profesor, entidad) que incrementan triggers de PostgreSQL en
+cada INSERT/UPDATE/DELETE de las tablas que viajan en /sync (migración 023;
+en una BD creada con create_all / init_db los instala el listener
+after_create de este módulo). La aplicación solo lo lee:
+- /sync/delta: ETag → 304 Not Modified si no cambió nada desde el último poll
+"""
+
+from datetime import datetime
+from sqlalchemy import DDL, String, BigInteger, DateTime, ForeignKey, event, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class TeacherSyncVersion(Base):
+    """
+    Versión de una entidad del sync para un profesor.
+
+    Campos:
+    - teacher_id + entity: PK (entity = clave del payload de sync, ej: 'classes')
+    - version: se incrementa en cada cambio (solo crece)
+    - updated_at: momento del último cambio
+    """
+
+    __tablename__ = "teacher_sync_versions"
+
+    teacher_id: Mapped[int] = mapped_column(
+        ForeignKey("teachers.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="ID del profesor"
+    )
+
+    entity: Mapped[str] = mapped_column(
+        String(50),
+        primary_key=True,
+        comment="Entidad del sync (students, enrollments, schedules, classes, ...)"
+    )
+
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        comment="Contador de cambios (lo incrementa el trigger)"
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="Fecha del último cambio"
+    )
+
+    def __repr__(self) -> str:
+        """Representación string del objeto para debugging"""
+        return f"<TeacherSyncVersion(teacher_id={self.teacher_id}, entity='{self.entity}', version={self.version})>"
+
+
+# ========================================
+# TRIGGERS (create_all)
+# ========================================
+
+# Mismas funciones y triggers que migrations/023_add_teacher_sync_versions.sql.
+# Sin ellos la tabla existe pero las versiones quedan en 0 y el ETag de
+# /sync/delta no cambia nunca. Una sentencia por elemento: asyncpg no
+# ejecuta varias sentencias en un mismo execute con el dialecto.
+_SYNC_VERSION_FUNCTIONS = (
+    """
+    CREATE OR REPLACE FUNCTION _bump_sync_version(p_teacher_id INTEGER, p_entity TEXT)
+    RETURNS VOID AS $$
+    BEGIN
+        IF p_teacher_id IS NULL THEN
+            RETURN;
+        END IF;
+        INSERT INTO teacher_sync_versions AS v (teacher_id, entity, version, updated_at)
+        VALUES (p_teacher_id, p_entity, 1, NOW())
+        ON CONFLICT (teacher_id, entity)
+        DO UPDATE SET version = v.version + 1, updated_at = NOW();
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_teacher_sync_version()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM _bump_sync_version(NEW.teacher_id, TG_ARGV[0]);
+        END IF;
+        IF TG_OP = 'DELETE'
+           OR (TG_OP = 'UPDATE' AND OLD.teacher_id IS DISTINCT FROM NEW.teacher_id) THEN
+            PERFORM _bump_sync_version(OLD.teacher_id, TG_ARGV[0]);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_teacher_sync_version_credit_tx()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        v_enrollment_id INTEGER;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            v_enrollment_id := OLD.enrollment_id;
+        ELSE
+            v_enrollment_id := NEW.enrollment_id;
+        END IF;
+        PERFORM _bump_sync_version(
+            (SELECT teacher_id FROM enrollments WHERE id = v_enrollment_id),
+            'credit_transactions'
+        );
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+)
+
+# (tabla, entidad del sync, función del trigger)
+_SYNC_VERSION_TRIGGERS = (
+    ("students", "students", "bump_teacher_sync_version('students')"),
+    ("enrollments", "enrollments", "bump_teacher_sync_version('enrollments')"),
+    ("schedules", "schedules", "bump_teacher_sync_version('schedules')"),
+    ("classes", "classes", "bump_teacher_sync_version('classes')"),
+    ("attendances", "attendances", "bump_teacher_sync_version('attendances')"),
+    ("enrollment_notes", "notes", "bump_teacher_sync_version('notes')"),
+    ("credit_transactions", "credit_transactions", "bump_teacher_sync_version_credit_tx()"),
+)
+
+
+def _install_sync_version_triggers(target, connection, **kw) -> None:
+    """
+    Listener after_create de la metadata: instala funciones y triggers.
+
+    Se engancha a la metadata (no a la tabla) para correr cuando ya existen
+    todas las tablas con trigger. Solo actúa si create_all creó
+    teacher_sync_versions en esta llamada; en una BD existente los trae la
+    migración 023.
+    """
+    tables = kw.get("tables")
+    if tables is not None and TeacherSyncVersion.__table__ not in tables:
+        return
+
+    for statement in _SYNC_VERSION_FUNCTIONS:
+        connection.execute(DDL(statement))
+
+    for table, entity, function in _SYNC_VERSION_TRIGGERS:
+        trigger = f"trg_sync_version_{entity}"
+        connection.execute(DDL(f"DROP TRIGGER IF EXISTS {trigger} ON {table}"))
+        connection.execute(DDL(
+            f"CREATE TRIGGER {trigger} "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function}"
+        ))
+
+
+event.listen(Base.metadata, "after_create", _install_sync_version_triggers)
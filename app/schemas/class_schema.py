@@ -20,7 +20,7 @@ ENUMS:
 """
 from typing import Optional, List
 from datetime import date as dt_date, datetime, time as dt_time
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
 # Importar enums desde los modelos
 from app.models.class_model import ClassStatus, ClassType, ClassFormat
@@ -177,4 +177,20 @@ class ClassResponse(ClassBase):
     attendance: AttendanceNested | None = None
 
     # Permite leer desde objetos SQLAlchemy
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# Adapter precompilado para validar/serializar listas completas en una sola pasada
+# (en lugar de validar elemento por elemento). Leer desde objetos SQLAlchemy con
+# validate_python(..., from_attributes=True) y serializar con dump_json().
+CLASS_LIST_ADAPTER = TypeAdapter(list[ClassResponse])
+
+
+class PaginatedClasses(BaseModel):
+    """
+    Página de clases + total de registros (para UI de paginación)
+
+    - items: clases de la página solicitada
+    - total: total de clases del profesor (sin aplicar skip/limit)
+    """
+    items: List[ClassResponse]
+    total: int = Field(..., ge=0)
@@ -14,7 +14,7 @@ IMPORTANTE:
 from datetime import date, datetime
 from decimal import Decimal
 # pyrefly: ignore [missing-import]
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import Optional, List
 
 # Importar enums desde los modelos
@@ -146,6 +146,32 @@ class EnrollmentSuspendRequest(BaseModel):
     )
 
 
+class EnrollmentBatchSuspendRequest(BaseModel):
+    """
+    Para SUSPENDER varias inscripciones a la vez (POST /enrollments/batch-suspend)
+
+    Mismas acciones que la suspensión individual, en un solo UPDATE:
+    - Cambia status → 'suspended' (solo las que no lo estaban)
+    - Guarda suspended_at con la fecha actual
+    - ELIMINA las clases futuras (scheduled) de las suspendidas
+    """
+    enrollment_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="IDs de las inscripciones a suspender"
+    )
+    reason: Optional[str] = Field(
+        None,
+        max_length=255,
+        description="Motivo de la suspensión (opcional)"
+    )
+    suspended_until: Optional[date] = Field(
+        None,
+        description="Fecha hasta cuándo están suspendidas (opcional)"
+    )
+
+
 class EnrollmentReactivateRequest(BaseModel):
     """
     Para REACTIVAR una inscripción (POST /enrollments/{id}/reactivate)
@@ -176,6 +202,23 @@ class EnrollmentSuspendResponse(BaseModel):
     message: str
 
 
+class EnrollmentBatchSuspendResponse(BaseModel):
+    """Respuesta después de suspender en lote"""
+    suspended_ids: List[int] = Field(
+        ...,
+        description="Inscripciones suspendidas en esta operación"
+    )
+    skipped_ids: List[int] = Field(
+        ...,
+        description="Inscripciones no suspendidas (inexistentes, ajenas o ya suspendidas)"
+    )
+    classes_deleted: int = Field(
+        ...,
+        description="Cantidad de clases futuras eliminadas"
+    )
+    message: str
+
+
 class EnrollmentReactivateResponse(BaseModel):
     """Respuesta después de reactivar"""
     enrollment_id: int
@@ -242,3 +285,10 @@ class EnrollmentResponse(EnrollmentBase):
 
     # Permite leer desde objetos SQLAlchemy
     model_config = ConfigDict(from_attributes=True)
+
+
+# Serializador de listas: una sola validación de la lista completa en pydantic-core
+# (en lugar de que FastAPI valide elemento por elemento contra response_model).
+# Leer desde objetos SQLAlchemy con validate_python(..., from_attributes=True) y
+# serializar con dump_json().
+ENROLLMENT_LIST_ADAPTER = TypeAdapter(list[EnrollmentResponse])
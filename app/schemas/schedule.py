@@ -17,7 +17,7 @@ IMPORTANTE:
 """
 from typing import Optional
 from datetime import date as dt_date, datetime, time as dt_time
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
 # Importar enum desde los modelos
 from app.models.schedule import DayOfWeek
@@ -124,6 +124,12 @@ class ScheduleResponse(ScheduleBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Serializador de listas precompilado (se construye al importar el módulo, no en
+# la primera request): valida la lista completa en una sola pasada con
+# validate_python(..., from_attributes=True) y serializa con dump_json().
+SCHEDULE_LIST_ADAPTER = TypeAdapter(list[ScheduleResponse])
+
+
 class ChangeScheduleRequest(BaseModel):
     """
     Request para cambiar horario de un alumno.
@@ -9,7 +9,7 @@ CONCEPTOS CLAVE:
 - | None: Significa "opcional" (puede ser None/null)
 """
 from datetime import date, datetime, time
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, TypeAdapter
 
 
 class StudentBase(BaseModel):
@@ -91,6 +91,12 @@ class StudentResponse(StudentBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Serializador de listas precompilado (se construye al importar el módulo, no en
+# la primera request): valida la lista completa en una sola pasada con
+# validate_python(..., from_attributes=True) y serializa con dump_json().
+STUDENT_LIST_ADAPTER = TypeAdapter(list[StudentResponse])
+
+
 class StudentHistoryItem(BaseModel):
     """Item de historial de clases para un alumno."""
     class_id: int
@@ -105,4 +111,7 @@ class StudentHistoryItem(BaseModel):
     room_id: int | None = None
     room_name: str | None = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+STUDENT_HISTORY_ADAPTER = TypeAdapter(list[StudentHistoryItem])
@@ -23,13 +23,13 @@ BENEFICIOS:
 
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 # Importar schemas de cada modelo (para reutilizar validaciones)
-from app.schemas.student import StudentResponse
-from app.schemas.enrollment import EnrollmentResponse
-from app.schemas.schedule import ScheduleResponse
-from app.schemas.class_schema import ClassResponse
+from app.schemas.student import StudentResponse, STUDENT_LIST_ADAPTER
+from app.schemas.enrollment import EnrollmentResponse, ENROLLMENT_LIST_ADAPTER
+from app.schemas.schedule import ScheduleResponse, SCHEDULE_LIST_ADAPTER
+from app.schemas.class_schema import ClassResponse, CLASS_LIST_ADAPTER
 from app.schemas.attendance import AttendanceResponse
 from app.schemas.instrument import InstrumentResponse
 from app.schemas.enrollment_note import EnrollmentNoteResponse
@@ -62,6 +62,15 @@ class InitialSyncRequest(BaseModel):
         json_schema_extra={"example": 2025},
     )
 
+    # `versions` recibidas en un /sync/initial previo del MISMO año. Las
+    # entidades cuya versión no cambió se omiten en la respuesta. Descartarlas
+    # si cambia el año o el data_version.
+    known_versions: Optional[Dict[str, int]] = Field(
+        None,
+        description="Versiones por entidad del último sync inicial de este año",
+        json_schema_extra={"example": {"students": 12, "classes": 340}},
+    )
+
 
 # ========================================
 # SCHEMAS DE RESPONSE
@@ -130,9 +139,26 @@ class InitialSyncResponse(BaseModel):
     instruments: List[InstrumentResponse]
     notes: List[EnrollmentNoteResponse]
     credit_transactions: List[CreditTransactionResponse]
+    versions: Dict[str, int] = {}  # Versión actual por entidad (enviar como known_versions)
+    unchanged: List[str] = []  # Entidades omitidas: el cliente conserva las que ya tiene
     data_version: int
     metadata: SyncMetadata
 
+
+# Serializadores por entidad de InitialSyncResponse (mismo orden de campos).
+# /sync/initial arma el JSON por partes (streaming) en lugar de construir el
+# InitialSyncResponse completo; InitialSyncResponse queda para OpenAPI.
+SYNC_INITIAL_ADAPTERS: dict[str, TypeAdapter] = {
+    "students": STUDENT_LIST_ADAPTER,
+    "enrollments": ENROLLMENT_LIST_ADAPTER,
+    "schedules": SCHEDULE_LIST_ADAPTER,
+    "classes": CLASS_LIST_ADAPTER,
+    "attendances": TypeAdapter(list[AttendanceResponse]),
+    "instruments": TypeAdapter(list[InstrumentResponse]),
+    "notes": TypeAdapter(list[EnrollmentNoteResponse]),
+    "credit_transactions": TypeAdapter(list[CreditTransactionResponse]),
+}
+
 class SchedulesDelta(BaseModel):
     active: List[ScheduleResponse]
     deactivated: List[ScheduleResponse]
@@ -160,6 +186,72 @@ class DeltaSyncResponse(BaseModel):
     sync_timestamp: str
 
 
+# ========================================
+# DELTA EN DOS FASES (summary + batch)
+# ========================================
+
+# Máximo de IDs por entidad en un POST /sync/batch
+SYNC_BATCH_MAX_IDS = 1000
+
+
+class EntityVersion(BaseModel):
+    """Versión de un registro: el cliente la compara con su copia local."""
+    id: int
+    updated_at: datetime
+
+
+class DeltaSummaryResponse(BaseModel):
+    """
+    Response de /sync/delta/summary: mismos filtros que el delta, solo
+    (id, updated_at) por registro.
+
+    Los schedules van en una sola lista (activos y desactivados); el estado
+    llega con el cuerpo completo en /sync/batch.
+    """
+    needs_full_sync: bool = False
+    schedules: List[EntityVersion] = []
+    enrollments: List[EntityVersion] = []
+    classes: List[EntityVersion] = []
+    students: List[EntityVersion] = []
+    attendances: List[EntityVersion] = []
+    notes: List[EntityVersion] = []
+    credit_transactions: List[EntityVersion] = []
+    valid_class_ids: List[int] = []
+    valid_attendance_ids: List[int] = []
+    valid_note_ids: List[int] = []
+    sync_timestamp: str
+
+
+class SyncBatchRequest(BaseModel):
+    """
+    Request de /sync/batch: IDs por entidad cuyos cuerpos necesita el cliente.
+
+    Ejemplo:
+    {
+        "classes": [120, 121],
+        "students": [7]
+    }
+    """
+    schedules: List[int] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_IDS)
+    enrollments: List[int] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_IDS)
+    classes: List[int] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_IDS)
+    students: List[int] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_IDS)
+    attendances: List[int] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_IDS)
+    notes: List[int] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_IDS)
+    credit_transactions: List[int] = Field(default_factory=list, max_length=SYNC_BATCH_MAX_IDS)
+
+
+class SyncBatchResponse(BaseModel):
+    """Registros completos pedidos en /sync/batch (solo los del profesor)."""
+    schedules: List[ScheduleResponse] = []
+    enrollments: List[EnrollmentResponse] = []
+    classes: List[ClassResponse] = []
+    students: List[StudentResponse] = []
+    attendances: List[AttendanceResponse] = []
+    notes: List[EnrollmentNoteResponse] = []
+    credit_transactions: List[CreditTransactionResponse] = []
+
+
 class VerifyOperationRequest(BaseModel):
     operation_id: str
     type: Literal[
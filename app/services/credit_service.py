@@ -10,8 +10,9 @@ históricas correspondientes y manejando la concurrencia/idempotencia.
 import hashlib
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import select, text, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.enrollment import Enrollment
 from app.models.credit_transaction import (
     CreditTransaction,
@@ -32,7 +33,7 @@ def _credit_advisory_lock_key(
 
 async def apply(
     db: AsyncSession,
-    enrollment: Enrollment,
+    enrollment: Enrollment | int,
     amount: int,
     source_type: CreditTransactionSource,
     reference_id: int | None = None,
@@ -44,13 +45,17 @@ async def apply(
     """
     Aplica un cambio al balance de créditos de una inscripción.
 
-    Valida que los créditos resultantes no sean negativos. Actualiza el balance en
-    memoria y registra la transacción en el historial. Maneja silenciosamente
+    Valida que los créditos resultantes no sean negativos. Actualiza el balance con
+    un único UPDATE atómico (credits = credits + amount ... RETURNING credits), de modo
+    que dos operaciones concurrentes no pisen el balance, y registra la transacción
+    en el historial. Maneja silenciosamente
     los casos de duplicados mediante la captura de IntegrityError al hacer db.flush().
 
     Args:
         db: Sesión asíncrona de base de datos.
-        enrollment: Inscripción a afectar (debe estar cargada en la sesión).
+        enrollment: Inscripción a afectar (cargada en la sesión), o solo su ID.
+            Con el ID no hace falta el SELECT previo del enrollment: el UPDATE
+            condicional valida el balance igual.
         amount: Cantidad de créditos a sumar (positivo) o restar (negativo).
         source_type: Tipo de origen de la transacción.
         reference_id: ID de la entidad relacionada a la transacción (opcional).
@@ -66,11 +71,16 @@ async def apply(
     Raises:
         ValueError: Si los créditos resultantes son menores a cero.
     """
-    if enrollment.credits + amount < 0:
-        raise ValueError(f"Créditos insuficientes. Balance actual: {enrollment.credits}, cambio solicitado: {amount}")
+    if isinstance(enrollment, Enrollment):
+        enrollment_id = enrollment.id
+        if enrollment.credits + amount < 0:
+            raise ValueError(f"Créditos insuficientes. Balance actual: {enrollment.credits}, cambio solicitado: {amount}")
+    else:
+        enrollment_id = enrollment
+        enrollment = None
 
     if reference_id is not None and reference_type is not None:
-        lock_key = _credit_advisory_lock_key(enrollment.id, source_type, reference_id)
+        lock_key = _credit_advisory_lock_key(enrollment_id, source_type, reference_id)
         lock_result = await db.execute(
             text("SELECT pg_try_advisory_xact_lock(:lock_key)"),
             {"lock_key": lock_key},
@@ -93,7 +103,7 @@ async def apply(
 
             opening_result = await db.execute(
                 select(CreditTransaction).where(
-                    CreditTransaction.enrollment_id == enrollment.id,
+                    CreditTransaction.enrollment_id == enrollment_id,
                     CreditTransaction.source_type == opening_source,
                     CreditTransaction.reference_id == reference_id,
                     CreditTransaction.reference_type == reference_type,
@@ -103,7 +113,7 @@ async def apply(
 
             closing_result = await db.execute(
                 select(CreditTransaction).where(
-                    CreditTransaction.enrollment_id == enrollment.id,
+                    CreditTransaction.enrollment_id == enrollment_id,
                     CreditTransaction.source_type == closing_source,
                     CreditTransaction.reference_id == reference_id,
                     CreditTransaction.reference_type == reference_type,
@@ -120,7 +130,7 @@ async def apply(
 
             closing_result = await db.execute(
                 select(CreditTransaction).where(
-                    CreditTransaction.enrollment_id == enrollment.id,
+                    CreditTransaction.enrollment_id == enrollment_id,
                     CreditTransaction.source_type == closing_source,
                     CreditTransaction.reference_id == reference_id,
                     CreditTransaction.reference_type == reference_type,
@@ -130,7 +140,7 @@ async def apply(
 
             opening_result = await db.execute(
                 select(CreditTransaction).where(
-                    CreditTransaction.enrollment_id == enrollment.id,
+                    CreditTransaction.enrollment_id == enrollment_id,
                     CreditTransaction.source_type == opening_source,
                     CreditTransaction.reference_id == reference_id,
                     CreditTransaction.reference_type == reference_type,
@@ -141,10 +151,29 @@ async def apply(
             if len(closing_transactions) > len(opening_transactions):
                 return None
 
-    enrollment.credits += amount
+    # Chequeo y modificación en la misma sentencia: sin read-modify-write en Python
+    result = await db.execute(
+        update(Enrollment)
+        .where(
+            Enrollment.id == enrollment_id,
+            Enrollment.credits + amount >= 0,
+        )
+        .values(credits=Enrollment.credits + amount)
+        .returning(Enrollment.credits)
+        .execution_options(synchronize_session=False)
+    )
+    new_credits = result.scalar_one_or_none()
+    if new_credits is None:
+        if enrollment is None:
+            raise ValueError(f"Créditos insuficientes para la inscripción {enrollment_id}, cambio solicitado: {amount}")
+        raise ValueError(f"Créditos insuficientes. Balance actual: {enrollment.credits}, cambio solicitado: {amount}")
+
+    # Reflejar el balance de BD en el objeto sin marcarlo como modificado
+    if enrollment is not None:
+        set_committed_value(enrollment, "credits", new_credits)
 
     transaction = CreditTransaction(
-        enrollment_id=enrollment.id,
+        enrollment_id=enrollment_id,
         amount=amount,
         source_type=source_type,
         reference_id=reference_id,
@@ -158,11 +187,11 @@ async def apply(
     try:
         await db.flush()
     except IntegrityError:
-        # Si el duplicado ya existía en BD (por ejemplo, un reintento), revertimos
-        # el cambio local y limpiamos la sesión para que quede usable.
-        enrollment.credits -= amount
+        # Si el duplicado ya existía en BD (por ejemplo, un reintento), el rollback
+        # deshace también el UPDATE del balance; recargamos el enrollment.
         await db.rollback()
-        await db.refresh(enrollment)
+        if enrollment is not None:
+            await db.refresh(enrollment)
         return None
 
     return transaction
@@ -0,0 +1,17 @@
+-- ============================================================
+-- Migración 016: Índice compuesto (teacher_id, date, time) en classes
+-- ============================================================
+-- SEGURA: Solo crea un índice. No modifica datos.
+--
+-- Soporta:
+--   GET /classes/calendar → WHERE teacher_id = ? AND date BETWEEN ? AND ?
+--                           ORDER BY date, time   (range scan ya ordenado)
+--   GET /classes/         → WHERE teacher_id = ?
+--                           ORDER BY date DESC, time DESC (mismo índice, scan hacia atrás)
+--
+-- Un índice (teacher_id, date DESC) aparte sería redundante: Postgres
+-- recorre un B-tree en ambos sentidos.
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS ix_classes_teacher_date_time
+ON classes (teacher_id, date, time);
@@ -0,0 +1,17 @@
+-- ============================================================
+-- Migración 017: Índice compuesto (teacher_id, created_at, id) en enrollments
+-- ============================================================
+-- SEGURA: Solo crea un índice. No modifica datos.
+--
+-- Soporta:
+--   GET /enrollments/ → WHERE teacher_id = ?
+--                       [AND (created_at, id) < (?, ?)]   (cursor)
+--                       ORDER BY created_at DESC, id DESC
+--                       LIMIT ?
+--
+-- Postgres recorre el índice hacia atrás para el ORDER BY DESC, y el
+-- predicado de cursor se resuelve como un range scan en lugar de OFFSET.
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS ix_enrollments_teacher_created_id
+ON enrollments (teacher_id, created_at, id);
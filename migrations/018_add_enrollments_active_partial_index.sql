@@ -0,0 +1,20 @@
+-- ============================================================
+-- Migración 018: Índice parcial de enrollments activos
+-- ============================================================
+-- SEGURA: Solo crea un índice. No modifica datos.
+-- CONCURRENTLY: no bloquea escrituras en enrollments mientras se construye
+-- (no puede correr dentro de una transacción: apply_018.py usa AUTOCOMMIT).
+--
+-- Soporta:
+--   generate_monthly_classes → SELECT id FROM enrollments WHERE status = 'active'
+--                              (index-only scan sobre las filas activas)
+--   Listados de activos       → WHERE teacher_id = ? AND status = 'active'
+--
+-- Los demás índices del pedido ya existen:
+--   (teacher_id, created_at, id) → migración 017 (cursor; se recorre hacia atrás)
+--   (student_id)                 → ix_enrollments_student_id (index=True en el modelo)
+-- ============================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollments_active_teacher_id
+ON enrollments (teacher_id, id)
+WHERE status = 'active';
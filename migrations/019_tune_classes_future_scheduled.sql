@@ -0,0 +1,32 @@
+-- ============================================================
+-- Migración 019: classes → índice parcial de clases programadas + autovacuum
+-- ============================================================
+-- SEGURA: Crea un índice y ajusta parámetros de almacenamiento. No modifica datos.
+-- CONCURRENTLY: no bloquea escrituras en classes mientras se construye
+-- (no puede correr dentro de una transacción: apply_019.py usa AUTOCOMMIT).
+--
+-- En lugar de particionar classes (su PK "id" es referenciada por
+-- attendances.class_id, y en una tabla particionada la PK debe incluir la
+-- clave de partición), se atacan los dos costos que motivaban particionar:
+--
+-- 1) Borrado de clases futuras de un horario (jobs):
+--      DELETE FROM classes
+--      WHERE schedule_id = ? AND date >= ? AND status = 'scheduled'
+--    El índice parcial solo contiene clases 'scheduled': es chico aunque
+--    la tabla crezca con el histórico (completed/cancelled), y el rango de
+--    fechas se resuelve dentro del índice.
+--    (Por enrollment_id ya sirve idx_classes_unique_active.)
+--
+-- 2) Vacuum: classes recibe muchos INSERT/DELETE por los jobs. Con la
+--    escala por defecto (20%) autovacuum corre tarde y sobre mucha basura;
+--    se dispara antes y en pasos más chicos.
+-- ============================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_classes_scheduled_schedule_date
+ON classes (schedule_id, date)
+WHERE status = 'scheduled';
+
+ALTER TABLE classes SET (
+    autovacuum_vacuum_scale_factor = 0.02,
+    autovacuum_analyze_scale_factor = 0.01
+);
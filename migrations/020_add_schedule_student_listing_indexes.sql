@@ -0,0 +1,22 @@
+-- ============================================================
+-- Migración 020: Índices de listado de horarios y alumnos
+-- ============================================================
+-- SEGURA: Solo crea índices. No modifica datos.
+-- CONCURRENTLY: no bloquea escrituras mientras se construyen
+-- (no puede correr dentro de una transacción: apply_020.py usa AUTOCOMMIT
+-- y ejecuta cada sentencia por separado).
+--
+-- Soporta:
+--   schedule.get_multi → WHERE teacher_id = ? ORDER BY day, time
+--                        (recorrido del índice en orden, sin sort)
+--   validate_slot      → WHERE teacher_id = ? AND day = ?
+--   student.get_multi  → WHERE teacher_id = ? AND active ORDER BY name
+--                        (parcial: los dados de baja nunca se listan)
+-- ============================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedules_teacher_day_time
+ON schedules (teacher_id, day, time);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_students_active_teacher_name
+ON students (teacher_id, name)
+WHERE active = true;
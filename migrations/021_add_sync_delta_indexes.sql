@@ -0,0 +1,35 @@
+-- ============================================================
+-- Migración 021: Índices para /sync/delta
+-- ============================================================
+-- SEGURA: Solo crea índices. No modifica datos.
+-- CONCURRENTLY: no bloquea escrituras mientras se construyen
+-- (no puede correr dentro de una transacción: apply_021.py usa AUTOCOMMIT
+-- y ejecuta cada sentencia por separado).
+--
+-- Soporta (cada 5 min por dispositivo):
+--   /sync/delta → WHERE teacher_id = ? AND updated_at > :last_sync
+--                 (range scan sobre las filas recientes del profesor, en
+--                 lugar de recorrer todas sus filas filtrando por fecha)
+--   credit_transactions → WHERE enrollment_id IN (...) AND updated_at > :last_sync
+--
+-- Los demás índices del pedido ya existen:
+--   classes (teacher_id, date, time) → ix_classes_teacher_date_time (rango de /sync/initial)
+-- ============================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_students_teacher_updated
+ON students (teacher_id, updated_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollments_teacher_updated
+ON enrollments (teacher_id, updated_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_schedules_teacher_updated
+ON schedules (teacher_id, updated_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_classes_teacher_updated
+ON classes (teacher_id, updated_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enrollment_notes_teacher_updated
+ON enrollment_notes (teacher_id, updated_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_credit_transactions_enrollment_updated
+ON credit_transactions (enrollment_id, updated_at);
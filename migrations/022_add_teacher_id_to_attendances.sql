@@ -0,0 +1,42 @@
+-- ============================================================
+-- Migración 022: Desnormalizar teacher_id en attendances
+-- ============================================================
+-- SEGURA: Aditiva. Agrega una columna y la rellena desde classes.
+--
+-- QUÉ HACE:
+--   1. Agrega attendances.teacher_id (nullable primero)
+--   2. Backfill desde la clase dueña de cada asistencia
+--   3. Marca la columna NOT NULL
+--   4. Índices (teacher_id) y (teacher_id, updated_at)
+--
+-- POR QUÉ:
+--   /sync/delta y /sync/batch hacían JOIN con classes solo para filtrar
+--   por profesor. Con teacher_id en la fila, la consulta de asistencias
+--   modificadas es un range scan sobre una sola tabla:
+--     WHERE teacher_id = ? AND updated_at > :last_sync
+--
+-- El teacher_id de una clase no cambia después de creada, así que la
+-- columna no necesita mantenerse en updates; se setea al insertar.
+--
+-- apply_022.py ejecuta todo en una sola transacción.
+-- ============================================================
+
+ALTER TABLE attendances
+    ADD COLUMN IF NOT EXISTS teacher_id INTEGER REFERENCES teachers(id) ON DELETE CASCADE;
+
+UPDATE attendances
+SET teacher_id = c.teacher_id
+FROM classes c
+WHERE attendances.class_id = c.id
+  AND attendances.teacher_id IS NULL;
+
+ALTER TABLE attendances
+    ALTER COLUMN teacher_id SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_attendances_teacher_id
+ON attendances (teacher_id);
+
+CREATE INDEX IF NOT EXISTS ix_attendances_teacher_updated
+ON attendances (teacher_id, updated_at);
+
+COMMENT ON COLUMN attendances.teacher_id IS 'ID del profesor (redundante con classes.teacher_id, evita el JOIN en sync)';
@@ -0,0 +1,129 @@
+-- ============================================================
+-- Migración 023: Versión de sync por profesor (teacher_sync_versions)
+-- ============================================================
+-- SEGURA: Aditiva. Crea una tabla, dos funciones y triggers.
+--
+-- QUÉ HACE:
+--   1. Crea teacher_sync_versions (teacher_id, entity, version, updated_at)
+--   2. Función bump_teacher_sync_version(): incrementa la versión de
+--      (teacher_id, entidad) en cada INSERT/UPDATE/DELETE
+--   3. Triggers en las tablas que viajan en /sync (la entidad se pasa como
+--      argumento del trigger)
+--   4. credit_transactions no tiene teacher_id: su función busca el
+--      profesor a través de la inscripción
+--
+-- POR QUÉ:
+--   El móvil llama a /sync/delta cada 5 minutos y casi siempre no cambió
+--   nada. Con un contador por profesor, el delta calcula su ETag con una
+--   lectura por PK y responde 304 sin ejecutar las consultas de cambios.
+--
+-- Si una fila cambia de profesor (UPDATE de teacher_id) se incrementan
+-- las versiones de ambos profesores.
+--
+-- apply_023.py ejecuta el archivo completo como un script (los cuerpos
+-- plpgsql contienen ';').
+-- ============================================================
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS teacher_sync_versions (
+    teacher_id  INTEGER      NOT NULL REFERENCES teachers(id) ON DELETE CASCADE,
+    entity      VARCHAR(50)  NOT NULL,
+    version     BIGINT       NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMPTZ  NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (teacher_id, entity)
+);
+
+COMMENT ON TABLE teacher_sync_versions IS 'Contador de cambios por (profesor, entidad del sync). Lo mantienen triggers.';
+
+-- ============================================================
+-- Función común: incrementa la versión de (teacher_id, entidad)
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION _bump_sync_version(p_teacher_id INTEGER, p_entity TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF p_teacher_id IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO teacher_sync_versions AS v (teacher_id, entity, version, updated_at)
+    VALUES (p_teacher_id, p_entity, 1, NOW())
+    ON CONFLICT (teacher_id, entity)
+    DO UPDATE SET version = v.version + 1, updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tablas con teacher_id propio. TG_ARGV[0] = entidad del sync.
+CREATE OR REPLACE FUNCTION bump_teacher_sync_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM _bump_sync_version(NEW.teacher_id, TG_ARGV[0]);
+    END IF;
+    IF TG_OP = 'DELETE'
+       OR (TG_OP = 'UPDATE' AND OLD.teacher_id IS DISTINCT FROM NEW.teacher_id) THEN
+        PERFORM _bump_sync_version(OLD.teacher_id, TG_ARGV[0]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- credit_transactions: el profesor es el de la inscripción
+CREATE OR REPLACE FUNCTION bump_teacher_sync_version_credit_tx()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_enrollment_id INTEGER;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_enrollment_id := OLD.enrollment_id;
+    ELSE
+        v_enrollment_id := NEW.enrollment_id;
+    END IF;
+    PERFORM _bump_sync_version(
+        (SELECT teacher_id FROM enrollments WHERE id = v_enrollment_id),
+        'credit_transactions'
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================
+-- Triggers (AFTER, por fila)
+-- ============================================================
+
+DROP TRIGGER IF EXISTS trg_sync_version_students ON students;
+CREATE TRIGGER trg_sync_version_students
+AFTER INSERT OR UPDATE OR DELETE ON students
+FOR EACH ROW EXECUTE FUNCTION bump_teacher_sync_version('students');
+
+DROP TRIGGER IF EXISTS trg_sync_version_enrollments ON enrollments;
+CREATE TRIGGER trg_sync_version_enrollments
+AFTER INSERT OR UPDATE OR DELETE ON enrollments
+FOR EACH ROW EXECUTE FUNCTION bump_teacher_sync_version('enrollments');
+
+DROP TRIGGER IF EXISTS trg_sync_version_schedules ON schedules;
+CREATE TRIGGER trg_sync_version_schedules
+AFTER INSERT OR UPDATE OR DELETE ON schedules
+FOR EACH ROW EXECUTE FUNCTION bump_teacher_sync_version('schedules');
+
+DROP TRIGGER IF EXISTS trg_sync_version_classes ON classes;
+CREATE TRIGGER trg_sync_version_classes
+AFTER INSERT OR UPDATE OR DELETE ON classes
+FOR EACH ROW EXECUTE FUNCTION bump_teacher_sync_version('classes');
+
+DROP TRIGGER IF EXISTS trg_sync_version_attendances ON attendances;
+CREATE TRIGGER trg_sync_version_attendances
+AFTER INSERT OR UPDATE OR DELETE ON attendances
+FOR EACH ROW EXECUTE FUNCTION bump_teacher_sync_version('attendances');
+
+DROP TRIGGER IF EXISTS trg_sync_version_notes ON enrollment_notes;
+CREATE TRIGGER trg_sync_version_notes
+AFTER INSERT OR UPDATE OR DELETE ON enrollment_notes
+FOR EACH ROW EXECUTE FUNCTION bump_teacher_sync_version('notes');
+
+DROP TRIGGER IF EXISTS trg_sync_version_credit_transactions ON credit_transactions;
+CREATE TRIGGER trg_sync_version_credit_transactions
+AFTER INSERT OR UPDATE OR DELETE ON credit_transactions
+FOR EACH ROW EXECUTE FUNCTION bump_teacher_sync_version_credit_tx();
+
+COMMIT;
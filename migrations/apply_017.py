@@ -0,0 +1,40 @@
+"""
+Script para aplicar migración: 017_add_enrollments_teacher_created_index
+
+Crea el índice compuesto (teacher_id, created_at, id) en enrollments.
+"""
+import asyncio
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.config import settings
+
+async def apply_migration():
+    """Aplica la migración SQL."""
+    migration_file = Path(__file__).parent / "017_add_enrollments_teacher_created_index.sql"
+
+    with open(migration_file, 'r', encoding='utf-8') as f:
+        sql = f.read()
+
+    url = str(settings.DATABASE_URL)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "")
+        engine = create_async_engine(url, connect_args={"ssl": "require"})
+    else:
+        engine = create_async_engine(url)
+
+    async_session_maker = async_sessionmaker(engine, class_=AsyncSession)
+
+    async with async_session_maker() as session:
+        try:
+            await session.execute(text(sql))
+            await session.commit()
+            print("Migración aplicada exitosamente")
+            print("   - Índice ix_enrollments_teacher_created_id creado en enrollments")
+        except Exception as e:
+            print(f"Error al aplicar migración: {e}")
+            await session.rollback()
+            raise
+
+if __name__ == "__main__":
+    asyncio.run(apply_migration())
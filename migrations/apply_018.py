@@ -0,0 +1,41 @@
+"""
+Script para aplicar migración: 018_add_enrollments_active_partial_index
+
+Crea el índice parcial (teacher_id, id) WHERE status = 'active' en enrollments.
+CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción, por eso se
+ejecuta en una conexión AUTOCOMMIT.
+"""
+import asyncio
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+
+async def apply_migration():
+    """Aplica la migración SQL."""
+    migration_file = Path(__file__).parent / "018_add_enrollments_active_partial_index.sql"
+
+    with open(migration_file, 'r', encoding='utf-8') as f:
+        sql = f.read()
+
+    url = str(settings.DATABASE_URL)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "")
+        engine = create_async_engine(url, connect_args={"ssl": "require"})
+    else:
+        engine = create_async_engine(url)
+
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(sql))
+        print("Migración aplicada exitosamente")
+        print("   - Índice parcial ix_enrollments_active_teacher_id creado en enrollments")
+    except Exception as e:
+        print(f"Error al aplicar migración: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(apply_migration())
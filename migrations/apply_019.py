@@ -0,0 +1,49 @@
+"""
+Script para aplicar migración: 019_tune_classes_future_scheduled
+
+Crea el índice parcial (schedule_id, date) WHERE status = 'scheduled' en classes
+y ajusta autovacuum de la tabla.
+CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción, por eso se
+ejecuta en una conexión AUTOCOMMIT, una sentencia por vez (asyncpg no acepta
+varias sentencias en un mismo execute).
+"""
+import asyncio
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+
+async def apply_migration():
+    """Aplica la migración SQL."""
+    migration_file = Path(__file__).parent / "019_tune_classes_future_scheduled.sql"
+
+    with open(migration_file, 'r', encoding='utf-8') as f:
+        sql = "\n".join(
+            line for line in f.read().splitlines()
+            if not line.lstrip().startswith("--")
+        )
+    statements = [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+    url = str(settings.DATABASE_URL)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "")
+        engine = create_async_engine(url, connect_args={"ssl": "require"})
+    else:
+        engine = create_async_engine(url)
+
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for stmt in statements:
+                await conn.execute(text(stmt))
+        print("Migración aplicada exitosamente")
+        print("   - Índice parcial ix_classes_scheduled_schedule_date creado en classes")
+        print("   - Autovacuum de classes ajustado")
+    except Exception as e:
+        print(f"Error al aplicar migración: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(apply_migration())
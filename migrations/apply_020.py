@@ -0,0 +1,49 @@
+"""
+Script para aplicar migración: 020_add_schedule_student_listing_indexes
+
+Crea los índices (teacher_id, day, time) en schedules y el parcial
+(teacher_id, name) WHERE active = true en students.
+CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción, por eso se
+ejecuta en una conexión AUTOCOMMIT, una sentencia por vez (asyncpg no acepta
+varias sentencias en un mismo execute).
+"""
+import asyncio
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+
+async def apply_migration():
+    """Aplica la migración SQL."""
+    migration_file = Path(__file__).parent / "020_add_schedule_student_listing_indexes.sql"
+
+    with open(migration_file, 'r', encoding='utf-8') as f:
+        sql = "\n".join(
+            line for line in f.read().splitlines()
+            if not line.lstrip().startswith("--")
+        )
+    statements = [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+    url = str(settings.DATABASE_URL)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "")
+        engine = create_async_engine(url, connect_args={"ssl": "require"})
+    else:
+        engine = create_async_engine(url)
+
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for stmt in statements:
+                await conn.execute(text(stmt))
+        print("Migración aplicada exitosamente")
+        print("   - Índice ix_schedules_teacher_day_time creado en schedules")
+        print("   - Índice parcial ix_students_active_teacher_name creado en students")
+    except Exception as e:
+        print(f"Error al aplicar migración: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(apply_migration())
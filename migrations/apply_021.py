@@ -0,0 +1,50 @@
+"""
+Script para aplicar migración: 021_add_sync_delta_indexes
+
+Crea los índices (teacher_id, updated_at) de las tablas que consulta
+/sync/delta y (enrollment_id, updated_at) en credit_transactions.
+CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción, por eso se
+ejecuta en una conexión AUTOCOMMIT, una sentencia por vez (asyncpg no acepta
+varias sentencias en un mismo execute).
+"""
+import asyncio
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+
+async def apply_migration():
+    """Aplica la migración SQL."""
+    migration_file = Path(__file__).parent / "021_add_sync_delta_indexes.sql"
+
+    with open(migration_file, 'r', encoding='utf-8') as f:
+        sql = "\n".join(
+            line for line in f.read().splitlines()
+            if not line.lstrip().startswith("--")
+        )
+    statements = [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+    url = str(settings.DATABASE_URL)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "")
+        engine = create_async_engine(url, connect_args={"ssl": "require"})
+    else:
+        engine = create_async_engine(url)
+
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for stmt in statements:
+                await conn.execute(text(stmt))
+        print("Migración aplicada exitosamente")
+        print("   - Índices (teacher_id, updated_at) creados en students, enrollments,")
+        print("     schedules, classes y enrollment_notes")
+        print("   - Índice ix_credit_transactions_enrollment_updated creado en credit_transactions")
+    except Exception as e:
+        print(f"Error al aplicar migración: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(apply_migration())
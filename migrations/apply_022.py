@@ -0,0 +1,46 @@
+"""
+Script para aplicar migración: 022_add_teacher_id_to_attendances
+
+Agrega attendances.teacher_id, lo rellena desde classes y crea los índices
+(teacher_id) y (teacher_id, updated_at). Todo corre en una transacción, una
+sentencia por vez (asyncpg no acepta varias sentencias en un mismo execute).
+"""
+import asyncio
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+
+async def apply_migration():
+    """Aplica la migración SQL."""
+    migration_file = Path(__file__).parent / "022_add_teacher_id_to_attendances.sql"
+
+    with open(migration_file, 'r', encoding='utf-8') as f:
+        sql = "\n".join(
+            line for line in f.read().splitlines()
+            if not line.lstrip().startswith("--")
+        )
+    statements = [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+    url = str(settings.DATABASE_URL)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "")
+        engine = create_async_engine(url, connect_args={"ssl": "require"})
+    else:
+        engine = create_async_engine(url)
+
+    try:
+        async with engine.begin() as conn:
+            for stmt in statements:
+                await conn.execute(text(stmt))
+        print("Migración aplicada exitosamente")
+        print("   - Columna teacher_id agregada y rellenada en attendances")
+        print("   - Índices ix_attendances_teacher_id e ix_attendances_teacher_updated creados")
+    except Exception as e:
+        print(f"Error al aplicar migración: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(apply_migration())
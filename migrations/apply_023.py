@@ -0,0 +1,44 @@
+"""
+Script para aplicar migración: 023_add_teacher_sync_versions
+
+Crea teacher_sync_versions y los triggers que la mantienen. El archivo tiene
+cuerpos plpgsql (con ';' internos), así que no se parte por sentencias: se
+envía completo por la conexión asyncpg, que ejecuta scripts de varias
+sentencias cuando no hay parámetros (el BEGIN/COMMIT está en el archivo).
+"""
+import asyncio
+from pathlib import Path
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+
+async def apply_migration():
+    """Aplica la migración SQL."""
+    migration_file = Path(__file__).parent / "023_add_teacher_sync_versions.sql"
+
+    with open(migration_file, 'r', encoding='utf-8') as f:
+        sql = f.read()
+
+    url = str(settings.DATABASE_URL)
+    if "sslmode=require" in url:
+        url = url.replace("?sslmode=require", "")
+        engine = create_async_engine(url, connect_args={"ssl": "require"})
+    else:
+        engine = create_async_engine(url)
+
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.execute(sql)
+        print("Migración aplicada exitosamente")
+        print("   - Tabla teacher_sync_versions creada")
+        print("   - Triggers de versión creados en students, enrollments, schedules,")
+        print("     classes, attendances, enrollment_notes y credit_transactions")
+    except Exception as e:
+        print(f"Error al aplicar migración: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(apply_migration())